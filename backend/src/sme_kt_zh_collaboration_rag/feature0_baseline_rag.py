@@ -55,6 +55,7 @@ from conversational_toolkit.llms.base import LLM, LLMMessage
 from conversational_toolkit.llms.local_llm import LocalLLM
 from conversational_toolkit.llms.ollama import OllamaLLM
 from conversational_toolkit.llms.openai import OpenAILLM
+from conversational_toolkit.retriever.context_expansion import link_neighbours
 from conversational_toolkit.retriever.vectorstore_retriever import VectorStoreRetriever
 from conversational_toolkit.vectorstores.base import ChunkMatch
 from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
@@ -267,7 +268,9 @@ async def build_vector_store(
     embeddings = await embedding_model.get_embeddings([c.content for c in chunks])
     logger.info(f"Embedding matrix: shape={embeddings.shape}  dtype={embeddings.dtype}")
 
-    await vector_store.insert_chunks(chunks=chunks, embedding=embeddings)
+    # Link each chunk to its neighbours so ContextExpansionRetriever can widen hits into passages
+    ids = link_neighbours(chunks, group_by="source_file")
+    await vector_store.insert_chunks(chunks=chunks, embedding=embeddings, ids=ids)
     logger.info(f"Done! Vector store written to {db_path}")
     return vector_store
 
@@ -287,9 +290,9 @@ async def inspect_retrieval(
 
     # To add lexical (BM25) or hybrid (semantic + lexical) retrieval, replace
     'VectorStoreRetriever' with 'HybridRetriever([semantic, bm25], top_k=top_k)'.
-    'BM25Retriever' requires a 'list[ChunkRecord]' corpus -> pass the records
-    retrieved from ChromaDB or, after a full store insert, re-fetch them with
-    'vector_store.get_chunks_by_embedding(zero_vector, top_k=N)'.
+    'BM25Retriever' requires a 'list[ChunkRecord]' corpus -> build it straight
+    from the store with 'await BM25Retriever.from_vector_store(vector_store, top_k)',
+    which streams the records via 'vector_store.iter_records()'.
     """
     retriever = VectorStoreRetriever(embedding_model, vector_store, top_k=top_k)
     results = await retriever.retrieve(query)
@@ -4,7 +4,8 @@ Base classes for conversational agents.
 Every agent inherits from 'Agent' and overrides 'answer_stream'. The toolkit
 ships three concrete implementations: 'RAG' for retrieval-augmented generation,
 'Router' for LLM-based query routing across multiple agents, and 'ToolAgent'
-for ReAct-style agentic loops with tool calling.
+for ReAct-style agentic loops with tool calling. 'SemanticCacheAgent' wraps
+any of them to answer repeated questions from a cache.
 """
 
 from abc import ABC, abstractmethod
@@ -6,9 +6,18 @@ the LLM it rewrites the query to be history-independent, optionally expands it
 into multiple search queries, retrieves relevant chunks from all configured
 retrievers, merges the ranked results via Reciprocal Rank Fusion, and injects
 the sources into the LLM prompt using XML tags.
+
+Each retriever that serves batches ('VectorStoreRetriever', 'BM25Retriever',
+'HybridRetriever', ...) receives all queries as one 'Retriever.retrieve_many'
+call, so a vector store retriever embeds them in one call and searches them
+together. Retrievers without a batched path get one 'retrieve' call per query.
+All of this runs concurrently, with at most 'max_concurrency' retrieval calls
+(a batch counting as one) in flight at a time.
 """
 
-from typing import Any, AsyncGenerator
+import asyncio
+from collections.abc import AsyncGenerator, Awaitable
+from typing import Any, TypeVar
 
 from conversational_toolkit.agents.base import Agent, AgentAnswer, QueryWithContext
 from conversational_toolkit.llms.base import LLM, LLMMessage, Roles
@@ -21,6 +30,8 @@ from conversational_toolkit.utils.retriever import (
 )
 from conversational_toolkit.vectorstores.base import ChunkRecord
 
+_T = TypeVar("_T")
+
 
 class RAG(Agent):
     """
@@ -34,6 +45,8 @@ class RAG(Agent):
             merged with Reciprocal Rank Fusion before being passed to the LLM.
         number_query_expansion: Number of additional search queries to generate
             from the original query. Set to 0 to disable expansion.
+        max_concurrency: Maximum number of retrieval calls in flight at the same time; a
+            batched 'retrieve_many' counts as one, otherwise each (retriever, query) pair counts.
     """
 
     def __init__(
@@ -44,6 +57,7 @@ class RAG(Agent):
         system_prompt: str,
         description: str = "",
         number_query_expansion: int = 0,
+        max_concurrency: int = 8,
     ):
         super().__init__(system_prompt, llm, description)
         self.description = description
@@ -51,6 +65,7 @@ class RAG(Agent):
         self.utility_llm = utility_llm
         self.retrievers = retrievers
         self.number_query_expansion = number_query_expansion
+        self.max_concurrency = max_concurrency
 
     async def answer_stream(self, query_with_context: QueryWithContext) -> AsyncGenerator[AgentAnswer, None]:
         query = query_with_context.query
@@ -63,11 +78,24 @@ class RAG(Agent):
         else:
             queries = [query]
 
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def limited(call: Awaitable[_T]) -> _T:
+            async with semaphore:
+                return await call
+
+        async def retrieve(retriever: Retriever[Any]) -> list[list[ChunkRecord]]:
+            if type(retriever).retrieve_many is Retriever.retrieve_many:
+                # The default 'retrieve_many' would gather one 'retrieve' per query unbounded
+                return list(await asyncio.gather(*[limited(retriever.retrieve(q)) for q in queries]))
+            return await limited(retriever.retrieve_many(queries))
+
+        retrieved = await asyncio.gather(*[retrieve(retriever) for retriever in self.retrievers])
+
         sources: list[ChunkRecord] = []
-        for retriever in self.retrievers:
-            retrieved = [await retriever.retrieve(q) for q in queries]
-            if retrieved:
-                sources += reciprocal_rank_fusion(retrieved)[: retriever.top_k]
+        for retriever, per_query in zip(self.retrievers, retrieved):
+            if per_query:
+                sources += reciprocal_rank_fusion(per_query)[: retriever.top_k]
 
         response_stream = self.llm.generate_stream(
             [
@@ -0,0 +1,167 @@
+"""
+Semantic answer cache.
+
+'SemanticCacheAgent' wraps another agent and remembers its final answers by
+query embedding. When a new question is close enough to a cached one (cosine
+similarity at or above 'similarity_threshold'), the cached answer and its
+sources are replayed as a stream without running rewriting, retrieval, or
+generation. Only the query is embedded, which costs milliseconds.
+
+Entries expire after 'ttl' seconds, the least recently used entries are evicted
+beyond 'maxsize', and the whole cache is dropped as soon as the 'version' of
+any watched vector store changes, so answers never outlive the documents they
+were based on. Only first-turn questions (no conversation history) are cached:
+follow-up questions depend on the conversation and are passed through.
+"""
+
+import time
+from collections.abc import AsyncGenerator, Sequence
+from dataclasses import dataclass
+
+import numpy as np
+from loguru import logger
+from numpy.typing import NDArray
+
+from conversational_toolkit.agents.base import Agent, AgentAnswer, QueryWithContext
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.vectorstores.base import VectorStore
+
+
+@dataclass
+class _CachedAnswer:
+    query: str
+    answer: AgentAnswer
+    created: float
+    last_used: float
+
+
+class SemanticCacheAgent(Agent):
+    """
+    Agent wrapper that answers near-duplicate questions from a cache.
+
+    Attributes:
+        agent: The wrapped agent, called on cache misses.
+        embedding_model: Model used to embed queries.
+        vector_stores: Stores whose writes invalidate the cache.
+        similarity_threshold: Minimum cosine similarity for a cache hit.
+        ttl: Seconds a cached answer stays valid, or None for no expiry.
+        maxsize: Maximum number of cached answers.
+        replay_chunk_size: Characters added per streamed chunk when replaying an answer.
+        hits: Number of questions answered from the cache.
+        misses: Number of questions passed to the wrapped agent.
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        embedding_model: EmbeddingsModel,
+        vector_stores: Sequence[VectorStore] = (),
+        similarity_threshold: float = 0.95,
+        ttl: float | None = 24 * 3600.0,
+        maxsize: int = 1000,
+        replay_chunk_size: int = 40,
+    ) -> None:
+        """
+        :param agent: Agent to wrap
+        :param embedding_model: Model used to embed queries
+        :param vector_stores: Stores the wrapped agent retrieves from; any write to them clears the cache
+        :param similarity_threshold: Minimum cosine similarity between queries for a hit
+        :param ttl: Seconds a cached answer stays valid (None for no expiry)
+        :param maxsize: Maximum number of cached answers; the least recently used are evicted
+        :param replay_chunk_size: Characters per streamed chunk when replaying
+        """
+        super().__init__(agent.system_prompt, agent.llm, agent.description, agent.max_steps)
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self.agent = agent
+        self.embedding_model = embedding_model
+        self.vector_stores = list(vector_stores)
+        self.similarity_threshold = similarity_threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.replay_chunk_size = replay_chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: list[_CachedAnswer] = []
+        self._embeddings: NDArray[np.float32] = np.zeros((0, 0), dtype=np.float32)
+        self._versions = self._store_versions()
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self._entries = []
+        self._embeddings = np.zeros((0, 0), dtype=np.float32)
+
+    async def answer_stream(self, query_with_context: QueryWithContext) -> AsyncGenerator[AgentAnswer, None]:
+        if query_with_context.history:
+            async for answer in self.agent.answer_stream(query_with_context):
+                yield answer
+            return
+
+        embedding = await self._embed(query_with_context.query)
+        cached = self._lookup(embedding)
+        if cached is not None:
+            self.hits += 1
+            logger.debug(f"Semantic cache hit: {query_with_context.query!r} -> {cached.query!r}")
+            for answer in self._replay(cached.answer):
+                yield answer
+            return
+
+        self.misses += 1
+        versions = self._versions
+        final: AgentAnswer | None = None
+        async for answer in self.agent.answer_stream(query_with_context):
+            final = answer
+            yield answer
+        # Only cache answers generated entirely against the current store contents
+        if final is not None and final.content and self._store_versions() == versions:
+            self._add(query_with_context.query, embedding, final)
+
+    async def _embed(self, query: str) -> NDArray[np.float32]:
+        embedding = np.asarray((await self.embedding_model.get_embeddings(query))[0], dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        return embedding / norm if norm > 0 else embedding
+
+    def _store_versions(self) -> tuple[int, ...]:
+        return tuple(store.version for store in self.vector_stores)
+
+    def _lookup(self, embedding: NDArray[np.float32]) -> _CachedAnswer | None:
+        """Best live entry at or above the similarity threshold, after dropping stale and expired entries."""
+        versions = self._store_versions()
+        if versions != self._versions:
+            logger.debug("Vector store changed, clearing the semantic cache")
+            self.clear()
+            self._versions = versions
+
+        now = time.monotonic()
+        if self.ttl is not None and self._entries:
+            live = np.array([now - entry.created <= self.ttl for entry in self._entries])
+            if not live.all():
+                self._entries = [entry for entry, keep in zip(self._entries, live) if keep]
+                self._embeddings = self._embeddings[live]
+        if not self._entries or self._embeddings.shape[1] != embedding.shape[0]:
+            return None
+
+        similarities = self._embeddings @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.similarity_threshold:
+            return None
+        self._entries[best].last_used = now
+        return self._entries[best]
+
+    def _add(self, query: str, embedding: NDArray[np.float32], answer: AgentAnswer) -> None:
+        now = time.monotonic()
+        if self._entries and self._embeddings.shape[1] != embedding.shape[0]:
+            self.clear()
+        if len(self._entries) >= self.maxsize:
+            oldest = min(range(len(self._entries)), key=lambda i: self._entries[i].last_used)
+            del self._entries[oldest]
+            self._embeddings = np.delete(self._embeddings, oldest, axis=0)
+        self._entries.append(_CachedAnswer(query=query, answer=answer, created=now, last_used=now))
+        self._embeddings = (
+            np.vstack([self._embeddings, embedding]) if self._entries[:-1] else embedding.reshape(1, -1).copy()
+        )
+
+    def _replay(self, answer: AgentAnswer) -> list[AgentAnswer]:
+        """The cached answer as a stream of growing prefixes, ending with the complete answer."""
+        ends = range(self.replay_chunk_size, len(answer.content), self.replay_chunk_size)
+        return [answer.model_copy(update={"content": answer.content[:end]}) for end in ends] + [answer]
@@ -2,6 +2,7 @@
 Embeddings model abstractions.
 
 Concrete implementations: 'OpenAIEmbeddings', 'SentenceTransformerEmbeddings'.
+'BatchingEmbeddings' wraps any of them to batch concurrent calls.
 """
 
 from abc import ABC, abstractmethod
@@ -0,0 +1,105 @@
+"""
+Micro-batching wrapper for embeddings models.
+
+Retrievers embed one query per 'retrieve' call. When several retrievals run
+concurrently (query expansion, multiple retrievers, concurrent requests),
+'BatchingEmbeddings' collects the 'get_embeddings' calls that arrive within
+'max_wait' seconds and serves them with a single call to the wrapped model.
+A batched encode costs little more than a single one on a local model, and a
+single API request replaces several for a remote one.
+"""
+
+import asyncio
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+
+
+class BatchingEmbeddings(EmbeddingsModel):
+    """
+    Embeddings model wrapper that coalesces concurrent calls into batches.
+
+    A batch is sent when 'max_wait' seconds have passed since its first call or
+    when it holds 'max_batch_size' texts, whichever comes first. Duplicate texts
+    within a batch are embedded once, and a batch with more than
+    'max_batch_size' distinct texts (e.g. one large call) is sent as several
+    calls of at most that size. If a wrapped call fails, every caller in the
+    batch receives the exception; if it is cancelled, so are the callers.
+
+    Attributes:
+        embedding_model: The wrapped model.
+        model_name: Name of the wrapped model.
+        max_wait: Seconds a call may wait for others to join its batch.
+        max_batch_size: Maximum number of texts per call to the wrapped model.
+    """
+
+    def __init__(self, embedding_model: EmbeddingsModel, max_wait: float = 0.005, max_batch_size: int = 64) -> None:
+        """
+        :param embedding_model: Model to wrap
+        :param max_wait: Seconds to wait for concurrent calls before sending a batch
+        :param max_batch_size: Maximum number of texts per batch
+        """
+        self.embedding_model = embedding_model
+        self.model_name = getattr(embedding_model, "model_name", type(embedding_model).__name__)
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self._pending: list[tuple[list[str], asyncio.Future[NDArray[np.float64]]]] = []
+        self._pending_texts = 0
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def get_embeddings(self, texts: str | list[str]) -> NDArray[np.float64]:
+        """Embed one or more texts as part of the next batch; returns an array of shape '(n, embedding_size)'."""
+        texts = [texts] if isinstance(texts, str) else list(texts)
+        if not texts:
+            return await self.embedding_model.get_embeddings(texts)
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[NDArray[np.float64]] = loop.create_future()
+        self._pending.append((texts, future))
+        self._pending_texts += len(texts)
+        if self._pending_texts >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Hand the pending calls to a background task and start a new batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending, self._pending_texts = self._pending, [], 0
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._embed_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _embed_batch(self, batch: list[tuple[list[str], asyncio.Future[NDArray[np.float64]]]]) -> None:
+        unique = list(dict.fromkeys(text for texts, _ in batch for text in texts))
+        try:
+            embeddings = np.concatenate(
+                [
+                    np.asarray(await self.embedding_model.get_embeddings(unique[start : start + self.max_batch_size]))
+                    for start in range(0, len(unique), self.max_batch_size)
+                ]
+            )
+        except BaseException as exc:
+            for _, future in batch:
+                if future.done():
+                    continue
+                if isinstance(exc, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(exc)
+            # Ordinary errors end here, delivered to the callers; cancellation and interpreter exits propagate
+            if not isinstance(exc, Exception):
+                raise
+            return
+
+        rows = {text: row for row, text in enumerate(unique)}
+        for texts, future in batch:
+            if not future.done():
+                future.set_result(embeddings[[rows[text] for text in texts]])
@@ -0,0 +1,303 @@
+"""
+Text analysis for lexical retrieval.
+
+An 'Analyzer' turns text into index terms through a configurable chain:
+
+    lowercasing                            'HOLZpalette' -> 'holzpalette'
+    Unicode normalisation (optional)       NFKC + case folding, 'ﬁle' -> 'file'
+    word tokenisation                      Unicode '\\w+' runs
+    diacritic folding (optional)           'für' -> 'fur', 'Maß' -> 'mass'
+    stopword removal (optional)            German and/or English function words
+    compound splitting (optional)          'holzpalette' -> 'holzpalette', 'holz', 'palette'
+    light stemming (optional)              'paletten' -> 'palett', 'pallets' -> 'pallet'
+    character n-grams (optional)           'holz' -> 'hol', 'olz' for n=3
+
+Everything after tokenisation depends only on the token, so it runs once per
+distinct token: the per-token chain is memoised with an LRU cache, and word
+frequencies in real text are skewed enough that most tokens are cache hits.
+Stemmers are light suffix strippers in the spirit of Snowball's German and
+Porter's English rules; they favour precision over aggressive conflation.
+
+The same analyzer must be used for indexing and for queries.
+'benchmark_analyzer' reports throughput and the resulting vocabulary size, to
+compare configurations on a sample of the corpus.
+"""
+
+import re
+import time
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import StrEnum
+from functools import cache, lru_cache
+from typing import Any
+
+
+class Language(StrEnum):
+    ENGLISH = "en"
+    GERMAN = "de"
+
+
+_WORD_PATTERN = re.compile(r"\w+")
+_GERMAN_FOLDING = str.maketrans({"ä": "a", "ö": "o", "ü": "u", "ß": "ss"})
+
+STOPWORDS: dict[Language, frozenset[str]] = {
+    Language.ENGLISH: frozenset(
+        """a about above after again against all am an and any are as at be because been before being below
+        between both but by can could did do does doing down during each few for from further had has have
+        having he her here hers herself him himself his how i if in into is it its itself just me more most
+        my myself no nor not now of off on once only or other our ours ourselves out over own same she should
+        so some such than that the their theirs them themselves then there these they this those through to
+        too under until up very was we were what when where which while who whom why will with would you your
+        yours yourself yourselves""".split()
+    ),
+    Language.GERMAN: frozenset(
+        """aber alle allem allen aller alles als also am an ander andere anderem anderen anderer anderes auch
+        auf aus bei bin bis bist da damit dann das dass dasselbe dazu dein deine deinem deinen deiner dem den
+        denn der des desselben dessen dich die dies diese dieselbe dieselben diesem diesen dieser dieses dir
+        doch dort du durch ein eine einem einen einer eines einig einige einigem einigen einiger einiges
+        einmal er es etwas euch euer eure eurem euren eurer für gegen gewesen hab habe haben hat hatte hatten
+        hier hin hinter ich ihm ihn ihnen ihr ihre ihrem ihren ihrer ihres im in indem ins ist jede jedem
+        jeden jeder jedes jene jenem jenen jener jenes jetzt kann kein keine keinem keinen keiner keines
+        können könnte machen man manche manchem manchen mancher manches mein meine meinem meinen meiner mich
+        mir mit muss musste nach nicht nichts noch nun nur ob oder ohne sehr sein seine seinem seinen seiner
+        seines selbst sich sie sind so solche solchem solchen solcher solches soll sollte sondern sonst über
+        um und uns unsere unserem unseren unserer unter viel vom von vor während war waren warst was weg weil
+        weiter welche welchem welchen welcher welches wenn werde werden wie wieder will wir wird wirst wo
+        wollen wollte würde würden zu zum zur zwar zwischen""".split()
+    ),
+}
+
+# Suffixes are only stripped from words that keep at least this many letters
+_MIN_STEM_LENGTH = 3
+_GERMAN_S_ENDING = frozenset("bdfghklmnrt")
+_GERMAN_ST_ENDING = frozenset("bdfghklmnt")
+_GERMAN_LINKING = ("", "s", "es", "n", "en", "e")
+_VOWELS = frozenset("aeiouy")
+
+
+def fold_diacritics(token: str) -> str:
+    """Map German umlauts and sharp s to their base letters and strip other accents ('café' -> 'cafe')."""
+    token = token.translate(_GERMAN_FOLDING)
+    if token.isascii():
+        return token
+    decomposed = unicodedata.normalize("NFD", token)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def stem_german(token: str) -> str:
+    """Light German stemmer: strips inflectional suffixes of (diacritic-folded) words."""
+    if token.endswith("ern") and len(token[:-3]) >= _MIN_STEM_LENGTH:
+        token = token[:-3]
+    elif token.endswith(("em", "en", "er", "es")) and len(token[:-2]) >= _MIN_STEM_LENGTH:
+        token = token[:-2]
+    elif len(token[:-1]) >= _MIN_STEM_LENGTH and (
+        token.endswith("e") or (token.endswith("s") and token[-2] in _GERMAN_S_ENDING)
+    ):
+        token = token[:-1]
+
+    if token.endswith("est") and len(token[:-3]) >= _MIN_STEM_LENGTH:
+        token = token[:-3]
+    elif (token.endswith(("er", "en")) and len(token[:-2]) >= _MIN_STEM_LENGTH) or (
+        # '-st' needs a valid st-ending preceded by a full stem ('kleinst' -> 'klein')
+        token.endswith("st") and len(token[:-3]) >= _MIN_STEM_LENGTH and token[-3] in _GERMAN_ST_ENDING
+    ):
+        token = token[:-2]
+    return token
+
+
+def stem_english(token: str) -> str:
+    """Light English stemmer: plurals and '-ed' / '-ing' endings, as in Porter's first step."""
+    if token.endswith("sses") and len(token) > len("sses"):
+        token = token[:-2]
+    elif token.endswith("ies") and len(token) > len("ies") + 1:
+        # 'ponies' -> 'pony', but 'dies' is left to the plural rule
+        token = token[:-3] + "y"
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")) and len(token[:-1]) >= _MIN_STEM_LENGTH:
+        token = token[:-1]
+
+    for suffix in ("ing", "ed"):
+        stem = token[: -len(suffix)]
+        if token.endswith(suffix) and len(stem) >= _MIN_STEM_LENGTH and _VOWELS.intersection(stem):
+            # 'stopped' -> 'stop', but keep 'll' / 'ss' / 'zz' ('filled' -> 'fill')
+            if stem[-1] == stem[-2] and stem[-1] not in "lsz" and stem[-1] not in _VOWELS:
+                stem = stem[:-1]
+            return stem
+    return token
+
+
+_STEMMERS = {Language.ENGLISH: stem_english, Language.GERMAN: stem_german}
+
+
+class Analyzer:
+    """
+    Configurable text-to-terms pipeline for lexical indexing and querying.
+
+    The default configuration (lowercasing, '\\w+' tokenisation) is a plain
+    lowercase word tokenizer; every other step is opt-in.
+
+    Attributes:
+        stopwords: Languages whose stopwords are removed.
+        stemmer: Language of the stemmer, or None for no stemming.
+        fold_diacritics: Whether umlauts and accents are folded to base letters.
+        compound_parts: Known word parts for splitting compounds, or empty to disable splitting.
+        min_compound_part: Minimum length of a compound part.
+        char_ngrams: Also emit character n-grams of this size for every term, or None.
+        min_length: Tokens shorter than this are dropped.
+        unicode_normalization: Whether text is NFKC-normalised and case-folded instead of lowercased.
+    """
+
+    def __init__(
+        self,
+        stopwords: Iterable[Language] = (),
+        stemmer: Language | None = None,
+        fold_diacritics: bool = False,
+        compound_parts: Iterable[str] = (),
+        min_compound_part: int = 3,
+        char_ngrams: int | None = None,
+        min_length: int = 1,
+        cache_size: int = 100_000,
+        unicode_normalization: bool = False,
+    ) -> None:
+        """
+        :param stopwords: Languages whose stopword lists are removed from the token stream
+        :param stemmer: Language of the light stemmer to apply, or None
+        :param fold_diacritics: Fold umlauts, sharp s, and accents to ASCII base letters
+        :param compound_parts: Lexicon of word parts ('holz', 'palette', ...); a token made entirely of
+            known parts (optionally joined by German linking letters) is indexed with its parts as well
+        :param min_compound_part: Minimum length of a part when splitting compounds
+        :param char_ngrams: Size of character n-grams to add for every term (None to disable)
+        :param min_length: Minimum token length
+        :param cache_size: Number of distinct tokens whose analysis is memoised
+        :param unicode_normalization: NFKC-normalise and case-fold the text ('ﬁle' -> 'file',
+            'STRASSE' and 'Straße' -> 'strasse') instead of lowercasing it
+        """
+        self.unicode_normalization = unicode_normalization
+        self.stopwords = tuple(Language(language) for language in stopwords)
+        self.stemmer = Language(stemmer) if stemmer is not None else None
+        self.fold_diacritics = fold_diacritics
+        self.compound_parts = frozenset(self._fold(self._normalize(part)) for part in compound_parts)
+        self.min_compound_part = min_compound_part
+        self.char_ngrams = char_ngrams
+        self.min_length = min_length
+        self.cache_size = cache_size
+
+        words = frozenset().union(*(STOPWORDS[language] for language in self.stopwords))
+        self._stopwords = frozenset(self._fold(word) for word in words)
+        self._stem = _STEMMERS[self.stemmer] if self.stemmer is not None else None
+        self._analyze_token = lru_cache(maxsize=cache_size)(self._analyze_token_uncached)
+
+    def __call__(self, text: str) -> list[str]:
+        return self.analyze(text)
+
+    def analyze(self, text: str) -> list[str]:
+        """Return the index terms of 'text', in order."""
+        terms: list[str] = []
+        for token in _WORD_PATTERN.findall(self._normalize(text)):
+            terms.extend(self._analyze_token(token))
+        return terms
+
+    def to_dict(self) -> dict[str, Any]:
+        """Configuration of this analyzer, for 'from_dict'."""
+        return {
+            "stopwords": [str(language) for language in self.stopwords],
+            "stemmer": str(self.stemmer) if self.stemmer is not None else None,
+            "fold_diacritics": self.fold_diacritics,
+            "compound_parts": sorted(self.compound_parts),
+            "min_compound_part": self.min_compound_part,
+            "char_ngrams": self.char_ngrams,
+            "min_length": self.min_length,
+            "cache_size": self.cache_size,
+            "unicode_normalization": self.unicode_normalization,
+        }
+
+    @classmethod
+    def from_dict(cls, config: dict[str, Any]) -> "Analyzer":
+        return cls(**config)
+
+    def _normalize(self, text: str) -> str:
+        if self.unicode_normalization:
+            return unicodedata.normalize("NFKC", text).casefold()
+        return text.lower()
+
+    def _fold(self, token: str) -> str:
+        return fold_diacritics(token) if self.fold_diacritics else token
+
+    def _analyze_token_uncached(self, token: str) -> tuple[str, ...]:
+        token = self._fold(token)
+        if len(token) < self.min_length or token in self._stopwords:
+            return ()
+
+        words = [token, *self._split_compound(token)]
+        if self._stem is not None:
+            words = list(dict.fromkeys(self._stem(word) for word in words))
+        if self.char_ngrams:
+            n = self.char_ngrams
+            words += [word[i : i + n] for word in words if len(word) > n for i in range(len(word) - n + 1)]
+        return tuple(words)
+
+    def _split_compound(self, token: str) -> list[str]:
+        """
+        Split 'token' into known parts, preferring the fewest (longest) parts.
+        A linking or inflection ending ('s', 'es', 'n', 'en', 'e') may follow
+        any part ('Verpackungsmaterial' -> 'verpackung', 'material').
+        Returns an empty list when the token is not a compound of known parts.
+        """
+        if not self.compound_parts or len(token) < 2 * self.min_compound_part:
+            return []
+
+        @cache
+        def split(start: int) -> tuple[str, ...] | None:
+            best: tuple[str, ...] | None = None
+            for end in range(len(token), start + self.min_compound_part - 1, -1):
+                part = token[start:end]
+                if part not in self.compound_parts:
+                    continue
+                if token[end:] in _GERMAN_LINKING:
+                    # The last part may carry an inflection ending ('holzpaletten')
+                    return (part,)
+                for link in _GERMAN_LINKING:
+                    if not token.startswith(link, end):
+                        continue
+                    rest = split(end + len(link))
+                    if rest is not None and (best is None or len(rest) + 1 < len(best)):
+                        best = (part, *rest)
+            return best
+
+        parts = split(0)
+        return list(parts) if parts is not None and len(parts) > 1 else []
+
+
+@dataclass(frozen=True)
+class AnalyzerBenchmark:
+    """Throughput and output size of an analyzer over a sample of texts."""
+
+    texts: int
+    tokens: int
+    vocabulary_size: int
+    tokens_per_second: float
+
+
+def benchmark_analyzer(analyzer: Analyzer, texts: list[str], repeat: int = 3) -> AnalyzerBenchmark:
+    """
+    Analyse 'texts' 'repeat' times and report the best throughput.
+
+    The first pass also warms the token cache, so the best of several passes
+    reflects steady-state indexing and query throughput.
+    """
+    vocabulary: set[str] = set()
+    tokens = 0
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        outputs = [analyzer.analyze(text) for text in texts]
+        best = min(best, time.perf_counter() - start)
+        tokens = sum(len(terms) for terms in outputs)
+        if not vocabulary:
+            vocabulary = {term for terms in outputs for term in terms}
+    return AnalyzerBenchmark(
+        texts=len(texts),
+        tokens=tokens,
+        vocabulary_size=len(vocabulary),
+        tokens_per_second=tokens / best if best > 0 else float("inf"),
+    )
@@ -7,9 +7,15 @@ document chunks. 'Retriever' is generic over 'T_co' (covariant, bounded by
 'Retriever[ChunkRecord]' is expected without unsafe casts.
 
 Concrete implementations: 'VectorStoreRetriever', 'BM25Retriever', 'HybridRetriever',
-'RerankingRetriever'.
+'RerankingRetriever', 'CrossEncoderRerankingRetriever', 'MMRRetriever',
+'ContextExpansionRetriever', 'CachedRetriever'.
+
+'retrieve_many' answers a batch of queries at once. The default runs 'retrieve'
+concurrently; 'VectorStoreRetriever', 'BM25Retriever' and 'HybridRetriever'
+override it to embed all queries in one call and score them together.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import TypeVar, Generic
 
@@ -33,7 +39,27 @@ class Retriever(ABC, Generic[T_co]):
     def __init__(self, top_k: int):
         self.top_k = top_k
 
+    @property
+    def version(self) -> int:
+        """
+        Stamp of the indexed contents this retriever reads; it changes when they change.
+
+        Retrievers over a 'VectorStore' report the store's 'version', wrappers
+        combine the versions of what they wrap. Caches of retrieval results
+        include it in their keys.
+        """
+        return 0
+
     @abstractmethod
     async def retrieve(self, query: str) -> list[T_co]:
         """Return up to 'top_k' chunks most relevant to 'query'."""
         pass
+
+    async def retrieve_many(self, queries: list[str]) -> list[list[T_co]]:
+        """
+        Return the results of 'retrieve' for each of 'queries', in order.
+
+        Override when the backend can serve a batch more cheaply than
+        one query at a time.
+        """
+        return list(await asyncio.gather(*[self.retrieve(query) for query in queries]))
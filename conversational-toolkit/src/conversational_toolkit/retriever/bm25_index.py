@@ -0,0 +1,363 @@
+"""
+Inverted-index BM25 scoring with NumPy postings.
+
+'BM25Index' stores, for every term, the ids of the documents containing it and
+the term frequency in each, as one CSR layout ('offsets' into flat 'doc_ids'
+and 'term_freqs' arrays, doc ids ascending within a term). A query only
+touches the postings of its own terms: their contributions are concatenated
+and summed per document, and the top-k is selected with 'argpartition'. The
+cost therefore grows with the document frequency of the query terms, not with
+the corpus size, and documents without any query term are never scored.
+
+Scores follow BM25 Okapi with the non-negative IDF 'log(1 + (N - n + 0.5) / (n + 0.5))'
+(as in Lucene), so every matching term adds a positive amount. This is what
+makes MaxScore pruning possible: with 'prune=True', terms are processed from
+the highest to the lowest score upper bound, and once the remaining terms
+together cannot lift an unseen document into the top-k, their postings are
+only probed for the documents already in contention. Pruned and unpruned
+searches return the same top-k.
+
+The index is updatable: 'add' and 'delete' only record the change, and the
+postings, IDF, and length statistics are rebuilt in one pass before the next
+search. Deleted documents are tombstoned until 'compact' renumbers the rest. 'save' writes every array as '.npy' next to a JSON vocabulary, and
+'load' memory-maps them, so a server starts without re-tokenising the corpus.
+"""
+
+import itertools
+import json
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from numpy.typing import NDArray
+
+BM25_INDEX_FORMAT_VERSION = 1
+_ARRAYS = (
+    "offsets",
+    "doc_ids",
+    "term_freqs",
+    "doc_lengths",
+    "deleted",
+    "idf",
+    "_length_norms",
+    "_impacts",
+    "_max_impacts",
+)
+
+
+class BM25Index:
+    """
+    BM25 inverted index over tokenised documents.
+
+    Documents are numbered in the order they were added, starting at 0. Deleted
+    documents keep their number and simply stop matching.
+
+    Attributes:
+        k1: Term frequency saturation.
+        b: Document length normalisation.
+        vocabulary: Term to term id.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.vocabulary: dict[str, int] = {}
+        self.offsets: NDArray[np.int64] = np.zeros(1, dtype=np.int64)
+        self.doc_ids: NDArray[np.int32] = np.zeros(0, dtype=np.int32)
+        self.term_freqs: NDArray[np.float32] = np.zeros(0, dtype=np.float32)
+        self.doc_lengths: NDArray[np.float32] = np.zeros(0, dtype=np.float32)
+        self.deleted: NDArray[np.bool_] = np.zeros(0, dtype=bool)
+        self._pending: list[list[str]] = []
+        self._pending_deletes: set[int] = set()
+        self._refresh_statistics()
+
+    @classmethod
+    def build(cls, documents: Iterable[list[str]], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        """Index 'documents', each given as its list of tokens."""
+        index = cls(k1, b)
+        index.add(documents)
+        index.apply_updates()
+        return index
+
+    def __len__(self) -> int:
+        """Number of documents ever added, including deleted ones."""
+        return len(self.doc_lengths) + len(self._pending)
+
+    @property
+    def n_live(self) -> int:
+        """Number of documents that can match."""
+        self.apply_updates()
+        return int(len(self.doc_lengths) - self.deleted.sum())
+
+    def add(self, documents: Iterable[list[str]]) -> range:
+        """Queue 'documents' for indexing and return the ids they are given."""
+        start = len(self)
+        self._pending.extend(documents)
+        return range(start, len(self))
+
+    def delete(self, doc_ids: Iterable[int]) -> None:
+        """Queue documents for removal from every postings list."""
+        for doc_id in doc_ids:
+            if not 0 <= doc_id < len(self):
+                raise IndexError(f"Document {doc_id} is not in the index.")
+            self._pending_deletes.add(doc_id)
+
+    def apply_updates(self) -> None:
+        """
+        Fold queued additions and deletions into the postings and recompute the
+        statistics. Runs automatically before a search; a no-op when nothing changed.
+        """
+        if not self._pending and not self._pending_deletes:
+            return
+
+        term_ids = [np.repeat(np.arange(len(self.offsets) - 1, dtype=np.int64), np.diff(self.offsets))]
+        doc_ids = [np.asarray(self.doc_ids, dtype=np.int64)]
+        term_freqs = [np.asarray(self.term_freqs, dtype=np.float32)]
+        new_terms: list[int] = []
+        new_docs: list[int] = []
+        new_freqs: list[int] = []
+        for doc_id, tokens in enumerate(self._pending, start=len(self.doc_lengths)):
+            for term, freq in Counter(tokens).items():
+                new_terms.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                new_docs.append(doc_id)
+                new_freqs.append(freq)
+        term_ids.append(np.asarray(new_terms, dtype=np.int64))
+        doc_ids.append(np.asarray(new_docs, dtype=np.int64))
+        term_freqs.append(np.asarray(new_freqs, dtype=np.float32))
+
+        self.doc_lengths = np.concatenate(
+            (self.doc_lengths, np.asarray([len(tokens) for tokens in self._pending], dtype=np.float32))
+        )
+        self.deleted = np.concatenate((self.deleted, np.zeros(len(self._pending), dtype=bool)))
+        self.deleted[list(self._pending_deletes)] = True
+        self._pending, self._pending_deletes = [], set()
+
+        all_terms, all_docs, all_freqs = np.concatenate(term_ids), np.concatenate(doc_ids), np.concatenate(term_freqs)
+        live = ~self.deleted[all_docs]
+        all_terms, all_docs, all_freqs = all_terms[live], all_docs[live], all_freqs[live]
+        # Existing postings precede the new ones and have lower doc ids, so a
+        # stable sort by term keeps the doc ids ascending within each postings list
+        order = np.argsort(all_terms, kind="stable")
+        counts = np.bincount(all_terms, minlength=len(self.vocabulary))
+        self.offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        self.doc_ids = all_docs[order].astype(np.int32)
+        self.term_freqs = all_freqs[order]
+        self._refresh_statistics()
+
+    def compact(self) -> NDArray[np.int64]:
+        """
+        Drop deleted documents and renumber the remaining ones consecutively.
+
+        Deleted documents keep their length entry and id until compaction, so
+        an index with many deletions should be compacted now and then. Returns
+        the former ids of the kept documents, in their new order.
+        """
+        self.apply_updates()
+        kept = np.flatnonzero(~self.deleted)
+        new_ids = np.cumsum(~self.deleted, dtype=np.int64) - 1
+        self.doc_ids = new_ids[self.doc_ids].astype(np.int32)
+        self.doc_lengths = self.doc_lengths[kept]
+        self.deleted = np.zeros(len(kept), dtype=bool)
+        self._refresh_statistics()
+        return kept
+
+    def _refresh_statistics(self) -> None:
+        """Recompute IDF, per-document length norms, and per-term score upper bounds over the live documents."""
+        n_live = int(len(self.doc_lengths) - self.deleted.sum())
+        doc_freqs = np.diff(self.offsets).astype(np.float64)
+        self.idf = np.log1p((n_live - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        average_length = float(self.doc_lengths[~self.deleted].mean()) if n_live else 0.0
+        self._length_norms = (self.k1 * (1 - self.b + self.b * self.doc_lengths / (average_length or 1.0))).astype(
+            np.float32
+        )
+        # Score contribution of each posting, and the largest one per term for MaxScore
+        terms = np.repeat(np.arange(len(self.offsets) - 1), np.diff(self.offsets))
+        freqs = self.term_freqs
+        self._impacts = (self.idf[terms] * freqs * (self.k1 + 1) / (freqs + self._length_norms[self.doc_ids])).astype(
+            np.float32
+        )
+        has_postings = self.offsets[:-1] < self.offsets[1:]
+        self._max_impacts = np.zeros(len(self.vocabulary), dtype=np.float32)
+        if has_postings.any():
+            self._max_impacts[has_postings] = np.maximum.reduceat(self._impacts, self.offsets[:-1][has_postings])
+
+    def save(self, path: str | Path) -> None:
+        """Write the index to the directory 'path' (pending updates are applied first)."""
+        self.apply_updates()
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in _ARRAYS:
+            np.save(directory / f"{name.lstrip('_')}.npy", getattr(self, name))
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.__getitem__)
+        (directory / "vocabulary.json").write_text(
+            json.dumps({"format_version": BM25_INDEX_FORMAT_VERSION, "k1": self.k1, "b": self.b, "terms": vocabulary})
+        )
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True) -> "BM25Index":
+        """
+        Load an index written by 'save'. With 'mmap', the arrays are memory-mapped
+        read-only and paged in on demand; the first update copies them into memory.
+        """
+        directory = Path(path)
+        header = json.loads((directory / "vocabulary.json").read_text())
+        if header["format_version"] != BM25_INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index format version {header['format_version']}.")
+        index = cls(header["k1"], header["b"])
+        index.vocabulary = {term: term_id for term_id, term in enumerate(header["terms"])}
+        for name in _ARRAYS:
+            setattr(index, name, np.load(directory / f"{name.lstrip('_')}.npy", mmap_mode="r" if mmap else None))
+        return index
+
+    def _query_terms(self, query_terms: list[str]) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """Known term ids of the query and how often each occurs in it."""
+        counts = Counter(self.vocabulary[term] for term in query_terms if term in self.vocabulary)
+        term_ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+        return term_ids, weights
+
+    def _postings(self, term_id: int) -> tuple[NDArray[np.int32], NDArray[np.float32]]:
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.doc_ids[start:end], self._impacts[start:end]
+
+    def search(
+        self,
+        query_terms: list[str],
+        top_k: int,
+        mask: NDArray[np.bool_] | None = None,
+        prune: bool = False,
+    ) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        Return the ids and scores of the 'top_k' best documents, best first.
+
+        :param query_terms: Tokenised query; repeated terms count repeatedly
+        :param top_k: Number of results
+        :param mask: Optional boolean array of length 'len(self)' restricting the candidate documents
+        :param prune: Use MaxScore to skip full postings traversals that cannot change the top-k
+        """
+        self.apply_updates()
+        term_ids, weights = self._query_terms(query_terms)
+        if top_k <= 0 or term_ids.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+        if prune and term_ids.size > 1:
+            docs, scores = self._max_score(term_ids, weights, top_k, mask)
+        else:
+            docs, scores = self._accumulate(term_ids, weights, mask)
+        return self._top_k(docs, scores, top_k)
+
+    def search_many(
+        self, queries_terms: list[list[str]], top_k: int, mask: NDArray[np.bool_] | None = None
+    ) -> list[tuple[NDArray[np.int64], NDArray[np.float32]]]:
+        """
+        'search' for several queries with one accumulation pass.
+
+        The postings of all queries are concatenated with keys
+        'query * len(self) + doc' and summed with a single 'np.unique' /
+        'np.bincount', so a batch costs one pass over its postings rather than
+        one pass per query. Results equal those of unpruned 'search' per query,
+        up to the choice among documents tied at the 'top_k' cut-off.
+        """
+        self.apply_updates()
+        n_docs = len(self)
+        keys: list[NDArray[np.int64]] = []
+        contributions: list[NDArray[np.float32]] = []
+        for query, query_terms in enumerate(queries_terms):
+            for term_id, weight in zip(*self._query_terms(query_terms)):
+                docs, impacts = self._postings(int(term_id))
+                keys.append(docs.astype(np.int64) + query * n_docs)
+                contributions.append(impacts * weight)
+
+        empty = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        if top_k <= 0 or not keys:
+            return [empty for _ in queries_terms]
+        all_keys, all_contributions = np.concatenate(keys), np.concatenate(contributions)
+        if mask is not None:
+            keep = mask[all_keys % n_docs]
+            all_keys, all_contributions = all_keys[keep], all_contributions[keep]
+        unique_keys, inverse = np.unique(all_keys, return_inverse=True)
+        scores = np.bincount(inverse, weights=all_contributions, minlength=unique_keys.size).astype(np.float32)
+
+        bounds = np.searchsorted(unique_keys, np.arange(len(queries_terms) + 1, dtype=np.int64) * n_docs)
+        return [
+            self._top_k(unique_keys[start:end] - query * n_docs, scores[start:end], top_k)
+            for query, (start, end) in enumerate(itertools.pairwise(bounds))
+        ]
+
+    def get_scores(self, query_terms: list[str]) -> NDArray[np.float32]:
+        """Dense score of every document for 'query_terms' (zero where no term occurs)."""
+        self.apply_updates()
+        scores = np.zeros(len(self), dtype=np.float32)
+        docs, doc_scores = self._accumulate(*self._query_terms(query_terms), None)
+        scores[docs] = doc_scores
+        return scores
+
+    def _accumulate(
+        self, term_ids: NDArray[np.int64], weights: NDArray[np.float32], mask: NDArray[np.bool_] | None
+    ) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """Sum the postings of every query term per document."""
+        if term_ids.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        postings = [self._postings(int(term_id)) for term_id in term_ids]
+        docs = np.concatenate([docs for docs, _ in postings]).astype(np.int64)
+        contributions = np.concatenate([impacts * weight for (_, impacts), weight in zip(postings, weights)])
+        if mask is not None:
+            keep = mask[docs]
+            docs, contributions = docs[keep], contributions[keep]
+        unique_docs, inverse = np.unique(docs, return_inverse=True)
+        return unique_docs, np.bincount(inverse, weights=contributions, minlength=unique_docs.size).astype(np.float32)
+
+    def _max_score(
+        self, term_ids: NDArray[np.int64], weights: NDArray[np.float32], top_k: int, mask: NDArray[np.bool_] | None
+    ) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        """
+        MaxScore evaluation: traverse the postings of the highest-impact terms
+        in full until the upper bound of the remaining terms drops below the
+        current k-th best score, then only probe the remaining postings for the
+        documents already seen (binary search in the sorted doc ids).
+        """
+        bounds = self._max_impacts[term_ids] * weights
+        order = np.argsort(-bounds, kind="stable")
+        term_ids, weights, bounds = term_ids[order], weights[order], bounds[order]
+        remaining = np.concatenate((np.cumsum(bounds[::-1])[::-1][1:], [0.0]))
+
+        essential = 1
+        docs, scores = self._accumulate(term_ids[:1], weights[:1], mask)
+        while essential < term_ids.size and remaining[essential - 1] >= self._threshold(scores, top_k):
+            term_docs, term_scores = self._accumulate(
+                term_ids[essential : essential + 1], weights[essential : essential + 1], mask
+            )
+            docs, inverse = np.unique(np.concatenate((docs, term_docs)), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate((scores, term_scores))).astype(np.float32)
+            essential += 1
+
+        for position in range(essential, term_ids.size):
+            # Drop documents that cannot reach the current k-th best score even with every remaining term
+            alive = scores + remaining[position - 1] >= self._threshold(scores, top_k)
+            docs, scores = docs[alive], scores[alive]
+            posting_docs, impacts = self._postings(int(term_ids[position]))
+            if posting_docs.size == 0:
+                continue
+            slots = np.minimum(np.searchsorted(posting_docs, docs), posting_docs.size - 1)
+            found = posting_docs[slots] == docs
+            scores[found] += impacts[slots[found]] * weights[position]
+        return docs, scores
+
+    @staticmethod
+    def _threshold(scores: NDArray[np.float32], top_k: int) -> float:
+        """The current k-th best score, or 0 while fewer than 'top_k' documents have been seen."""
+        if scores.size < top_k:
+            return 0.0
+        return float(np.partition(scores, scores.size - top_k)[scores.size - top_k])
+
+    @staticmethod
+    def _top_k(
+        docs: NDArray[np.int64], scores: NDArray[np.float32], top_k: int
+    ) -> tuple[NDArray[np.int64], NDArray[np.float32]]:
+        if scores.size > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(scores.size)
+        best = best[np.lexsort((docs[best], -scores[best]))]
+        return docs[best], scores[best]
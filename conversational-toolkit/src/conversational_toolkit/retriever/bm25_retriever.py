@@ -1,50 +1,177 @@
 """
-BM25 lexical retriever backed by 'rank-bm25'.
+BM25 lexical retriever over an in-memory inverted index.
 
-'rank-bm25' provides a well-tested BM25 Okapi implementation and several
-variants (BM25L, BM25Plus). The corpus is tokenised and indexed at construction
-time; retrieval is a pure in-memory operation with no I/O cost per query.
+The corpus is tokenised and indexed into a 'BM25Index' at construction time;
+a query only reads the postings of its own terms, so retrieval cost follows
+how common the query terms are rather than the corpus size, with no I/O per
+query.
 
-Typical usage: initialise from a list of 'ChunkRecord' objects already stored
-in a vector store, then combine with a 'VectorStoreRetriever' inside a
+Typical usage: initialise from the 'ChunkRecord' objects already stored in a
+vector store (see 'BM25Retriever.from_vector_store'), then combine with a 'VectorStoreRetriever' inside a
 'HybridRetriever' for lexical + semantic search.
+
+Metadata filters are resolved through a 'MetadataIndex' over the corpus, and
+only postings of the matching documents are scored.
+
+Records can be added and deleted after construction, and the whole retriever
+can be saved to a directory and loaded back (with memory-mapped postings)
+without tokenising the corpus again.
 """
 
-import re
+import json
+from pathlib import Path
+from typing import Any
 
-from rank_bm25 import BM25Okapi  # type: ignore[import-untyped]
+import numpy as np
+from numpy.typing import NDArray
 
+from conversational_toolkit.retriever.analysis import Analyzer
 from conversational_toolkit.retriever.base import Retriever
-from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord
+from conversational_toolkit.retriever.bm25_index import BM25Index
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+from conversational_toolkit.vectorstores.metadata_index import MetadataIndex
 
 
 class BM25Retriever(Retriever[ChunkMatch]):
     """
-    In-memory BM25 retriever over a fixed corpus of 'ChunkRecord' objects.
+    In-memory BM25 retriever over a corpus of 'ChunkRecord' objects.
 
-    Uses 'rank_bm25.BM25Okapi' under the hood. The corpus is tokenised with a
-    simple word-boundary regex (lowercased) at construction time.
+    The corpus is tokenised with an 'Analyzer' at construction time and
+    indexed into a 'BM25Index'; queries go through the same analyzer. The
+    default analyzer lowercases and splits on word boundaries. Only documents
+    that contain at least one query term are returned.
 
     Attributes:
-        corpus: The indexed document chunks.
+        corpus: The indexed document chunks, by row; rows of deleted records are kept but never match
+            until the deleted fraction exceeds 'compact_threshold' and the index is compacted.
+        index: Inverted BM25 index over the tokenised corpus.
+        analyzer: Text analysis applied to documents and queries.
+        metadata_index: Inverted index over the corpus metadata, used to pre-filter searches.
+        include_embeddings: Whether matches carry the corpus embeddings. Off by
+            default, since downstream consumers rarely need them.
+        prune: Whether searches use MaxScore pruning (same results, fewer postings read).
+        compact_threshold: Fraction of deleted rows above which a deletion compacts the index and corpus.
     """
 
-    def __init__(self, corpus: list[ChunkRecord], top_k: int) -> None:
+    def __init__(
+        self,
+        corpus: list[ChunkRecord],
+        top_k: int,
+        include_embeddings: bool = False,
+        k1: float = 1.5,
+        b: float = 0.75,
+        prune: bool = True,
+        index: BM25Index | None = None,
+        analyzer: Analyzer | None = None,
+        compact_threshold: float = 0.5,
+    ) -> None:
+        """
+        :param index: Prebuilt index whose documents are 'corpus', row for row; built from 'corpus' when None
+        :param analyzer: Tokenisation pipeline (see 'conversational_toolkit.retriever.analysis');
+            must be the one the index was built with
+        :param compact_threshold: Fraction of deleted rows that triggers compaction
+        """
         super().__init__(top_k)
-        self.corpus = corpus
-        tokenized = [self._tokenize(chunk.content) for chunk in corpus]
-        self._bm25 = BM25Okapi(tokenized)
-
-    @staticmethod
-    def _tokenize(text: str) -> list[str]:
-        """Lowercase word-boundary tokenisation."""
-        return re.findall(r"\b\w+\b", text.lower())
-
-    async def retrieve(self, query: str) -> list[ChunkMatch]:
-        """Score the corpus against 'query' using BM25 and return the top 'top_k' matches."""
-        query_terms = self._tokenize(query)
-        scores: list[float] = self._bm25.get_scores(query_terms).tolist()
-        top_indices = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[: self.top_k]
+        self.corpus = list(corpus)
+        self.analyzer = analyzer if analyzer is not None else Analyzer()
+        self.include_embeddings = include_embeddings
+        self.prune = prune
+        self.compact_threshold = compact_threshold
+        if index is None:
+            index = BM25Index.build((self.analyzer.analyze(chunk.content) for chunk in corpus), k1=k1, b=b)
+        elif len(index) != len(corpus):
+            raise ValueError(f"The index holds {len(index)} documents but the corpus has {len(corpus)}.")
+        self.index = index
+        self.metadata_index = MetadataIndex()
+        self.metadata_index.add(chunk.metadata for chunk in corpus)
+        deleted_rows = np.flatnonzero(index.deleted).tolist()
+        self.metadata_index.remove(deleted_rows)
+        # A replaced record has a deleted row and a live one with the same ID
+        self._rows = {chunk.id: row for row, chunk in enumerate(corpus) if not index.deleted[row]}
+        self._version = 0
+
+    @property
+    def version(self) -> int:
+        """Number of 'add_records' and 'delete_records' calls since construction."""
+        return self._version
+
+    @classmethod
+    async def from_vector_store(
+        cls,
+        vector_store: VectorStore,
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        batch_size: int = 1000,
+        **kwargs: Any,
+    ) -> "BM25Retriever":
+        """Build the corpus by streaming every record (optionally filtered) out of 'vector_store'."""
+        corpus = [record async for batch in vector_store.iter_records(batch_size, filters) for record in batch]
+        return cls(corpus, top_k, **kwargs)
+
+    def add_records(self, records: list[ChunkRecord]) -> None:
+        """Index new records; a record whose ID is already indexed replaces the old version."""
+        self._delete_rows([record.id for record in records])
+        rows = self.index.add(self.analyzer.analyze(record.content) for record in records)
+        self.metadata_index.add(record.metadata for record in records)
+        self.corpus.extend(records)
+        self._rows.update((record.id, row) for record, row in zip(records, rows))
+        self._version += 1
+
+    def delete_records(self, ids: list[str]) -> None:
+        """Stop matching the records with these IDs; unknown IDs are ignored."""
+        self._delete_rows(ids)
+        self._version += 1
+
+    def _delete_rows(self, ids: list[str]) -> None:
+        rows = [self._rows.pop(chunk_id) for chunk_id in ids if chunk_id in self._rows]
+        self.index.delete(rows)
+        self.metadata_index.remove(rows)
+        if len(self.corpus) - len(self._rows) > self.compact_threshold * len(self.corpus):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Drop the rows of deleted records from the index, the corpus, and the metadata index."""
+        self.corpus = [self.corpus[row] for row in self.index.compact().tolist()]
+        self.metadata_index = MetadataIndex()
+        self.metadata_index.add(chunk.metadata for chunk in self.corpus)
+        self._rows = {chunk.id: row for row, chunk in enumerate(self.corpus)}
+
+    def save(self, path: str | Path) -> None:
+        """Write the index, the analyzer configuration, and the corpus to the directory 'path'."""
+        directory = Path(path)
+        self.index.save(directory / "index")
+        (directory / "analyzer.json").write_text(json.dumps(self.analyzer.to_dict()))
+        with open(directory / "corpus.jsonl", "w", encoding="utf-8") as corpus_file:
+            corpus_file.writelines(record.model_dump_json() + "\n" for record in self.corpus)
+
+    @classmethod
+    def load(cls, path: str | Path, top_k: int, mmap: bool = True, **kwargs: Any) -> "BM25Retriever":
+        """Load a retriever written by 'save', memory-mapping the index arrays unless 'mmap' is False."""
+        directory = Path(path)
+        with open(directory / "corpus.jsonl", encoding="utf-8") as corpus_file:
+            corpus = [ChunkRecord.model_validate_json(line) for line in corpus_file]
+        if "analyzer" not in kwargs:
+            kwargs["analyzer"] = Analyzer.from_dict(json.loads((directory / "analyzer.json").read_text()))
+        return cls(corpus, top_k, index=BM25Index.load(directory / "index", mmap=mmap), **kwargs)
+
+    async def retrieve(self, query: str, filters: dict[str, Any] | None = None) -> list[ChunkMatch]:
+        """Score the corpus against 'query' using BM25 and return the top 'top_k' matches.
+
+        With 'filters' (see 'conversational_toolkit.vectorstores.filters') only
+        the documents matching the metadata filter are scored.
+        """
+        query_terms = self.analyzer.analyze(query)
+        mask = self.metadata_index.mask(filters) if filters else None
+        top_indices, scores = self.index.search(query_terms, self.top_k, mask=mask, prune=self.prune)
+        return self._matches(top_indices, scores)
+
+    async def retrieve_many(self, queries: list[str], filters: dict[str, Any] | None = None) -> list[list[ChunkMatch]]:
+        """Score all 'queries' in one batched pass over their postings ('BM25Index.search_many')."""
+        mask = self.metadata_index.mask(filters) if filters else None
+        results = self.index.search_many([self.analyzer.analyze(query) for query in queries], self.top_k, mask=mask)
+        return [self._matches(top_indices, scores) for top_indices, scores in results]
+
+    def _matches(self, top_indices: NDArray[np.int64], scores: NDArray[np.float32]) -> list[ChunkMatch]:
         return [
             ChunkMatch(
                 id=self.corpus[i].id,
@@ -52,8 +179,8 @@ class BM25Retriever(Retriever[ChunkMatch]):
                 content=self.corpus[i].content,
                 mime_type=self.corpus[i].mime_type,
                 metadata=self.corpus[i].metadata,
-                embedding=self.corpus[i].embedding,
-                score=scores[i],
+                embedding=self.corpus[i].embedding if self.include_embeddings else [],
+                score=float(score),
             )
-            for i in top_indices
+            for i, score in zip(top_indices.tolist(), scores)
         ]
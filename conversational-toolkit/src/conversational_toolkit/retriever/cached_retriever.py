@@ -0,0 +1,92 @@
+"""
+Retrieval result cache.
+
+Given the index contents, retrieval is deterministic, so the results for a hot
+query can be reused until the index changes. 'CachedRetriever' wraps any
+retriever and keys its results by (normalised query, 'top_k', filters, index
+version). The version comes from the wrapped retriever ('Retriever.version'),
+which follows 'insert_chunks' on the underlying vector stores and record
+updates of a 'BM25Retriever'; after a write, old entries can no longer be hit
+and the cache is cleared on the next lookup.
+
+A cache hit skips query embedding and search entirely. 'retrieve_many' looks
+up every query and passes only the misses, as one batch, to the wrapped retriever.
+"""
+
+import copy
+import json
+from typing import Any
+
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.cache import LRUCache, normalize_query
+from conversational_toolkit.vectorstores.base import ChunkRecord
+
+
+class CachedRetriever(Retriever[ChunkRecord]):
+    """
+    Retriever wrapper that caches result lists.
+
+    Cached results are shared between callers; treat them as read-only.
+
+    Attributes:
+        retriever: The wrapped retriever.
+        cache: Result lists by (query, top_k, filters, version).
+    """
+
+    def __init__(
+        self, retriever: Retriever[Any], maxsize: int = 1024, ttl: float | None = None, top_k: int | None = None
+    ) -> None:
+        """
+        :param retriever: Retriever to wrap
+        :param maxsize: Maximum number of cached result lists
+        :param ttl: Seconds after which a cached result list expires (optional)
+        :param top_k: Number of results (the wrapped retriever's 'top_k' when None)
+        """
+        super().__init__(top_k if top_k is not None else retriever.top_k)
+        self.retriever = retriever
+        self.cache: LRUCache[tuple[str, int, str, int], list[Any]] = LRUCache(maxsize, ttl)
+        self._cached_version = retriever.version
+
+    @property
+    def version(self) -> int:
+        return self.retriever.version
+
+    async def retrieve(self, query: str, filters: dict[str, Any] | None = None) -> list[Any]:
+        """
+        Return the cached results for 'query', or retrieve and cache them.
+
+        'filters' are passed to the wrapped retriever, which must accept them
+        ('VectorStoreRetriever', 'BM25Retriever').
+        """
+        return (await self.retrieve_many([query], filters))[0]
+
+    async def retrieve_many(self, queries: list[str], filters: dict[str, Any] | None = None) -> list[list[Any]]:
+        """
+        Return the results for each of 'queries'; the cache misses are retrieved as one batch.
+
+        'filters' are passed to the wrapped retriever, which must accept them
+        ('VectorStoreRetriever', 'BM25Retriever').
+        """
+        version = self.retriever.version
+        if version != self._cached_version:
+            self.cache.clear()
+            self._cached_version = version
+
+        filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+        keys = [(normalize_query(query), self.top_k, filters_key, version) for query in queries]
+        results: list[list[Any] | None] = [self.cache.get(key) for key in keys]
+        misses = [i for i, cached in enumerate(results) if cached is None]
+        if misses:
+            retriever = self.retriever
+            if retriever.top_k != self.top_k:
+                retriever = copy.copy(retriever)
+                retriever.top_k = self.top_k
+            miss_queries = [queries[i] for i in misses]
+            if filters:
+                retrieved = await retriever.retrieve_many(miss_queries, filters=filters)  # type: ignore[call-arg]
+            else:
+                retrieved = await retriever.retrieve_many(miss_queries)
+            for i, miss_results in zip(misses, retrieved):
+                self.cache.set(keys[i], miss_results)
+                results[i] = miss_results
+        return [list(query_results or []) for query_results in results]
@@ -0,0 +1,185 @@
+"""
+Neighbour-chunk context expansion ("small-to-big" retrieval).
+
+Small chunks match queries precisely but often lack the surrounding sentences
+the LLM needs. 'ContextExpansionRetriever' scores small chunks with a base
+retriever, then grows each hit into a passage by adding the chunks before and
+after it in the source document, within a token budget.
+
+Neighbours are linked at ingestion time: 'link_neighbours' assigns IDs to the
+chunks of each document and stores the IDs of the previous and next chunk in
+their metadata ('prev_chunk_id', 'next_chunk_id'). Pass the returned IDs to
+'insert_chunks'. At query time each hop outwards costs one batched
+'get_chunks_by_ids' call for all hits together.
+
+Hits whose passages touch are merged into a single passage, so the same text is
+never sent twice. Token counts are estimated at 4 characters per token.
+"""
+
+from typing import Any
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+
+PREV_CHUNK_ID = "prev_chunk_id"
+NEXT_CHUNK_ID = "next_chunk_id"
+_CHARS_PER_TOKEN = 4
+
+
+def link_neighbours(chunks: list[Chunk], group_by: str | None = "source_file") -> list[str]:
+    """
+    Assign a new ID to every chunk and record its neighbours' IDs in its metadata.
+
+    Chunks are linked in list order. With 'group_by', only consecutive chunks
+    with the same value of that metadata field (the same source document) are
+    linked. The first and last chunk of a document have no 'prev_chunk_id' /
+    'next_chunk_id' key respectively.
+
+    :param chunks: Chunks in document order; their metadata is updated in place
+    :param group_by: Metadata field identifying the source document, or None to link the whole list
+    :return: The chunk IDs, to pass as 'ids' to 'VectorStore.insert_chunks'
+    """
+    ids = [generate_uid() for _ in chunks]
+    for i, chunk in enumerate(chunks):
+        chunk.metadata.pop(PREV_CHUNK_ID, None)
+        chunk.metadata.pop(NEXT_CHUNK_ID, None)
+        if i > 0 and _same_group(chunks[i - 1], chunk, group_by):
+            chunk.metadata[PREV_CHUNK_ID] = ids[i - 1]
+        if i + 1 < len(chunks) and _same_group(chunk, chunks[i + 1], group_by):
+            chunk.metadata[NEXT_CHUNK_ID] = ids[i + 1]
+    return ids
+
+
+def _same_group(a: Chunk, b: Chunk, group_by: str | None) -> bool:
+    return group_by is None or a.metadata.get(group_by) == b.metadata.get(group_by)
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN
+
+
+class ContextExpansionRetriever(Retriever[ChunkMatch]):
+    """
+    Retriever wrapper that expands each hit with its neighbouring chunks.
+
+    Expansion proceeds ring by ring: first every hit gets its direct neighbours
+    (in rank order, next before previous), then the neighbours at distance two,
+    and so on up to 'window', as long as the total context stays within
+    'max_tokens'. Hits themselves are always kept, in rank order, until the
+    budget is spent.
+
+    Each returned 'ChunkMatch' is one passage: its content is the chunks in
+    document order joined by blank lines, its ID, title, metadata, and score are
+    those of the best hit it contains, and 'metadata["expanded_chunk_ids"]'
+    lists the chunks it is made of.
+
+    Attributes:
+        retriever: The base retriever that scores the small chunks.
+        vector_store: Store the neighbours are fetched from.
+        window: Maximum number of chunks added on each side of a hit.
+        max_tokens: Token budget for all passages together.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever[Any],
+        vector_store: VectorStore,
+        window: int = 1,
+        max_tokens: int = 3000,
+    ) -> None:
+        """
+        :param retriever: Base retriever; its 'top_k' is the number of hits expanded
+        :param vector_store: Store holding the chunks, linked with 'link_neighbours'
+        :param window: Neighbours to add on each side of a hit
+        :param max_tokens: Token budget for the returned passages (4 characters per token)
+        """
+        super().__init__(retriever.top_k)
+        self.retriever = retriever
+        self.vector_store = vector_store
+        self.window = window
+        self.max_tokens = max_tokens
+
+    @property
+    def version(self) -> int:
+        return self.retriever.version + self.vector_store.version
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        """Retrieve hits from the base retriever and return them as token-budgeted passages."""
+        hits: list[ChunkRecord] = (await self.retriever.retrieve(query))[: self.top_k]  # type: ignore[assignment]
+        if not hits:
+            return []
+
+        records: dict[str, ChunkRecord] = {hit.id: hit for hit in hits}
+        budget = self.max_tokens
+        included: list[str] = []
+        for hit in hits:
+            cost = estimate_tokens(hit.content)
+            if cost > budget and included:
+                break
+            included.append(hit.id)
+            budget -= cost
+        hits = hits[: len(included)]
+
+        # Per hit, the outermost chunk reached so far in each direction
+        frontiers = {(hit.id, key): hit.id for hit in hits for key in (NEXT_CHUNK_ID, PREV_CHUNK_ID)}
+        included_set = set(included)
+        for _ in range(self.window):
+            wanted: set[str] = {
+                neighbour_id
+                for (_, key), chunk_id in frontiers.items()
+                if (neighbour_id := records[chunk_id].metadata.get(key)) is not None
+            }
+            missing = [chunk_id for chunk_id in wanted if chunk_id not in records]
+            if missing:
+                for record in await self.vector_store.get_chunks_by_ids(missing):
+                    records[record.id] = record
+
+            grew = False
+            for hit in hits:
+                for key in (NEXT_CHUNK_ID, PREV_CHUNK_ID):
+                    neighbour_id = records[frontiers[hit.id, key]].metadata.get(key)
+                    if neighbour_id is None or neighbour_id not in records:
+                        continue
+                    if neighbour_id not in included_set:
+                        cost = estimate_tokens(records[neighbour_id].content)
+                        if cost > budget:
+                            continue
+                        budget -= cost
+                        included_set.add(neighbour_id)
+                    frontiers[hit.id, key] = neighbour_id
+                    grew = True
+            if not grew:
+                break
+
+        return self._passages(hits, records, included_set)
+
+    @staticmethod
+    def _passages(hits: list[ChunkRecord], records: dict[str, ChunkRecord], included: set[str]) -> list[ChunkMatch]:
+        """Group the included chunks into contiguous passages, one per group of touching hits, in rank order."""
+        passages: list[ChunkMatch] = []
+        placed: set[str] = set()
+        for hit in hits:
+            if hit.id in placed:
+                continue
+            start = hit.id
+            while (prev_id := records[start].metadata.get(PREV_CHUNK_ID)) in included and prev_id not in placed:
+                start = prev_id
+            chain = [start]
+            while (next_id := records[chain[-1]].metadata.get(NEXT_CHUNK_ID)) in included and next_id not in placed:
+                chain.append(next_id)
+            placed.update(chain)
+
+            passages.append(
+                ChunkMatch(
+                    id=hit.id,
+                    title=hit.title,
+                    content="\n\n".join(records[chunk_id].content for chunk_id in chain),
+                    mime_type=hit.mime_type,
+                    metadata={**hit.metadata, "expanded_chunk_ids": chain},
+                    embedding=[],
+                    score=getattr(hit, "score", 0.0),
+                )
+            )
+        return passages
@@ -1,26 +1,85 @@
 """
-Hybrid retriever combining multiple retrievers via Reciprocal Rank Fusion.
+Hybrid retriever combining multiple retrievers with rank or score fusion.
 
 'HybridRetriever' runs all sub-retrievers in parallel (using 'asyncio.gather')
-and merges their ranked result lists with RRF. RRF combines lexical search
-('BM25Retriever') with semantic search ('VectorStoreRetriever') and is robust
-to score-scale differences between the two retrieval methods.
+and merges their ranked result lists. It combines lexical search
+('BM25Retriever') with semantic search ('VectorStoreRetriever'). A batch of
+queries ('retrieve_many') is passed to every sub-retriever as one batch.
 
-The RRF score assigned to each merged 'ChunkMatch' is the sum of
-1 / (k + rank) contributions from each retriever that returned that chunk,
-where 'k' (default 60) dampens the influence of high ranks.
+Fusion methods ('FusionMethod'):
+
+    RRF       sum of w / (k + rank); ignores scores, robust to scale differences
+    MIN_MAX   scores rescaled to [0, 1] per result list, then a weighted sum
+    Z_SCORE   scores standardised per result list, then a weighted sum
+    DBSF      distribution-based score fusion: scores rescaled to [0, 1] using
+              mean +/- 3 standard deviations of the list as bounds, then a weighted sum
+
+Per-retriever weights turn RRF into weighted RRF and set the mix of the score
+based methods. Per-retriever candidate depths limit how many results each
+sub-retriever fetches; 'evaluate_fusion' compares methods, weights, and depths
+on labelled queries to find the smallest depths that keep quality.
+
+Latency is bounded with per-retriever 'timeouts' and a global 'deadline':
+retrievers that have not finished in time are cancelled, the results of the
+others are fused, and the timed-out retrievers are recorded in the request
+metadata ('MetadataProvider') under 'retrieval_timeouts'.
 """
 
 import asyncio
+import copy
+import itertools
+from collections.abc import Sequence
+from dataclasses import dataclass
+from enum import StrEnum
 from typing import Any
 
+import numpy as np
+from loguru import logger
+
 from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.metadata_provider import MetadataProvider
 from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord
 
 
+class FusionMethod(StrEnum):
+    RRF = "rrf"
+    MIN_MAX = "min_max"
+    Z_SCORE = "z_score"
+    DBSF = "dbsf"
+
+
+@dataclass(frozen=True)
+class FusionEvaluation:
+    """Quality of one fusion configuration over a set of labelled queries."""
+
+    fusion: FusionMethod
+    weights: tuple[float, ...]
+    candidate_depths: tuple[int, ...]
+    recall: float
+    mrr: float
+
+
+def _normalized_scores(results: list[ChunkRecord], fusion: FusionMethod) -> list[float]:
+    """Per-list score normalisation for the score-based fusion methods."""
+    scores = np.asarray([getattr(chunk, "score", 0.0) for chunk in results], dtype=np.float64)
+    if scores.size == 0:
+        return []
+    if fusion == FusionMethod.MIN_MAX:
+        spread = scores.max() - scores.min()
+        normalized = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+    elif fusion == FusionMethod.Z_SCORE:
+        std = scores.std()
+        normalized = (scores - scores.mean()) / std if std > 0 else np.zeros_like(scores)
+    else:
+        std = scores.std()
+        lower = scores.mean() - 3 * std
+        normalized = np.clip((scores - lower) / (6 * std), 0.0, 1.0) if std > 0 else np.ones_like(scores)
+    return normalized.tolist()
+
+
 class HybridRetriever(Retriever[ChunkMatch]):
     """
-    Retriever that fuses results from multiple sub-retrievers with RRF.
+    Retriever that fuses results from multiple sub-retrievers.
 
     Sub-retrievers can be of any type ('VectorStoreRetriever', 'BM25Retriever',
     or even other 'HybridRetriever' instances). They are queried in parallel,
@@ -31,26 +90,121 @@ class HybridRetriever(Retriever[ChunkMatch]):
         rrf_k: RRF damping constant. Higher values reduce the advantage of
             top-ranked results. The default of 60 is the standard choice from
             the original RRF paper.
+        include_embeddings: Whether merged matches keep the embeddings returned
+            by the sub-retrievers.
+        fusion: How the result lists are merged.
+        weights: Weight of each sub-retriever in the fusion (all 1.0 by default).
+        candidate_depths: Number of results fetched from each sub-retriever, or
+            None to use each sub-retriever's own 'top_k'.
+        timeouts: Seconds each sub-retriever may take (None entries for no limit).
+        deadline: Seconds after which all unfinished sub-retrievers are cancelled.
     """
 
-    def __init__(self, retrievers: list[Retriever[Any]], top_k: int, rrf_k: int = 60) -> None:
+    def __init__(
+        self,
+        retrievers: list[Retriever[Any]],
+        top_k: int,
+        rrf_k: int = 60,
+        include_embeddings: bool = False,
+        fusion: FusionMethod = FusionMethod.RRF,
+        weights: Sequence[float] | None = None,
+        candidate_depths: Sequence[int] | None = None,
+        timeouts: Sequence[float | None] | None = None,
+        deadline: float | None = None,
+    ) -> None:
         super().__init__(top_k)
+        if weights is not None and len(weights) != len(retrievers):
+            raise ValueError("weights must have one entry per retriever.")
+        if candidate_depths is not None and len(candidate_depths) != len(retrievers):
+            raise ValueError("candidate_depths must have one entry per retriever.")
+        if timeouts is not None and len(timeouts) != len(retrievers):
+            raise ValueError("timeouts must have one entry per retriever.")
         self.retrievers = retrievers
         self.rrf_k = rrf_k
+        self.include_embeddings = include_embeddings
+        self.fusion = FusionMethod(fusion)
+        self.weights = list(weights) if weights is not None else [1.0] * len(retrievers)
+        self.candidate_depths = list(candidate_depths) if candidate_depths is not None else None
+        self.timeouts = list(timeouts) if timeouts is not None else [None] * len(retrievers)
+        self.deadline = deadline
+
+    @property
+    def version(self) -> int:
+        return sum(retriever.version for retriever in self.retrievers)
 
     async def retrieve(self, query: str) -> list[ChunkMatch]:
-        """Query all sub-retrievers in parallel and return the top 'top_k' RRF-merged results."""
-        all_results: list[list[Any]] = await asyncio.gather(*[r.retrieve(query) for r in self.retrievers])
-        return self._rrf_merge(all_results)[: self.top_k]
+        """Query all sub-retrievers in parallel and return the top 'top_k' fused results."""
+        return (await self.retrieve_many([query]))[0]
 
-    def _rrf_merge(self, results_per_retriever: list[list[ChunkRecord]]) -> list[ChunkMatch]:
+    async def retrieve_many(self, queries: list[str]) -> list[list[ChunkMatch]]:
+        """Pass the whole batch to each sub-retriever's 'retrieve_many' and fuse the results per query."""
+        all_results = await self._retrieve_all(queries, self.candidate_depths)
+        return [self._fuse(results, self.fusion, self.weights)[: self.top_k] for results in all_results]
+
+    async def _retrieve_all(self, queries: list[str], depths: Sequence[int] | None) -> list[list[list[Any]]]:
+        """
+        Results of every sub-retriever, in order, for each of 'queries'. A
+        sub-retriever that exceeds its timeout or the deadline contributes
+        empty lists; other errors propagate.
+        """
+        if not queries:
+            return []
+        retrievers = self.retrievers
+        if depths is not None:
+            retrievers = [self._with_depth(r, depth) for r, depth in zip(self.retrievers, depths)]
+        if self.deadline is None and all(timeout is None for timeout in self.timeouts):
+            gathered = await asyncio.gather(*[r.retrieve_many(queries) for r in retrievers])
+            return [list(results) for results in zip(*gathered)]
+
+        tasks = [
+            asyncio.create_task(asyncio.wait_for(r.retrieve_many(queries), timeout))
+            for r, timeout in zip(retrievers, self.timeouts)
+        ]
+        try:
+            await asyncio.wait(tasks, timeout=self.deadline)
+        finally:
+            # Also reached when the caller is cancelled, so no sub-retriever keeps running
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        per_retriever: list[list[list[Any]]] = []
+        timed_out: list[str] = []
+        for index, task in enumerate(tasks):
+            if task.cancelled() or isinstance(task.exception(), TimeoutError):
+                timed_out.append(f"{index}:{type(self.retrievers[index]).__name__}")
+                per_retriever.append([[] for _ in queries])
+            else:
+                per_retriever.append(task.result())
+        if timed_out:
+            logger.warning(f"HybridRetriever returning partial results, timed out: {timed_out}")
+            MetadataProvider.add_metadata({"retrieval_timeouts": timed_out})
+        return [list(results) for results in zip(*per_retriever)]
+
+    @staticmethod
+    def _with_depth(retriever: Retriever[Any], depth: int) -> Retriever[Any]:
+        """A shallow copy of 'retriever' that fetches 'depth' results; the original is left untouched."""
+        if retriever.top_k == depth:
+            return retriever
+        sized = copy.copy(retriever)
+        sized.top_k = depth
+        return sized
+
+    def _fuse(
+        self, results_per_retriever: list[list[ChunkRecord]], fusion: FusionMethod, weights: Sequence[float]
+    ) -> list[ChunkMatch]:
         fused_scores: dict[str, float] = {}
         chunk_map: dict[str, ChunkRecord] = {}
 
-        for ranked_list in results_per_retriever:
-            for rank, chunk in enumerate(ranked_list, start=1):
-                fused_scores[chunk.id] = fused_scores.get(chunk.id, 0.0) + 1.0 / (self.rrf_k + rank)
-                chunk_map[chunk.id] = chunk
+        for ranked_list, weight in zip(results_per_retriever, weights):
+            if fusion == FusionMethod.RRF:
+                contributions = [1.0 / (self.rrf_k + rank) for rank in range(1, len(ranked_list) + 1)]
+            else:
+                contributions = _normalized_scores(ranked_list, fusion)
+            for chunk, contribution in zip(ranked_list, contributions):
+                fused_scores[chunk.id] = fused_scores.get(chunk.id, 0.0) + weight * contribution
+                chunk_map.setdefault(chunk.id, chunk)
 
         return [
             ChunkMatch(
@@ -59,8 +213,59 @@ class HybridRetriever(Retriever[ChunkMatch]):
                 content=chunk_map[cid].content,
                 mime_type=chunk_map[cid].mime_type,
                 metadata=chunk_map[cid].metadata,
-                embedding=chunk_map[cid].embedding,
+                embedding=chunk_map[cid].embedding if self.include_embeddings else [],
                 score=fused_scores[cid],
             )
             for cid in sorted(fused_scores, key=lambda c: fused_scores[c], reverse=True)
         ]
+
+    async def evaluate_fusion(
+        self,
+        queries: list[str],
+        relevant_chunk_ids: list[set[str]],
+        fusions: Sequence[FusionMethod] = tuple(FusionMethod),
+        weight_grid: Sequence[Sequence[float]] | None = None,
+        depth_grid: Sequence[Sequence[int]] | None = None,
+    ) -> list[FusionEvaluation]:
+        """
+        Offline comparison of fusion configurations on labelled queries.
+
+        Every sub-retriever is queried once, with the whole batch of queries, at
+        the largest depth in 'depth_grid'; smaller depths reuse the prefix of
+        those lists, so the whole grid costs one batched retrieval pass. Each configuration is scored by
+        recall@top_k and MRR@top_k of the fused list against 'relevant_chunk_ids'.
+
+        :param queries: Evaluation queries
+        :param relevant_chunk_ids: Ground-truth chunk IDs per query
+        :param fusions: Fusion methods to compare
+        :param weight_grid: Weight vectors to compare (the current weights when None)
+        :param depth_grid: Candidate depth vectors to compare (the current depths when None)
+        :return: One 'FusionEvaluation' per configuration, best recall first (MRR breaks ties)
+        """
+        if len(queries) != len(relevant_chunk_ids):
+            raise ValueError("queries and relevant_chunk_ids must have the same length.")
+        current_depths = self.candidate_depths or [r.top_k for r in self.retrievers]
+        weight_grid = weight_grid or [self.weights]
+        depth_grid = depth_grid or [current_depths]
+        max_depths = [max(depths[i] for depths in depth_grid) for i in range(len(self.retrievers))]
+
+        deep_results = await self._retrieve_all(queries, max_depths)
+
+        evaluations = []
+        for fusion, weights, depths in itertools.product(fusions, weight_grid, depth_grid):
+            recall = mrr = 0.0
+            for results, relevant in zip(deep_results, relevant_chunk_ids):
+                truncated = [ranked[:depth] for ranked, depth in zip(results, depths)]
+                top_ids = [match.id for match in self._fuse(truncated, fusion, weights)[: self.top_k]]
+                recall += len(relevant.intersection(top_ids)) / len(relevant) if relevant else 0.0
+                mrr += next((1.0 / rank for rank, cid in enumerate(top_ids, start=1) if cid in relevant), 0.0)
+            evaluations.append(
+                FusionEvaluation(
+                    fusion=FusionMethod(fusion),
+                    weights=tuple(weights),
+                    candidate_depths=tuple(depths),
+                    recall=recall / max(len(queries), 1),
+                    mrr=mrr / max(len(queries), 1),
+                )
+            )
+        return sorted(evaluations, key=lambda e: (e.recall, e.mrr), reverse=True)
@@ -0,0 +1,146 @@
+"""
+Maximal Marginal Relevance (MMR) diversification.
+
+'MMRRetriever' wraps a base retriever and re-selects its candidates so that
+near-duplicates (the same paragraph from several versions of a brochure) do not
+fill the whole context. Each step picks the candidate maximising
+
+    lambda_mult * relevance - (1 - lambda_mult) * max similarity to already selected results
+
+Relevance is the base retriever's score rescaled to [0, 1], so any retriever
+(vector, BM25, hybrid, reranked) can be diversified. Similarity is the cosine
+similarity between the stored chunk embeddings, computed for all candidate
+pairs in one matrix product; no embedding model is called.
+"""
+
+import copy
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+
+
+class MMRRetriever(Retriever[ChunkMatch]):
+    """
+    Retriever wrapper that diversifies results with Maximal Marginal Relevance.
+
+    Candidates need embeddings: either the base retriever returns them
+    ('include_embeddings=True'), or a 'vector_store' is given and missing
+    embeddings are fetched from it by ID in one batched lookup. Candidates
+    without any embedding are never penalised for redundancy.
+
+    Attributes:
+        retriever: The base retriever that supplies the candidate pool.
+        lambda_mult: Trade-off between relevance (1.0, plain ranking) and diversity (0.0).
+        vector_store: Store to fetch missing candidate embeddings from (optional).
+        include_embeddings: Whether results keep their embeddings.
+    """
+
+    def __init__(
+        self,
+        retriever: Retriever[Any],
+        top_k: int,
+        lambda_mult: float = 0.5,
+        candidate_pool: int | None = None,
+        vector_store: VectorStore | None = None,
+        include_embeddings: bool = False,
+    ) -> None:
+        """
+        :param retriever: Base retriever supplying the candidates
+        :param top_k: Number of diversified results to return
+        :param lambda_mult: Weight of relevance against diversity, between 0 and 1
+        :param candidate_pool: Number of candidates to fetch from 'retriever' (its own 'top_k' when None)
+        :param vector_store: Store holding the candidates' embeddings, used when the retriever omits them
+        :param include_embeddings: Whether results keep their embeddings
+        """
+        super().__init__(top_k)
+        if not 0.0 <= lambda_mult <= 1.0:
+            raise ValueError("lambda_mult must be between 0 and 1.")
+        if candidate_pool is not None and candidate_pool != retriever.top_k:
+            retriever = copy.copy(retriever)
+            retriever.top_k = candidate_pool
+        self.retriever = retriever
+        self.lambda_mult = lambda_mult
+        self.vector_store = vector_store
+        self.include_embeddings = include_embeddings
+
+    @property
+    def version(self) -> int:
+        return self.retriever.version + (self.vector_store.version if self.vector_store is not None else 0)
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        """Fetch candidates from the base retriever and return 'top_k' of them selected by MMR."""
+        candidates: list[ChunkRecord] = await self.retriever.retrieve(query)  # type: ignore[assignment]
+        if not candidates:
+            return []
+
+        embeddings = await self._embeddings(candidates)
+        selected = mmr_select(
+            np.asarray([getattr(chunk, "score", 0.0) for chunk in candidates], dtype=np.float64),
+            embeddings,
+            min(self.top_k, len(candidates)),
+            self.lambda_mult,
+        )
+        return [
+            ChunkMatch(
+                id=candidates[i].id,
+                title=candidates[i].title,
+                content=candidates[i].content,
+                mime_type=candidates[i].mime_type,
+                metadata=candidates[i].metadata,
+                embedding=embeddings[i].tolist() if self.include_embeddings and embeddings[i].any() else [],
+                score=getattr(candidates[i], "score", 0.0),
+            )
+            for i in selected
+        ]
+
+    async def _embeddings(self, candidates: list[ChunkRecord]) -> NDArray[np.float64]:
+        """Candidate embeddings as a matrix, zero rows for candidates whose embedding is unknown."""
+        by_id = {chunk.id: chunk.embedding for chunk in candidates if chunk.embedding}
+        missing = [chunk.id for chunk in candidates if chunk.id not in by_id]
+        if missing and self.vector_store is not None:
+            for record in await self.vector_store.get_chunks_by_ids(missing, include_embeddings=True):
+                if record.embedding:
+                    by_id[record.id] = record.embedding
+        if not by_id:
+            return np.zeros((len(candidates), 0), dtype=np.float64)
+
+        dim = len(next(iter(by_id.values())))
+        matrix = np.zeros((len(candidates), dim), dtype=np.float64)
+        for row, chunk in enumerate(candidates):
+            if chunk.id in by_id:
+                matrix[row] = by_id[chunk.id]
+        return matrix
+
+
+def mmr_select(scores: NDArray[np.float64], embeddings: NDArray[np.float64], k: int, lambda_mult: float) -> list[int]:
+    """
+    Greedy MMR selection.
+
+    :param scores: Relevance score per candidate (any scale; rescaled to [0, 1])
+    :param embeddings: One embedding per candidate (zero rows are never redundant)
+    :param k: Number of candidates to select
+    :param lambda_mult: Weight of relevance against diversity
+    :return: Indices of the selected candidates, in selection order
+    """
+    spread = scores.max() - scores.min() if scores.size else 0.0
+    relevance = (scores - scores.min()) / spread if spread > 0 else np.ones_like(scores)
+
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    unit = np.divide(embeddings, norms, out=np.zeros_like(embeddings), where=norms > 0)
+    similarity = unit @ unit.T
+
+    selected: list[int] = []
+    max_similarity = np.zeros(len(scores), dtype=np.float64)
+    available = np.ones(len(scores), dtype=bool)
+    for _ in range(k):
+        mmr = lambda_mult * relevance - (1 - lambda_mult) * max_similarity
+        mmr[~available] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        available[best] = False
+        max_similarity = np.maximum(max_similarity, similarity[best])
+    return selected
@@ -14,6 +14,13 @@ intentionally separate.
 
 If the LLM call fails or returns unparseable JSON the retriever falls back to
 the original ranking from the base retriever, so the pipeline never breaks.
+
+Successful rankings are cached by (normalised query, fingerprint of the ordered
+candidate IDs, reranker model, base retriever version), so a repeated query
+over an unchanged candidate pool reuses the ranking instead of paying for
+another LLM call. The version changes when the indexed contents change, so a
+chunk edited in place (same ID, new content) is ranked again. Fallback
+orderings are never cached.
 """
 
 import json
@@ -24,6 +31,7 @@ from loguru import logger
 
 from conversational_toolkit.llms.base import LLM, LLMMessage, Roles
 from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.cache import LRUCache, fingerprint, normalize_query
 from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord
 
 
@@ -41,12 +49,31 @@ class RerankingRetriever(Retriever[ChunkMatch]):
         retriever: The base retriever that supplies the candidate pool.
         llm: The language model used for reranking. A fast, cheap model is
             recommended since the reranking prompt is simple.
+        include_embeddings: Whether reranked matches keep the embeddings
+            returned by the base retriever.
+        cache: Rankings by (query, candidates, model, version), or None when caching is disabled.
     """
 
-    def __init__(self, retriever: Retriever[Any], llm: LLM, top_k: int) -> None:
+    def __init__(
+        self,
+        retriever: Retriever[Any],
+        llm: LLM,
+        top_k: int,
+        include_embeddings: bool = False,
+        cache_size: int | None = 1024,
+        cache_ttl: float | None = 3600.0,
+    ) -> None:
         super().__init__(top_k)
         self.retriever = retriever
         self.llm = llm
+        self.include_embeddings = include_embeddings
+        self.cache: LRUCache[tuple[str, str, str, int], tuple[int, ...]] | None = (
+            LRUCache(cache_size, cache_ttl) if cache_size else None
+        )
+
+    @property
+    def version(self) -> int:
+        return self.retriever.version
 
     async def retrieve(self, query: str) -> list[ChunkMatch]:
         """Fetch candidates from the base retriever and rerank them with the LLM."""
@@ -54,7 +81,7 @@ class RerankingRetriever(Retriever[ChunkMatch]):
         if not candidates:
             return []
 
-        ranked_indices = await self._llm_rerank(query, candidates)
+        ranked_indices = await self._cached_rerank(query, candidates)
         n = len(ranked_indices)
         results: list[ChunkMatch] = []
         for position, original_idx in enumerate(ranked_indices[: self.top_k]):
@@ -67,17 +94,33 @@ class RerankingRetriever(Retriever[ChunkMatch]):
                     content=chunk.content,
                     mime_type=chunk.mime_type,
                     metadata=chunk.metadata,
-                    embedding=chunk.embedding,
+                    embedding=chunk.embedding if self.include_embeddings else [],
                     score=score,
                 )
             )
         return results
 
-    async def _llm_rerank(self, query: str, candidates: list[ChunkRecord]) -> list[int]:
+    async def _cached_rerank(self, query: str, candidates: list[ChunkRecord]) -> list[int]:
+        """Ranking from the cache, or from the LLM (original order if the LLM call fails)."""
+        if self.cache is None:
+            return await self._llm_rerank(query, candidates) or list(range(len(candidates)))
+
+        model = str(getattr(self.llm, "model", type(self.llm).__name__))
+        key = (normalize_query(query), fingerprint(chunk.id for chunk in candidates), model, self.retriever.version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return list(cached)
+
+        ranking = await self._llm_rerank(query, candidates)
+        if ranking is None:
+            return list(range(len(candidates)))
+        self.cache.set(key, tuple(ranking))
+        return ranking
+
+    async def _llm_rerank(self, query: str, candidates: list[ChunkRecord]) -> list[int] | None:
         """Ask the LLM to rank the candidates and return a list of original indices.
 
-        Returns the original order as a fallback if the LLM call fails or
-        produces invalid JSON.
+        Returns None if the LLM call fails or produces invalid JSON.
         """
         numbered = "\n\n".join(
             f"[{i}] {chunk.title or '(no title)'}\n{chunk.content[:400]}" for i, chunk in enumerate(candidates)
@@ -113,4 +156,4 @@ class RerankingRetriever(Retriever[ChunkMatch]):
             return ranking
         except Exception as exc:
             logger.warning(f"RerankingRetriever LLM call failed, using original order: {exc}")
-            return list(range(len(candidates)))
+            return None
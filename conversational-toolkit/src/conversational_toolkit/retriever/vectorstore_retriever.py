@@ -1,15 +1,49 @@
+from typing import Any
+
 from conversational_toolkit.embeddings.base import EmbeddingsModel
 from conversational_toolkit.retriever.base import Retriever
 from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch
 
 
 class VectorStoreRetriever(Retriever[ChunkMatch]):
-    def __init__(self, embedding_model: EmbeddingsModel, vector_store: VectorStore, top_k: int):
+    def __init__(
+        self,
+        embedding_model: EmbeddingsModel,
+        vector_store: VectorStore,
+        top_k: int,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ):
         super().__init__(top_k)
         self.embedding_model = embedding_model
         self.vector_store = vector_store
+        self.include_embeddings = include_embeddings
+        self.min_score = min_score
+
+    @property
+    def version(self) -> int:
+        return self.vector_store.version
 
-    async def retrieve(self, query: str) -> list[ChunkMatch]:
+    async def retrieve(self, query: str, filters: dict[str, Any] | None = None) -> list[ChunkMatch]:
         embeddings = await self.embedding_model.get_embeddings(query)
-        results = await self.vector_store.get_chunks_by_embedding(embeddings[0], self.top_k)
+        results = await self.vector_store.get_chunks_by_embedding(
+            embeddings[0],
+            self.top_k,
+            filters=filters,
+            include_embeddings=self.include_embeddings,
+            min_score=self.min_score,
+        )
         return results
+
+    async def retrieve_many(self, queries: list[str], filters: dict[str, Any] | None = None) -> list[list[ChunkMatch]]:
+        """Embed all 'queries' in one call and search the vector store with the whole batch."""
+        if not queries:
+            return []
+        embeddings = await self.embedding_model.get_embeddings(queries)
+        return await self.vector_store.get_chunks_by_embeddings(
+            embeddings,
+            self.top_k,
+            filters=filters,
+            include_embeddings=self.include_embeddings,
+            min_score=self.min_score,
+        )
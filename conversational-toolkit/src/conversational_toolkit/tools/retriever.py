@@ -1,7 +1,8 @@
 from typing import Any
 
-from conversational_toolkit.llms.base import LLM
+from conversational_toolkit.llms.base import LLM, LLMMessage
 from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.utils.cache import LRUCache, fingerprint
 from conversational_toolkit.utils.retriever import (
     make_query_standalone,
     query_expansion,
@@ -12,6 +13,14 @@ from conversational_toolkit.vectorstores.base import ChunkRecord
 
 
 class RetrieverTool(Tool):
+    """
+    Tool that retrieves document chunks for the query of a tool call.
+
+    Expanded queries are retrieved as one batch ('Retriever.retrieve_many').
+    Standalone rewrites are memoised per (history, query), so repeated tool
+    calls within one agent turn rewrite the query only once.
+    """
+
     def __init__(
         self,
         name: str,
@@ -20,6 +29,8 @@ class RetrieverTool(Tool):
         llm: LLM,
         retriever: Retriever[ChunkRecord],
         number_query_expansion: int = 0,
+        standalone_cache_size: int = 256,
+        standalone_cache_ttl: float | None = 600.0,
     ):
         self.name = name
         self.description = description
@@ -27,19 +38,20 @@ class RetrieverTool(Tool):
         self.llm = llm
         self.retriever = retriever
         self.number_query_expansion = number_query_expansion
+        self.standalone_queries: LRUCache[tuple[str, str], str] = LRUCache(standalone_cache_size, standalone_cache_ttl)
 
     async def call(self, args: dict[str, Any]) -> dict[str, Any]:
         history = args.get("_history", [])
         query = str(args.get("_query"))
 
         if len(history) > 0:
-            query = await make_query_standalone(self.llm, history, query)
+            query = await self._standalone_query(history, query)
         if self.number_query_expansion > 0:
             queries = await query_expansion(query, self.llm, self.number_query_expansion)
         else:
             queries = [query]
 
-        retrieved = [await self.retriever.retrieve(q) for q in queries]
+        retrieved = await self.retriever.retrieve_many(queries)
         sources = reciprocal_rank_fusion(retrieved)[: self.retriever.top_k]
 
         json_chunks = [
@@ -54,3 +66,11 @@ class RetrieverTool(Tool):
         ]
 
         return {"_sources": json_chunks}
+
+    async def _standalone_query(self, history: list[LLMMessage], query: str) -> str:
+        key = (fingerprint(f"{message.role}:{message.content}" for message in history), query)
+        standalone = self.standalone_queries.get(key)
+        if standalone is None:
+            standalone = await make_query_standalone(self.llm, history, query)
+            self.standalone_queries.set(key, standalone)
+        return standalone
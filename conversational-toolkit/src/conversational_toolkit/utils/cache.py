@@ -0,0 +1,99 @@
+"""
+Bounded in-process cache with least-recently-used eviction and optional expiry.
+
+'LRUCache' is shared by the components that memoise lookups (chunk records,
+reranking scores, retrieval results, ...) so they all bound memory the same
+way. It is not thread-safe; it is meant for use from a single event loop.
+
+'normalize_query' and 'fingerprint' build cache keys: near-identical queries
+('What is a pallet? ' vs 'what is a  pallet') share a key, and an ordered list
+of chunk IDs is reduced to a short digest.
+"""
+
+import hashlib
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from typing import Generic, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Cache-key form of a query: NFKC-normalised, case-folded, whitespace collapsed, trailing punctuation dropped."""
+    normalized = _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", query).casefold()).strip()
+    return normalized.rstrip("?!.,;: ")
+
+
+def fingerprint(ids: Iterable[str]) -> str:
+    """Order-sensitive digest of a sequence of IDs."""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in ids:
+        digest.update(item.encode())
+        digest.update(b"\x1f")
+    return digest.hexdigest()
+
+
+class LRUCache(Generic[K, V]):
+    """
+    Mapping that holds at most 'maxsize' entries, evicting the least recently used.
+
+    Attributes:
+        maxsize: Maximum number of entries kept.
+        ttl: Seconds after which an entry expires, or None to keep entries until evicted.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that found no live entry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive.")
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self._live_entry(key) is not None
+
+    def get(self, key: K, default: V | None = None) -> V | None:
+        """Return the value for 'key' and mark it as recently used, or 'default' on a miss."""
+        entry = self._live_entry(key)
+        if entry is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """Store 'value' under 'key', evicting the least recently used entry when full."""
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: K, default: V | None = None) -> V | None:
+        """Remove 'key' and return its value, or 'default' if it is not cached."""
+        entry = self._entries.pop(key, None)
+        return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def _live_entry(self, key: K) -> tuple[float, V] | None:
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        return entry
@@ -7,11 +7,14 @@ the store. 'ChunkMatch' further extends 'ChunkRecord' with a relevance score
 returned after a similarity search. This three-level hierarchy preserves type
 safety at each stage of the pipeline without duplicating fields.
 
-Concrete implementations: 'ChromaDBVectorStore', 'PGVectorStore'.
+Concrete implementations: 'ChromaDBVectorStore', 'PGVectorStore', 'InMemoryVectorStore',
+and 'ShardedVectorStore', which partitions a collection across other stores.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Union, Any
+from collections.abc import AsyncIterator
+from typing import Any
 
 import numpy as np
 from numpy.typing import NDArray
@@ -40,21 +43,92 @@ class VectorStore(ABC):
     for embedded document chunks. The embedding array passed to 'insert_chunks'
     has shape '(len(chunks), embedding_size)', with rows corresponding to chunks
     in the same order.
+
+    'version' counts the writes made through the instance, so caches of
+    retrieval results or answers can tell when the contents have changed.
+    Writes by other processes to a shared database are not counted.
     """
 
+    _version: int = 0
+
+    @property
+    def version(self) -> int:
+        """Number of writes made through this instance; increases on every 'insert_chunks'."""
+        return self._version
+
+    def _bump_version(self) -> None:
+        self._version += 1
+
     @abstractmethod
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
-        """Persist 'chunks' together with their pre-computed 'embedding' matrix."""
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
+        """Persist 'chunks' together with their pre-computed 'embedding' matrix.
+
+        New UUIDs are generated unless 'ids' provides them, e.g. when restoring
+        a snapshot whose IDs are referenced elsewhere.
+        """
         pass
 
     @abstractmethod
     async def get_chunks_by_embedding(
-        self, embedding: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
     ) -> list[ChunkMatch]:
-        """Return the 'top_k' most similar chunks to 'embedding', optionally filtered by metadata."""
+        """Return the 'top_k' most similar chunks to 'embedding', optionally filtered by metadata.
+
+        Every store reports 'score' as the cosine similarity to the query
+        (higher is better), so scores can be thresholded and fused across
+        backends. Matches scoring below 'min_score' are dropped, which may
+        leave fewer than 'top_k' results.
+
+        Matches carry an empty 'embedding' unless 'include_embeddings' is set,
+        so the query path does not transfer and allocate a vector per hit.
+        """
+        pass
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """Run 'get_chunks_by_embedding' for every row of 'embeddings' and return the result lists in order.
+
+        The default issues the searches concurrently; stores that can search a
+        batch of queries in one call override it.
+        """
+        return await asyncio.gather(
+            *(
+                self.get_chunks_by_embedding(embedding, top_k, filters, include_embeddings, min_score)
+                for embedding in np.atleast_2d(embeddings)
+            )
+        )
+
+    @abstractmethod
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
+        """Fetch specific chunks by their stored IDs in a single round-trip.
+
+        Records are returned in the order of 'chunk_ids'; IDs that are not in
+        the store are skipped.
+        """
         pass
 
     @abstractmethod
-    async def get_chunks_by_ids(self, chunk_ids: Union[int, list[int]]) -> list[Chunk]:
-        """Fetch specific chunks by their stored IDs."""
+    def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """Stream every stored chunk (optionally filtered by metadata) in batches of at most 'batch_size'.
+
+        This is the way to enumerate the collection, e.g. to build a lexical
+        index or an export, in bounded memory and without scoring any rows.
+        """
         pass
@@ -0,0 +1,126 @@
+"""
+LRU cache in front of a vector store's ID lookups.
+
+Neighbour expansion and citation hydration fetch the same popular chunks over
+and over. 'CachedVectorStore' wraps any 'VectorStore' and answers
+'get_chunks_by_ids' from an 'LRUCache' where it can, fetching only the missing
+IDs from the underlying store in one batched call. Similarity search and
+scans are passed through unchanged.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.cache import LRUCache
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+
+
+class CachedVectorStore(VectorStore):
+    """
+    Vector store wrapper that caches chunk records by ID.
+
+    Records written through 'insert_chunks' with explicit IDs are evicted, so
+    re-inserting a chunk never serves the stale version. Writes that bypass
+    the wrapper are only picked up once entries expire ('ttl') or after
+    'cache.clear()'.
+
+    Attributes:
+        vector_store: The wrapped store.
+        cache: Records by chunk ID.
+    """
+
+    def __init__(self, vector_store: VectorStore, maxsize: int = 10_000, ttl: float | None = None) -> None:
+        """
+        :param vector_store: Store to wrap
+        :param maxsize: Maximum number of cached records
+        :param ttl: Seconds after which a cached record expires (optional)
+        """
+        self.vector_store = vector_store
+        self.cache: LRUCache[str, ChunkRecord] = LRUCache(maxsize, ttl)
+
+    @property
+    def version(self) -> int:
+        """Version of the wrapped store."""
+        return self.vector_store.version
+
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
+        """
+        Insert through the wrapped store and evict any cached records with the same IDs.
+
+        :param chunks: List of document chunks
+        :param embedding: Corresponding embedding vectors
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
+        """
+        await self.vector_store.insert_chunks(chunks, embedding, ids=ids)
+        for chunk_id in ids or []:
+            self.cache.pop(chunk_id)
+
+    async def get_chunks_by_embedding(
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[ChunkMatch]:
+        """Similarity search on the wrapped store; results are not cached."""
+        return await self.vector_store.get_chunks_by_embedding(embedding, top_k, filters, include_embeddings, min_score)
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """Batched similarity search on the wrapped store; results are not cached."""
+        return await self.vector_store.get_chunks_by_embeddings(
+            embeddings, top_k, filters, include_embeddings, min_score
+        )
+
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
+        """
+        Return cached records and fetch the missing ones in a single call, in the order requested.
+
+        A cached record without its embedding counts as a miss when
+        'include_embeddings' is set.
+
+        :param chunk_ids: A single ID or a list of IDs
+        :param include_embeddings: Whether to return the stored embedding with each record
+        :return: List of retrieved chunk records
+        """
+        ids = [chunk_ids] if isinstance(chunk_ids, str) else chunk_ids
+        records: dict[str, ChunkRecord] = {}
+        for chunk_id in dict.fromkeys(ids):
+            record = self.cache.get(chunk_id)
+            if record is not None and (record.embedding or not include_embeddings):
+                records[chunk_id] = record
+
+        missing = [chunk_id for chunk_id in dict.fromkeys(ids) if chunk_id not in records]
+        if missing:
+            for record in await self.vector_store.get_chunks_by_ids(missing, include_embeddings):
+                self.cache.set(record.id, record)
+                records[record.id] = record
+
+        if include_embeddings:
+            return [records[chunk_id] for chunk_id in ids if chunk_id in records]
+        return [
+            records[chunk_id].model_copy(update={"embedding": []}) if records[chunk_id].embedding else records[chunk_id]
+            for chunk_id in ids
+            if chunk_id in records
+        ]
+
+    def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """Scan the wrapped store; records are not cached."""
+        return self.vector_store.iter_records(batch_size, filters, include_embeddings)
@@ -1,44 +1,108 @@
 import json
 import chromadb
+from collections.abc import AsyncIterator
+from enum import StrEnum
 from typing import Any
 import numpy as np
+from loguru import logger
 from numpy.typing import NDArray
 
 from conversational_toolkit.chunking.base import Chunk
 from conversational_toolkit.utils.database import generate_uid
-from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch
+from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch, ChunkRecord
+from conversational_toolkit.vectorstores.filters import FilterClause, FilterNode, parse_filters
+
+# Reserved metadata key listing the fields stored as JSON strings
+_JSON_FIELDS_KEY = "_json_fields"
+
+# ChromaDB rejects empty '$in'/'$nin' operands and has no boolean literals, so
+# an empty membership test is rendered as a condition on the always-present title
+_NEVER: dict[str, Any] = {"$and": [{"title": {"$eq": ""}}, {"title": {"$ne": ""}}]}
+_ALWAYS: dict[str, Any] = {"$or": [{"title": {"$eq": ""}}, {"title": {"$ne": ""}}]}
+
+
+def _element_key(field: str, element: Any) -> str:
+    """Reserved metadata key flagging that the list field 'field' contains 'element'."""
+    if isinstance(element, float) and element.is_integer():
+        element = int(element)
+    return f"{field}[{json.dumps(element)}]"
+
+
+class DistanceSpace(StrEnum):
+    """Distance function of a ChromaDB collection's HNSW index ('hnsw:space')."""
+
+    COSINE = "cosine"
+    L2 = "l2"
+    IP = "ip"
 
 
 class ChromaDBVectorStore(VectorStore):
-    def __init__(self, db_path: str, collection_name: str = "default_collection"):
+    def __init__(
+        self,
+        db_path: str,
+        collection_name: str = "default_collection",
+        distance_space: DistanceSpace = DistanceSpace.COSINE,
+    ):
         """
         Initialize the ChromaDB vector store.
 
+        The distance space is fixed when a collection is created; an existing
+        collection keeps its own space, which is then used to convert distances
+        into scores.
+
         :param db_path: Path to store the ChromaDB database.
         :param collection_name: Name of the collection within the database.
+        :param distance_space: Distance function for a newly created collection.
         """
         self.client = chromadb.PersistentClient(path=db_path)
-        self.collection = self.client.get_or_create_collection(name=collection_name)
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name, metadata={"hnsw:space": str(distance_space)}
+        )
+        self.distance_space = self._collection_space()
+        if self.distance_space != distance_space:
+            logger.warning(
+                f"Collection '{collection_name}' uses the '{self.distance_space}' distance space, not '{distance_space}'"
+            )
+
+    def _collection_space(self) -> DistanceSpace:
+        configuration = self.collection.configuration or {}
+        space = (configuration.get("hnsw") or {}).get("space")  # type: ignore[union-attr]
+        if space is None:
+            # Collections created before the space was configurable default to squared L2
+            space = (self.collection.metadata or {}).get("hnsw:space", DistanceSpace.L2)
+        return DistanceSpace(space)
+
+    def _to_score(self, distance: float) -> float:
+        """
+        Convert a ChromaDB distance into a cosine similarity (higher is better).
+
+        Cosine distance is '1 - cos' and inverts exactly. Inner-product distance
+        is '1 - dot' and squared L2 is '|a|^2 + |b|^2 - 2 dot'; both give the
+        cosine for unit-normalized embeddings and an order-preserving proxy
+        otherwise.
+        """
+        if self.distance_space == DistanceSpace.L2:
+            return 1.0 - distance / 2.0
+        return 1.0 - distance
 
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
         """
         Insert chunks into ChromaDB.
 
         :param chunks: List of document chunks
         :param embedding: Corresponding embedding vectors
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
         """
         documents = []
         metadatas = []
-        ids = []
+        if ids is None:
+            ids = [str(generate_uid()) for _ in chunks]
 
         for chunk, _ in zip(chunks, embedding):
-            doc_id = str(generate_uid())
             documents.append(chunk.content)
-            raw_meta = {"title": chunk.title, "mime_type": chunk.mime_type, **chunk.metadata}
-            # ChromaDB only accepts str/int/float/bool — serialize anything else to JSON
-            safe_meta = {k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in raw_meta.items()}
-            metadatas.append(safe_meta)
-            ids.append(doc_id)
+            metadatas.append(self._to_metadata(chunk))
 
         self.collection.add(
             ids=ids,
@@ -46,62 +110,263 @@ class ChromaDBVectorStore(VectorStore):
             metadatas=metadatas,  # type: ignore
             documents=documents,
         )
+        self._bump_version()
+
+    @staticmethod
+    def _to_metadata(chunk: Chunk) -> dict[str, Any]:
+        """
+        Flatten a chunk's title, MIME type, and metadata into a ChromaDB metadata dict.
+
+        ChromaDB only accepts str/int/float/bool values, so lists and dicts are
+        stored as JSON strings. Each scalar element of a list field also gets a
+        'field[element]' flag, which filters use to match inside the list.
+        """
+        metadata: dict[str, Any] = {"title": chunk.title, "mime_type": chunk.mime_type}
+        json_fields = []
+        for field, value in chunk.metadata.items():
+            if not isinstance(value, (list, dict)):
+                metadata[field] = value
+                continue
+            metadata[field] = json.dumps(value)
+            json_fields.append(field)
+            if isinstance(value, list):
+                metadata.update(
+                    {_element_key(field, element): True for element in value if not isinstance(element, (list, dict))}
+                )
+        if json_fields:
+            metadata[_JSON_FIELDS_KEY] = json.dumps(json_fields)
+        return metadata
+
+    @staticmethod
+    def _from_metadata(stored: Any) -> dict[str, Any]:
+        """
+        Invert '_to_metadata': the chunk's own metadata, with JSON-encoded lists
+        and dicts decoded and the title, MIME type, and reserved keys removed.
+
+        Collections written before the JSON fields were recorded get every
+        string that parses as a JSON list or object decoded instead.
+        """
+        metadata = dict(stored or {})
+        metadata.pop("title", None)
+        metadata.pop("mime_type", None)
+        if _JSON_FIELDS_KEY in metadata:
+            json_fields = json.loads(metadata.pop(_JSON_FIELDS_KEY))
+        else:
+            json_fields = [
+                field for field, value in metadata.items() if isinstance(value, str) and value[:1] in ("[", "{")
+            ]
+        for field in json_fields:
+            try:
+                value = json.loads(metadata[field])
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(value, (list, dict)):
+                continue
+            metadata[field] = value
+            for element in value if isinstance(value, list) else []:
+                if not isinstance(element, (list, dict)):
+                    metadata.pop(_element_key(field, element), None)
+        return metadata
 
     async def get_chunks_by_embedding(
-        self, embedding: NDArray[np.float64], top_k: int, filters: dict[str, Any] | None = None
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
     ) -> list[ChunkMatch]:
         """
         Retrieve chunks most similar to the given embedding.
 
         :param embedding: Query embedding
         :param top_k: Number of results to return
-        :param filters: Optional filters for metadata
+        :param filters: Optional filters for metadata, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose score is below this cosine similarity
+        """
+        results = await self.get_chunks_by_embeddings(
+            np.asarray(embedding).reshape(1, -1), top_k, filters, include_embeddings, min_score
+        )
+        return results[0]
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[list[ChunkMatch]]:
         """
-        results = self.collection.query(query_embeddings=embedding.tolist(), n_results=top_k, where=filters)  # type: ignore
+        Retrieve the chunks most similar to each query embedding with a single 'query' call.
 
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results per query
+        :param filters: Optional filters for metadata, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose score is below this cosine similarity
+        """
+        queries = np.atleast_2d(embeddings)
+        where = self._to_where(parse_filters(filters)) if filters else None
+        include = ["metadatas", "documents", "distances"]
+        if include_embeddings:
+            include.append("embeddings")
+        results = self.collection.query(
+            query_embeddings=queries.tolist(),
+            n_results=top_k,
+            where=where,  # type: ignore
+            include=include,  # type: ignore
+        )
+        if not results or not results["ids"]:
+            return [[] for _ in queries]
+        return [self._to_matches(results, query, include_embeddings, min_score) for query in range(len(queries))]
+
+    def _to_matches(
+        self, results: Any, query: int, include_embeddings: bool, min_score: float | None
+    ) -> list[ChunkMatch]:
+        """Matches of the 'query'-th query embedding in a 'collection.query' result."""
+        embeddings = results.get("embeddings") if include_embeddings else None
         chunk_matches = []
-        if results and results["ids"]:
-            for i in range(len(results["ids"][0])):
-                metadata = results["metadatas"][0][i] if results["metadatas"] else {}
-                chunk_matches.append(
-                    ChunkMatch(
-                        id=results["ids"][0][i],
-                        title=str(metadata.get("title", "")),
-                        mime_type=str(metadata.get("mime_type", "")),
-                        metadata=metadata,  # type: ignore
-                        content=results["documents"][0][i] if results["documents"] else "",
-                        embedding=[],
-                        score=results["distances"][0][i] if results["distances"] else 0.0,
-                    )
+        for i in range(len(results["ids"][query])):
+            score = self._to_score(results["distances"][query][i]) if results["distances"] else 0.0
+            if min_score is not None and score < min_score:
+                # Results come back ordered by distance, so every later match scores lower
+                break
+            metadata = results["metadatas"][query][i] if results["metadatas"] else {}
+            chunk_matches.append(
+                ChunkMatch(
+                    id=results["ids"][query][i],
+                    title=str(metadata.get("title", "")),
+                    mime_type=str(metadata.get("mime_type", "")),
+                    metadata=self._from_metadata(metadata),
+                    content=results["documents"][query][i] if results["documents"] else "",
+                    embedding=np.asarray(embeddings[query][i]).tolist() if embeddings is not None else [],
+                    score=score,
                 )
-
+            )
         return chunk_matches
 
-    async def get_chunks_by_ids(self, chunk_ids: int | list[int]) -> list[Chunk]:
+    @classmethod
+    def _to_where(cls, node: FilterNode) -> dict[str, Any]:
+        """
+        Render a parsed filter in the strict form ChromaDB expects: one operator
+        per field and an explicit '$and' instead of several keys in one dict.
+
+        Equality and membership also test the 'field[element]' flags written by
+        '_to_metadata', so a scalar matches inside a list field and a list
+        operand matches lists containing all of its elements, as in the other
+        stores. ChromaDB has no '$not', so '$ne' and '$nin' are rewritten with
+        De Morgan's laws. Range comparisons do not look inside list fields.
         """
-        Retrieve chunks by their IDs.
+        if isinstance(node, FilterClause):
+            if node.operator not in ("$eq", "$ne", "$in", "$nin"):
+                return {node.field: {node.operator: node.value}}
+            values = node.value if node.operator in ("$in", "$nin") else [node.value]
+            if not values:
+                return _NEVER if node.operator == "$in" else _ALWAYS
+            if node.operator in ("$ne", "$nin"):
+                return cls._combine("$and", [cls._differs(node.field, value) for value in values])
+            return cls._combine("$or", [cls._equals(node.field, value) for value in values])
+        return cls._combine(node.operator, [cls._to_where(child) for child in node.children])
+
+    @staticmethod
+    def _combine(operator: str, clauses: list[dict[str, Any]]) -> dict[str, Any]:
+        return clauses[0] if len(clauses) == 1 else {operator: clauses}
+
+    @classmethod
+    def _equals(cls, field: str, value: Any) -> dict[str, Any]:
+        if isinstance(value, list) and value:
+            return cls._combine("$and", [{_element_key(field, element): {"$eq": True}} for element in value])
+        if isinstance(value, (list, dict)):
+            return {field: {"$eq": json.dumps(value)}}
+        return {"$or": [{field: {"$eq": value}}, {_element_key(field, value): {"$eq": True}}]}
+
+    @classmethod
+    def _differs(cls, field: str, value: Any) -> dict[str, Any]:
+        if isinstance(value, list) and value:
+            return cls._combine("$or", [{_element_key(field, element): {"$ne": True}} for element in value])
+        if isinstance(value, (list, dict)):
+            return {field: {"$ne": json.dumps(value)}}
+        return {"$and": [{field: {"$ne": value}}, {_element_key(field, value): {"$ne": True}}]}
+
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
+        """
+        Retrieve chunks by their IDs with one 'get' call, in the order requested.
 
         :param chunk_ids: A single ID or a list of IDs
-        :return: List of retrieved chunks
+        :param include_embeddings: Whether to return the stored embedding with each record
+        :return: List of retrieved chunk records
         """
-        if isinstance(chunk_ids, int):
-            chunk_ids = [str(chunk_ids)]  # type: ignore
-        else:
-            chunk_ids = [str(cid) for cid in chunk_ids]  # type: ignore
+        ids = [chunk_ids] if isinstance(chunk_ids, str) else chunk_ids
+        if not ids:
+            return []
 
-        results = self.collection.get(ids=chunk_ids)  # type: ignore
+        include = ["metadatas", "documents"]
+        if include_embeddings:
+            include.append("embeddings")
+        results = self.collection.get(ids=list(dict.fromkeys(ids)), include=include)  # type: ignore
+        embeddings = results.get("embeddings") if include_embeddings else None
 
-        chunks = []
+        records = {}
         if results and results["ids"]:
             for i in range(len(results["ids"])):
                 metadata = results["metadatas"][i] if results["metadatas"] else {}
-                chunks.append(
-                    Chunk(
+                records[results["ids"][i]] = ChunkRecord(
+                    id=results["ids"][i],
+                    title=str(metadata.get("title", "")),
+                    mime_type=str(metadata.get("mime_type", "")),
+                    content=results["documents"][i] if results["documents"] else "",
+                    metadata=self._from_metadata(metadata),
+                    embedding=np.asarray(embeddings[i]).tolist() if embeddings is not None else [],
+                )
+
+        return [records[chunk_id] for chunk_id in ids if chunk_id in records]
+
+    async def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """
+        Page through the collection with 'limit'/'offset'.
+
+        :param batch_size: Maximum number of records per yielded batch
+        :param filters: Optional filters for metadata, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each record
+        """
+        where = self._to_where(parse_filters(filters)) if filters else None
+        include = ["metadatas", "documents"]
+        if include_embeddings:
+            include.append("embeddings")
+
+        offset = 0
+        while True:
+            results = self.collection.get(
+                where=where,  # type: ignore
+                limit=batch_size,
+                offset=offset,
+                include=include,  # type: ignore
+            )
+            if not results["ids"]:
+                return
+
+            embeddings = results.get("embeddings") if include_embeddings else None
+            batch = []
+            for i in range(len(results["ids"])):
+                metadata = results["metadatas"][i] if results["metadatas"] else {}
+                batch.append(
+                    ChunkRecord(
+                        id=results["ids"][i],
                         title=str(metadata.get("title", "")),
                         mime_type=str(metadata.get("mime_type", "")),
+                        metadata=self._from_metadata(metadata),
                         content=results["documents"][i] if results["documents"] else "",
-                        metadata=metadata,  # type: ignore
+                        embedding=np.asarray(embeddings[i]).tolist() if embeddings is not None else [],
                     )
                 )
+            yield batch
 
-        return chunks
+            if len(batch) < batch_size:
+                return
+            offset += batch_size
@@ -0,0 +1,74 @@
+"""
+Metadata filter language shared by the vector stores.
+
+Filters follow the syntax of ChromaDB's 'where' clause, so a filter written
+once can be passed to any backend:
+
+    {"source_file": "EPD_pallet_CPR_noe.pdf"}                  equality
+    {"source_file": {"$in": ["a.pdf", "b.pdf"]}}              membership
+    {"rows": {"$gte": 10, "$lt": 100}}                         ranges
+    {"$or": [{"sheet": "Pallets"}, {"sheet": "Tapes"}]}        boolean combinations
+
+Several keys in one dict (or several operators on one field) are combined
+with AND. When a stored metadata value is a list (e.g. 'chapters'), equality
+and membership match if any element matches, in every store; ChromaDB, which
+cannot store lists, keeps a flag per element for this. Range comparisons look
+inside list values in PostgreSQL and in memory but not in ChromaDB.
+
+'parse_filters' turns a filter dict into a small tree of 'FilterClause' and
+'FilterGroup' nodes that each backend translates into its own query language.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+COMPARISON_OPERATORS = frozenset({"$eq", "$ne", "$gt", "$gte", "$lt", "$lte", "$in", "$nin"})
+LOGICAL_OPERATORS = frozenset({"$and", "$or"})
+
+
+@dataclass(frozen=True)
+class FilterClause:
+    """A single comparison 'field <operator> value'."""
+
+    field: str
+    operator: str
+    value: Any
+
+
+@dataclass(frozen=True)
+class FilterGroup:
+    """A boolean combination ('$and' or '$or') of child nodes."""
+
+    operator: str
+    children: tuple["FilterNode", ...]
+
+
+FilterNode = FilterClause | FilterGroup
+
+
+def parse_filters(filters: dict[str, Any]) -> FilterNode:
+    """Parse a filter dict into a 'FilterNode' tree, raising 'ValueError' on malformed input."""
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError(f"Filters must be a non-empty dict, got {filters!r}.")
+
+    nodes: list[FilterNode] = []
+    for key, value in filters.items():
+        if key in LOGICAL_OPERATORS:
+            if not isinstance(value, list) or not value:
+                raise ValueError(f"'{key}' expects a non-empty list of filters.")
+            nodes.append(FilterGroup(key, tuple(parse_filters(child) for child in value)))
+        elif key.startswith("$"):
+            raise ValueError(f"Unsupported logical operator '{key}'.")
+        elif isinstance(value, dict):
+            if not value:
+                raise ValueError(f"Empty condition for field '{key}'.")
+            for operator, operand in value.items():
+                if operator not in COMPARISON_OPERATORS:
+                    raise ValueError(f"Unsupported operator '{operator}' on field '{key}'.")
+                if operator in ("$in", "$nin") and not isinstance(operand, list):
+                    raise ValueError(f"'{operator}' on field '{key}' expects a list.")
+                nodes.append(FilterClause(key, operator, operand))
+        else:
+            nodes.append(FilterClause(key, "$eq", value))
+
+    return nodes[0] if len(nodes) == 1 else FilterGroup("$and", tuple(nodes))
@@ -0,0 +1,267 @@
+"""
+In-process vector store backed by a NumPy embedding matrix.
+
+'InMemoryVectorStore' keeps every chunk and its embedding in memory and
+answers similarity queries with a single matrix-vector product. It needs no
+database, which makes it the natural backend for tests, notebooks, small
+corpora, and serving nodes that load a prebuilt index at startup.
+
+Metadata filters are resolved through a 'MetadataIndex' before scoring, so
+only the rows that pass the filter are multiplied against the query. With
+'binary_quantization' enabled, a Hamming-distance pass over sign-bit codes
+narrows the candidates further before the float rescoring.
+"""
+
+from collections import Counter
+from collections.abc import AsyncIterator
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+from conversational_toolkit.vectorstores.metadata_index import MetadataIndex
+from conversational_toolkit.vectorstores.quantization import binary_quantize, code_words, hamming_candidates
+
+
+class InMemoryVectorStore(VectorStore):
+    """
+    Vector store holding chunks and a float32 embedding matrix in process memory.
+
+    Scores are cosine similarities (higher is better). Row norms are computed
+    once at insertion time, so a query costs one matrix-vector product over
+    the candidate rows plus an 'argpartition' for the top-k.
+
+    With 'binary_quantization', the store also keeps a sign-bit code per row
+    (see 'conversational_toolkit.vectorstores.quantization'). A search then
+    ranks the candidate rows by Hamming distance, keeps 'top_k * oversampling'
+    of them, and computes exact cosine scores only for that pool. Use
+    'benchmark_binary_recall' to pick 'oversampling' for the corpus.
+
+    Attributes:
+        metadata_index: Inverted index over chunk metadata used to pre-filter searches.
+        binary_quantization: Whether searches use the binary first stage.
+        oversampling: Size of the rescored candidate pool, as a multiple of 'top_k'.
+    """
+
+    def __init__(self, binary_quantization: bool = False, oversampling: int = 4) -> None:
+        if oversampling < 1:
+            raise ValueError("oversampling must be at least 1.")
+        self.metadata_index = MetadataIndex()
+        self.binary_quantization = binary_quantization
+        self.oversampling = oversampling
+        self._ids: list[str] = []
+        self._chunks: list[Chunk] = []
+        self._rows: dict[str, int] = {}
+        # Preallocated with spare capacity so that batched inserts append in amortised O(batch)
+        self._embedding_buffer: NDArray[np.float32] = np.zeros((0, 0), dtype=np.float32)
+        self._norm_buffer: NDArray[np.float32] = np.zeros(0, dtype=np.float32)
+        self._code_buffer: NDArray[np.uint64] = np.zeros((0, 0), dtype=np.uint64)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def _embeddings(self) -> NDArray[np.float32]:
+        return self._embedding_buffer[: len(self._ids)]
+
+    @property
+    def _norms(self) -> NDArray[np.float32]:
+        return self._norm_buffer[: len(self._ids)]
+
+    @property
+    def _codes(self) -> NDArray[np.uint64]:
+        return self._code_buffer[: len(self._ids)]
+
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
+        """
+        Append chunks and their embeddings to the store.
+
+        :param chunks: List of document chunks
+        :param embedding: Corresponding embedding vectors
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
+        """
+        if ids is None:
+            ids = [generate_uid() for _ in chunks]
+        if not len(chunks) == len(embedding) == len(ids):
+            raise ValueError("chunks, embedding and ids must have the same length.")
+        if not chunks:
+            return
+
+        counts = Counter(ids)
+        duplicates = sorted({chunk_id for chunk_id in ids if chunk_id in self._rows or counts[chunk_id] > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate chunk IDs: {duplicates}.")
+
+        vectors = np.asarray(embedding, dtype=np.float32)
+        if self._ids and vectors.shape[1] != self._embedding_buffer.shape[1]:
+            raise ValueError(
+                f"Embedding size {vectors.shape[1]} does not match the store's size {self._embedding_buffer.shape[1]}."
+            )
+
+        start, end = len(self._ids), len(self._ids) + len(chunks)
+        if end > len(self._embedding_buffer) or vectors.shape[1] != self._embedding_buffer.shape[1]:
+            capacity = max(end, 2 * len(self._embedding_buffer))
+            embedding_buffer = np.zeros((capacity, vectors.shape[1]), dtype=np.float32)
+            norm_buffer = np.zeros(capacity, dtype=np.float32)
+            code_buffer = np.zeros((capacity, code_words(vectors.shape[1])), dtype=np.uint64)
+            if start:
+                embedding_buffer[:start] = self._embeddings
+                norm_buffer[:start] = self._norms
+                code_buffer[:start] = self._codes
+            self._embedding_buffer, self._norm_buffer, self._code_buffer = embedding_buffer, norm_buffer, code_buffer
+
+        self._embedding_buffer[start:end] = vectors
+        self._norm_buffer[start:end] = np.linalg.norm(vectors, axis=1)
+        self._code_buffer[start:end] = binary_quantize(vectors)
+        for chunk_id, chunk in zip(ids, chunks):
+            self._rows[chunk_id] = len(self._ids)
+            self._ids.append(chunk_id)
+            self._chunks.append(chunk)
+        self.metadata_index.add(chunk.metadata for chunk in chunks)
+        self._bump_version()
+
+    async def get_chunks_by_embedding(
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[ChunkMatch]:
+        """
+        Retrieve the 'top_k' chunks with the highest cosine similarity to 'embedding'.
+
+        :param embedding: Query embedding
+        :param top_k: Number of results to return
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose cosine similarity is below this value
+        """
+        if not self._ids or top_k <= 0:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        if self.binary_quantization:
+            rows = self.metadata_index.row_ids(filters) if filters else np.arange(len(self._ids))
+            codes = self._codes[rows] if filters else self._codes
+            rows = rows[hamming_candidates(binary_quantize(query), codes, top_k * self.oversampling)]
+            scores = self._cosine(query, rows)
+        elif filters:
+            rows = self.metadata_index.row_ids(filters)
+            scores = self._cosine(query, rows)
+        else:
+            rows = np.arange(len(self._ids))
+            scores = self._cosine(query, None)
+        return self._best_matches(rows, scores, top_k, include_embeddings, min_score)
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """
+        Search for every row of 'embeddings', scoring all queries with one matrix product.
+
+        The filter is resolved once for the whole batch. With binary
+        quantization each query keeps its own candidate pool, so the batch is
+        searched query by query.
+
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results per query
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose cosine similarity is below this value
+        """
+        queries = np.atleast_2d(np.asarray(embeddings, dtype=np.float32))
+        if self.binary_quantization or not self._ids or top_k <= 0:
+            return [
+                await self.get_chunks_by_embedding(query, top_k, filters, include_embeddings, min_score)
+                for query in queries
+            ]
+
+        rows = self.metadata_index.row_ids(filters) if filters else np.arange(len(self._ids))
+        matrix = self._embeddings[rows] if filters else self._embeddings
+        norms = self._norms[rows] if filters else self._norms
+        denominator = np.outer(norms, np.linalg.norm(queries, axis=1))
+        scores = ((matrix @ queries.T) / np.where(denominator == 0, 1.0, denominator)).astype(np.float32, copy=False)
+        return [
+            self._best_matches(rows, scores[:, column], top_k, include_embeddings, min_score)
+            for column in range(queries.shape[0])
+        ]
+
+    def _best_matches(
+        self,
+        rows: NDArray[np.int64],
+        scores: NDArray[np.float32],
+        top_k: int,
+        include_embeddings: bool,
+        min_score: float | None,
+    ) -> list[ChunkMatch]:
+        """The 'top_k' best of the scored 'rows', best first."""
+        if min_score is not None:
+            keep = scores >= min_score
+            rows, scores = rows[keep], scores[keep]
+
+        if rows.size > top_k:
+            best = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            best = np.arange(rows.size)
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        return [self._to_match(int(rows[i]), float(scores[i]), include_embeddings) for i in best]
+
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
+        """
+        Retrieve chunks by their IDs, in the order requested.
+
+        :param chunk_ids: A single ID or a list of IDs
+        :param include_embeddings: Whether to return the stored embedding with each record
+        :return: List of retrieved chunk records
+        """
+        ids = [chunk_ids] if isinstance(chunk_ids, str) else chunk_ids
+        return [self._to_record(self._rows[cid], include_embeddings) for cid in ids if cid in self._rows]
+
+    async def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """
+        Yield the stored chunks in insertion order, as slices of at most 'batch_size' records.
+
+        :param batch_size: Maximum number of records per yielded batch
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each record
+        """
+        rows = self.metadata_index.row_ids(filters) if filters else np.arange(len(self._ids))
+        for start in range(0, rows.size, batch_size):
+            yield [self._to_record(int(row), include_embeddings) for row in rows[start : start + batch_size]]
+
+    def _cosine(self, query: NDArray[np.float32], rows: NDArray[np.int64] | None) -> NDArray[np.float32]:
+        matrix = self._embeddings if rows is None else self._embeddings[rows]
+        norms = self._norms if rows is None else self._norms[rows]
+        denominator = norms * (np.linalg.norm(query) or 1.0)
+        scores = (matrix @ query) / np.where(denominator == 0, 1.0, denominator)
+        return scores.astype(np.float32, copy=False)
+
+    def _to_record(self, row: int, include_embeddings: bool) -> ChunkRecord:
+        chunk = self._chunks[row]
+        return ChunkRecord(
+            id=self._ids[row],
+            title=chunk.title,
+            content=chunk.content,
+            mime_type=chunk.mime_type,
+            metadata=chunk.metadata,
+            embedding=self._embeddings[row].tolist() if include_embeddings else [],
+        )
+
+    def _to_match(self, row: int, score: float, include_embeddings: bool) -> ChunkMatch:
+        return ChunkMatch(**dict(self._to_record(row, include_embeddings)), score=score)
@@ -0,0 +1,183 @@
+"""
+Inverted index over chunk metadata for pre-filtered search in process memory.
+
+'MetadataIndex' maps every '(field, value)' pair to a bitset of the row ids
+that carry it. Bitsets are packed little-endian 'uint64' NumPy arrays (one bit
+per row), so a filter such as '{"source_file": {"$in": [...]}, "sheet": "A"}'
+is answered with a handful of vectorised OR/AND/NOT operations over
+'n_rows / 64' words instead of a Python scan over every chunk's metadata.
+
+Stores and retrievers use it to restrict their candidate set before scoring:
+the more selective the filter, the less work the scoring step does. Filters
+use the shared syntax from 'conversational_toolkit.vectorstores.filters'.
+"""
+
+import json
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.vectorstores.filters import FilterClause, FilterNode, parse_filters
+
+_WORD_BITS = 64
+_BITSET_DTYPE = np.dtype("<u8")
+
+
+def _value_key(value: Any) -> Hashable:
+    """Hashable key for a metadata value; booleans are kept apart from the integers 0 and 1."""
+    if isinstance(value, bool):
+        return ("bool", value)
+    if isinstance(value, (dict, list)):
+        return ("json", json.dumps(value, sort_keys=True))
+    return value
+
+
+class MetadataIndex:
+    """
+    Inverted index from metadata values to packed bitsets of row ids.
+
+    Rows are numbered in insertion order starting at 0, matching the row
+    layout of the store or corpus that owns the index. List-valued metadata
+    (e.g. 'chapters') is indexed element by element, so equality and '$in'
+    match rows whose list contains the value.
+
+    Attributes:
+        fields: Metadata fields to index, or None to index every field.
+    """
+
+    def __init__(self, fields: Iterable[str] | None = None) -> None:
+        self.fields = set(fields) if fields is not None else None
+        self._postings: dict[str, dict[Hashable, NDArray[np.uint64]]] = {}
+        self._values: dict[str, dict[Hashable, Any]] = {}
+        self._alive: NDArray[np.uint64] = np.zeros(0, dtype=_BITSET_DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, metadatas: Iterable[dict[str, Any]]) -> None:
+        """Append rows, one per metadata dict, after the rows already in the index."""
+        metadatas = list(metadatas)
+        start = self._size
+        new_rows: dict[str, dict[Hashable, list[int]]] = {}
+        for row, metadata in enumerate(metadatas, start=start):
+            for field, value in metadata.items():
+                if self.fields is not None and field not in self.fields:
+                    continue
+                for item in value if isinstance(value, list) else [value]:
+                    key = _value_key(item)
+                    new_rows.setdefault(field, {}).setdefault(key, []).append(row)
+                    self._values.setdefault(field, {})[key] = item
+
+        self._size = start + len(metadatas)
+        added = np.arange(start, self._size, dtype=np.int64)
+        self._alive = self._set_bits(self._alive, added)
+        for field, keys in new_rows.items():
+            postings = self._postings.setdefault(field, {})
+            for key, rows in keys.items():
+                current = postings.get(key, np.zeros(0, dtype=_BITSET_DTYPE))
+                postings[key] = self._set_bits(current, np.asarray(rows, dtype=np.int64))
+
+    def remove(self, row_ids: Iterable[int]) -> None:
+        """Mark rows as deleted so they no longer match any filter. Row numbering is unchanged."""
+        rows = np.fromiter(row_ids, dtype=np.int64)
+        if rows.size == 0:
+            return
+        mask = self._set_bits(np.zeros(self._n_words, dtype=_BITSET_DTYPE), rows)
+        self._alive &= ~mask
+
+    def bitset(self, filters: dict[str, Any]) -> NDArray[np.uint64]:
+        """Return the packed bitset of live rows matching 'filters'."""
+        return self._evaluate(parse_filters(filters)) & self._alive
+
+    def row_ids(self, filters: dict[str, Any]) -> NDArray[np.int64]:
+        """Return the sorted ids of live rows matching 'filters'."""
+        return np.flatnonzero(self.mask(filters))
+
+    def mask(self, filters: dict[str, Any]) -> NDArray[np.bool_]:
+        """Return a boolean mask of length 'len(self)' selecting live rows matching 'filters'."""
+        return self.to_mask(self.bitset(filters))
+
+    def to_mask(self, bitset: NDArray[np.uint64]) -> NDArray[np.bool_]:
+        """Unpack a bitset into a boolean mask of length 'len(self)'."""
+        bits = np.unpackbits(self._pad(bitset).view(np.uint8), bitorder="little")
+        return bits[: self._size].astype(bool)
+
+    @property
+    def _n_words(self) -> int:
+        return -(-self._size // _WORD_BITS)
+
+    def _pad(self, bitset: NDArray[np.uint64]) -> NDArray[np.uint64]:
+        """Bitsets only grow when a row sets one of their bits; pad with zero words to the full width."""
+        if bitset.size == self._n_words:
+            return bitset
+        padded = np.zeros(self._n_words, dtype=_BITSET_DTYPE)
+        padded[: bitset.size] = bitset
+        return padded
+
+    @staticmethod
+    def _set_bits(bitset: NDArray[np.uint64], rows: NDArray[np.int64]) -> NDArray[np.uint64]:
+        if rows.size == 0:
+            return bitset
+        n_words = int(rows.max()) // _WORD_BITS + 1
+        if n_words > bitset.size:
+            grown = np.zeros(n_words, dtype=_BITSET_DTYPE)
+            grown[: bitset.size] = bitset
+            bitset = grown
+        bits = np.left_shift(np.uint64(1), (rows % _WORD_BITS).astype(np.uint64))
+        np.bitwise_or.at(bitset, rows // _WORD_BITS, bits)
+        return bitset
+
+    def _evaluate(self, node: FilterNode) -> NDArray[np.uint64]:
+        if not isinstance(node, FilterClause):
+            children = [self._evaluate(child) for child in node.children]
+            result = children[0]
+            for child in children[1:]:
+                result = result & child if node.operator == "$and" else result | child
+            return result
+
+        if self.fields is not None and node.field not in self.fields:
+            raise ValueError(f"Metadata field '{node.field}' is not indexed.")
+
+        if node.operator in ("$eq", "$ne", "$in", "$nin"):
+            values = node.value if node.operator in ("$in", "$nin") else [node.value]
+            matches = np.zeros(self._n_words, dtype=_BITSET_DTYPE)
+            for value in values:
+                matches |= self._equals(node.field, value)
+            return ~matches if node.operator in ("$ne", "$nin") else matches
+
+        return self._compare(node)
+
+    def _equals(self, field: str, value: Any) -> NDArray[np.uint64]:
+        postings = self._postings.get(field, {})
+        empty = np.zeros(self._n_words, dtype=_BITSET_DTYPE)
+        if not isinstance(value, list):
+            return self._pad(postings.get(_value_key(value), empty))
+        # A list operand matches rows whose list contains every element, as JSONB containment does
+        result = ~empty
+        for item in value:
+            result &= self._pad(postings.get(_value_key(item), empty))
+        return result
+
+    def _compare(self, clause: FilterClause) -> NDArray[np.uint64]:
+        """Range comparison: OR the bitsets of every indexed value of the same type that satisfies it."""
+        operand = clause.value
+        numeric = isinstance(operand, (int, float)) and not isinstance(operand, bool)
+        result = np.zeros(self._n_words, dtype=_BITSET_DTYPE)
+        for key, value in self._values.get(clause.field, {}).items():
+            if isinstance(value, bool):
+                continue
+            if numeric and not isinstance(value, (int, float)):
+                continue
+            if not numeric and type(value) is not type(operand):
+                continue
+            if (
+                (clause.operator == "$gt" and value > operand)
+                or (clause.operator == "$gte" and value >= operand)
+                or (clause.operator == "$lt" and value < operand)
+                or (clause.operator == "$lte" and value <= operand)
+            ):
+                result |= self._pad(self._postings[clause.field][key])
+        return result
@@ -1,19 +1,49 @@
+import csv
+import io
+import json
+import math
+import operator
+from collections.abc import AsyncIterator, Callable
+from enum import StrEnum
 from typing import Any
 
 import numpy as np
+from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
 
 from conversational_toolkit.chunking.base import Chunk
 from conversational_toolkit.utils.database import generate_uid
-from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch
+from conversational_toolkit.vectorstores.base import VectorStore, ChunkMatch, ChunkRecord
+from conversational_toolkit.vectorstores.filters import FilterClause, FilterNode, parse_filters
 
-from sqlalchemy import text, and_
+from sqlalchemy import text, and_, or_, not_, cast, literal, true, false
 from sqlalchemy import MetaData
-from sqlalchemy import Table, Column, String, JSON
+from sqlalchemy import Table, Column, Index, String
+from sqlalchemy.dialects.postgresql import BIT, JSONB, JSONPATH
+from sqlalchemy.sql.elements import ColumnElement
+from sqlalchemy.sql.selectable import Subquery
 from pgvector.sqlalchemy import Vector  # type: ignore[import-untyped]
 from numpy.typing import NDArray
 
-from sqlalchemy import insert, select
+from sqlalchemy import func, insert, select
+
+
+_COLUMN_COMPARATORS: dict[str, Callable[[Any, Any], ColumnElement[bool]]] = {
+    "$eq": operator.eq,
+    "$ne": operator.ne,
+    "$gt": operator.gt,
+    "$gte": operator.ge,
+    "$lt": operator.lt,
+    "$lte": operator.le,
+}
+_JSONPATH_COMPARATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+# pgvector's IVFFlat guidance switches from rows / 1000 lists to sqrt(rows) lists above this row count
+_IVFFLAT_SQRT_LISTS_THRESHOLD = 1_000_000
+
+
+class VectorIndexMethod(StrEnum):
+    HNSW = "hnsw"
+    IVFFLAT = "ivfflat"
 
 
 class PGVectorStore(VectorStore):
@@ -22,6 +52,10 @@ class PGVectorStore(VectorStore):
         engine: AsyncEngine,
         table_name: str,
         embeddings_size: int,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        iterative_scan: str | None = None,
+        binary_oversampling: int | None = None,
     ):
         """
         Initialize the PGVectorStore with database credentials and table details.
@@ -33,8 +67,21 @@ class PGVectorStore(VectorStore):
         :param db_port: Database port
         :param table_name: Name of the table to store vectors
         :param embeddings_size: Size of the embedding vectors
+        :param ef_search: Default 'hnsw.ef_search' for searches (server default when None)
+        :param probes: Default 'ivfflat.probes' for searches (server default when None)
+        :param iterative_scan: 'hnsw.iterative_scan' mode ('relaxed_order' or 'strict_order') used for
+            filtered searches, so an index scan keeps going until 'top_k' rows pass the filter.
+            Requires pgvector >= 0.8; left unset when None.
+        :param binary_oversampling: When set, searches first take 'top_k * binary_oversampling' candidates by
+            Hamming distance between binary-quantized embeddings and rescore them with the full vectors.
+            Pair with 'create_vector_index(binary_quantization=True)'. Requires pgvector >= 0.7.
         """
         self.table_name = table_name
+        self.index_name = f"{table_name}_embedding_idx"
+        self.ef_search = ef_search
+        self.probes = probes
+        self.iterative_scan = iterative_scan
+        self.binary_oversampling = binary_oversampling
         self.engine = engine
         self.SessionLocal = async_sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
         self.embeddings_size = embeddings_size
@@ -48,7 +95,14 @@ class PGVectorStore(VectorStore):
             Column("content", String, index=False),
             Column("mime_type", String, index=False),
             Column("embedding", Vector(self.embeddings_size)),
-            Column("chunk_metadata", JSON, nullable=True),
+            Column("chunk_metadata", JSONB, nullable=True),
+            # jsonb_path_ops supports the containment ('@>') predicates generated for metadata filters
+            Index(
+                f"{table_name}_chunk_metadata_idx",
+                "chunk_metadata",
+                postgresql_using="gin",
+                postgresql_ops={"chunk_metadata": "jsonb_path_ops"},
+            ),
         )
 
     async def enable_vector_extension(self) -> None:
@@ -67,53 +121,300 @@ class PGVectorStore(VectorStore):
         async with self.engine.begin() as session:
             await session.run_sync(self.metadata.create_all)
 
-    async def insert_chunks(self, chunks: list[Chunk], embedding: NDArray[np.float64]) -> None:
+    async def migrate_metadata_to_jsonb(self) -> None:
+        """
+        Convert the metadata column of a table created before JSONB support and add its GIN index.
+        """
+        async with self.engine.begin() as session:
+            await session.execute(
+                text(
+                    f'ALTER TABLE "{self.table_name}" '
+                    "ALTER COLUMN chunk_metadata TYPE JSONB USING chunk_metadata::jsonb"
+                )
+            )
+            await session.execute(
+                text(
+                    f'CREATE INDEX IF NOT EXISTS "{self.table_name}_chunk_metadata_idx" '
+                    f'ON "{self.table_name}" USING gin (chunk_metadata jsonb_path_ops)'
+                )
+            )
+
+    async def create_vector_index(
+        self,
+        method: VectorIndexMethod = VectorIndexMethod.HNSW,
+        opclass: str = "vector_cosine_ops",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: int | None = None,
+        maintenance_work_mem: str | None = None,
+        binary_quantization: bool = False,
+    ) -> None:
+        """
+        Create an approximate nearest-neighbour index on the embedding column, if it does not exist.
+
+        'get_chunks_by_embedding' orders by cosine distance, so only an index
+        built with 'vector_cosine_ops' is used by it. Build the index after a
+        bulk load rather than before: building once is much faster than
+        maintaining the graph row by row, and IVFFlat needs the data to train
+        its lists.
+
+        :param method: Index type, HNSW (better recall/latency) or IVFFlat (faster build, smaller)
+        :param opclass: pgvector operator class of the index
+        :param m: HNSW maximum number of connections per layer
+        :param ef_construction: HNSW candidate list size during the build
+        :param lists: IVFFlat number of lists; derived from the row count when None
+        :param maintenance_work_mem: Memory granted to the build, e.g. '2GB' (server default when None)
+        :param binary_quantization: Index 'binary_quantize(embedding)' with 'bit_hamming_ops' instead of the
+            full vectors, for searches with 'binary_oversampling' ('opclass' is ignored). Requires pgvector >= 0.7.
+        """
+        if method == VectorIndexMethod.HNSW:
+            options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+        elif method == VectorIndexMethod.IVFFLAT:
+            if lists is None:
+                lists = self._default_ivfflat_lists(await self.count())
+            options = f"lists = {int(lists)}"
+        else:
+            raise NotImplementedError(f"Index method '{method}' is not supported.")
+
+        if binary_quantization:
+            opclass = "bit_hamming_ops"
+            column = f"(binary_quantize(embedding)::bit({int(self.embeddings_size)}))"
+        else:
+            column = "embedding"
+
+        async with self.engine.begin() as session:
+            if maintenance_work_mem is not None:
+                await session.execute(
+                    text("SELECT set_config('maintenance_work_mem', :value, true)"), {"value": maintenance_work_mem}
+                )
+            await session.execute(
+                text(
+                    f'CREATE INDEX IF NOT EXISTS "{self.index_name}" ON "{self.table_name}" '
+                    f"USING {method} ({column} {opclass}) WITH ({options})"
+                )
+            )
+        logger.info(f"Vector index '{self.index_name}' ({method}, {opclass}) is ready")
+
+    async def drop_vector_index(self) -> None:
+        """
+        Drop the embedding index if it exists, e.g. before a large bulk load.
+        """
+        async with self.engine.begin() as session:
+            await session.execute(text(f'DROP INDEX IF EXISTS "{self.index_name}"'))
+
+    async def get_vector_index_size(self) -> int:
+        """
+        Return the on-disk size of the embedding index in bytes, or 0 if there is no index.
+        """
+        async with self.engine.connect() as session:
+            result = await session.execute(
+                text("SELECT COALESCE(pg_relation_size(to_regclass(:name)), 0)"), {"name": f'"{self.index_name}"'}
+            )
+            return int(result.scalar_one())
+
+    async def count(self) -> int:
+        """
+        Return the number of stored chunks.
+        """
+        async with self.engine.connect() as session:
+            result = await session.execute(select(func.count()).select_from(self.table))
+            return int(result.scalar_one())
+
+    @staticmethod
+    def _default_ivfflat_lists(rows: int) -> int:
+        """pgvector's recommendation: rows / 1000 up to 1M rows, sqrt(rows) above."""
+        if rows <= _IVFFLAT_SQRT_LISTS_THRESHOLD:
+            return max(rows // 1000, 1)
+        return int(math.sqrt(rows))
+
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
         """
         Inserts a document and its embedding into the table.
 
         :param chunks: List of document chunks, each containing a title, content, and metadata
         :param embedding: Array of embedding vectors corresponding to the document chunks
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
         """
+        if ids is None:
+            ids = [generate_uid() for _ in chunks]
+
         data_to_insert = [
             {
-                "id": generate_uid(),
+                "id": chunk_id,
                 "title": chunk.title,
                 "content": chunk.content,
                 "embedding": emb,
                 "mime_type": chunk.mime_type,
                 "chunk_metadata": chunk.metadata,
             }
-            for chunk, emb in zip(chunks, embedding)
+            for chunk_id, chunk, emb in zip(ids, chunks, embedding)
         ]
 
         async with self.SessionLocal() as session:
             async with session.begin():
                 stmt = insert(self.table)
                 await session.execute(stmt, data_to_insert)
+        self._bump_version()
+
+    async def bulk_insert_chunks(
+        self,
+        chunks: list[Chunk],
+        embedding: NDArray[np.float64],
+        ids: list[str] | None = None,
+        batch_size: int = 5000,
+        progress_callback: Callable[[int, int], None] | None = None,
+        build_index: VectorIndexMethod | None = None,
+    ) -> list[str]:
+        """
+        Bulk-load chunks with PostgreSQL 'COPY', for backfills of large corpora.
+
+        Each batch is streamed as CSV into a temporary staging table and then
+        upserted into the main table on 'id', all within one transaction per
+        batch. A failed batch therefore leaves earlier batches committed, and
+        re-running the load with the same 'ids' is idempotent.
+
+        Requires the 'asyncpg' driver ('postgresql+asyncpg://...').
+
+        :param chunks: List of document chunks
+        :param embedding: Array of embedding vectors corresponding to the document chunks
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
+        :param batch_size: Number of rows copied and committed per batch
+        :param progress_callback: Called as 'progress_callback(rows_done, rows_total)' after each batch
+        :param build_index: If set, the vector index is dropped before loading and rebuilt with this
+            method (and default parameters) once all batches are in
+        :return: The IDs of the inserted chunks, in input order
+        """
+        if self.engine.dialect.driver != "asyncpg":
+            raise NotImplementedError(f"Bulk COPY is not supported for driver '{self.engine.dialect.driver}'.")
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        if ids is None:
+            ids = [generate_uid() for _ in chunks]
+        if not len(ids) == len(chunks) == len(embedding):
+            raise ValueError("chunks, embedding and ids must have the same length.")
+
+        columns = ["id", "title", "content", "mime_type", "embedding", "chunk_metadata"]
+        staging_table = f"{self.table_name}_staging"
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns[1:])
+        upsert = text(
+            f'INSERT INTO "{self.table_name}" ({column_list}) '
+            f'SELECT {column_list} FROM "{staging_table}" '
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+
+        if build_index is not None:
+            await self.drop_vector_index()
+
+        total = len(chunks)
+        for start in range(0, total, batch_size):
+            end = min(start + batch_size, total)
+            payload = self._to_copy_csv(chunks[start:end], embedding[start:end], ids[start:end])
+
+            async with self.engine.begin() as connection:
+                await connection.execute(
+                    text(
+                        f'CREATE TEMP TABLE "{staging_table}" '
+                        f'(LIKE "{self.table_name}" INCLUDING DEFAULTS) ON COMMIT DROP'
+                    )
+                )
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.copy_to_table(  # type: ignore[union-attr]
+                    staging_table, source=payload, columns=columns, format="csv"
+                )
+                await connection.execute(upsert)
+            self._bump_version()
+
+            logger.info(f"Bulk-loaded {end}/{total} chunks into '{self.table_name}'")
+            if progress_callback is not None:
+                progress_callback(end, total)
+
+        if build_index is not None:
+            await self.create_vector_index(build_index)
+
+        return ids
+
+    @staticmethod
+    def _to_copy_csv(chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str]) -> io.BytesIO:
+        """Serialise one batch as CSV in the column order expected by 'bulk_insert_chunks'."""
+        buffer = io.StringIO()
+        # Quote every field so empty strings are not read back as NULL by 'COPY ... CSV'
+        writer = csv.writer(buffer, quoting=csv.QUOTE_ALL)
+        for chunk_id, chunk, emb in zip(ids, chunks, np.asarray(embedding, dtype=np.float64).tolist()):
+            writer.writerow(
+                [
+                    chunk_id,
+                    chunk.title,
+                    chunk.content,
+                    chunk.mime_type,
+                    "[" + ",".join(map(repr, emb)) + "]",
+                    json.dumps(chunk.metadata),
+                ]
+            )
+        return io.BytesIO(buffer.getvalue().encode("utf-8"))
 
     async def get_chunks_by_embedding(
         self,
         embedding: NDArray[np.float64],
         top_k: int,
         filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+        ef_search: int | None = None,
+        probes: int | None = None,
+        binary_oversampling: int | None = None,
     ) -> list[ChunkMatch]:
         """
         Search for the top K most similar documents based on the embedding.
 
+        Results are ordered by the raw cosine distance so that an HNSW or
+        IVFFlat index built with 'vector_cosine_ops' can serve the query.
+        With binary oversampling, an inner query orders by Hamming distance
+        (served by an index built with 'binary_quantization=True') and only
+        its candidates are ranked by cosine distance.
+
         :param embedding: Embedding vector to search for
         :param top_k: Number of top results to return
-        :param filters: Dict of metadata to filter on (optional)
+        :param filters: Metadata filter (optional), see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to select and return the stored embedding of each match
+        :param min_score: Drop matches whose cosine similarity is below this value
+        :param ef_search: 'hnsw.ef_search' for this query, overriding the store default
+        :param probes: 'ivfflat.probes' for this query, overriding the store default
+        :param binary_oversampling: Binary candidate pool as a multiple of 'top_k', overriding the store default
         :return: List of ChunkMatch objects
         """
-        async with self.SessionLocal() as session:
-            query = select(self.table, (1 - self.table.columns.embedding.cosine_distance(embedding)).label("score"))
+        ef_search = ef_search if ef_search is not None else self.ef_search
+        probes = probes if probes is not None else self.probes
+        binary_oversampling = binary_oversampling if binary_oversampling is not None else self.binary_oversampling
+
+        async with self.SessionLocal() as session, session.begin():
+            # SET LOCAL scopes the search parameters to this transaction only
+            if ef_search is not None:
+                await session.execute(text(f"SET LOCAL hnsw.ef_search = {int(ef_search)}"))
+            if probes is not None:
+                await session.execute(text(f"SET LOCAL ivfflat.probes = {int(probes)}"))
+            if filters and self.iterative_scan is not None:
+                await session.execute(
+                    text("SELECT set_config('hnsw.iterative_scan', :mode, true)"), {"mode": self.iterative_scan}
+                )
+
+            source: Table | Subquery = self.table
+            if binary_oversampling is not None:
+                source = self._binary_candidates(embedding, top_k * binary_oversampling, filters)
+                filters = None
+
+            distance = source.columns.embedding.cosine_distance(embedding)
+            columns = [column for column in source.columns if include_embeddings or column.name != "embedding"]
+            query = select(*columns, (1 - distance).label("score"))
 
-            # Apply filters if provided
             if filters:
-                conditions = [getattr(self.table.c, key) == value for key, value in filters.items()]
-                query = query.where(and_(*conditions))
+                query = query.where(self._filter_to_sql(parse_filters(filters)))
+            if min_score is not None:
+                query = query.where(distance <= 1 - min_score)
 
-            query = query.order_by(text("score DESC")).limit(top_k)
+            query = query.order_by(distance).limit(top_k)
 
             chunks = await session.execute(query)
             results = [
@@ -121,37 +422,128 @@ class PGVectorStore(VectorStore):
                     id=chunk.id,
                     title=chunk.title,
                     content=chunk.content,
-                    embedding=chunk.embedding,
+                    embedding=chunk.embedding.tolist() if include_embeddings else [],
                     mime_type=chunk.mime_type,
+                    metadata=chunk.chunk_metadata or {},
                     score=chunk.score,
                 )
                 for chunk in chunks
             ]
         return results
 
-    async def get_chunks_by_ids(self, chunk_ids: int | list[int]) -> list[Chunk]:
+    def _binary_candidates(
+        self, embedding: NDArray[np.float64], pool_size: int, filters: dict[str, Any] | None
+    ) -> Subquery:
+        """The 'pool_size' rows closest to 'embedding' by Hamming distance of their binary-quantized vectors."""
+        bits = BIT(self.embeddings_size)
+        stored = cast(func.binary_quantize(self.table.columns.embedding), bits)
+        query_bits = cast(func.binary_quantize(cast(embedding, Vector(self.embeddings_size))), bits)
+        query = select(self.table)
+        if filters:
+            query = query.where(self._filter_to_sql(parse_filters(filters)))
+        return query.order_by(stored.op("<~>")(query_bits)).limit(pool_size).subquery("candidates")
+
+    def _filter_to_sql(self, node: FilterNode) -> ColumnElement[bool]:
         """
-        Search for document chunks based on a single chunk ID or a list of chunk IDs.
+        Translate a parsed metadata filter into a SQL predicate.
 
-        :param chunk_ids: A single ID or a list of IDs of the chunks to search for
-        :return: List of document chunks matching the given IDs
+        Fields naming a real column ('id', 'title', ...) are compared directly.
+        Metadata equality and membership become JSONB containment ('@>'), which
+        the GIN index on 'chunk_metadata' serves; scalar values also match
+        inside list-valued metadata. Range comparisons use a type-strict
+        jsonpath predicate so numbers are never compared against strings.
+        """
+        if not isinstance(node, FilterClause):
+            children = [self._filter_to_sql(child) for child in node.children]
+            return and_(*children) if node.operator == "$and" else or_(*children)
+
+        if node.field in self.table.c and node.field != "chunk_metadata":
+            column = self.table.c[node.field]
+            if node.operator == "$in":
+                return column.in_(node.value)
+            if node.operator == "$nin":
+                return column.not_in(node.value)
+            return _COLUMN_COMPARATORS[node.operator](column, node.value)
+
+        if node.operator in ("$eq", "$ne", "$in", "$nin"):
+            values = node.value if node.operator in ("$in", "$nin") else [node.value]
+            if not values:
+                # 'or_()' without arguments is deprecated and 'NOT' of it is invalid SQL
+                return false() if node.operator == "$in" else true()
+            matches = or_(*[self._metadata_contains(node.field, value) for value in values])
+            return not_(matches) if node.operator in ("$ne", "$nin") else matches
+
+        comparator = _JSONPATH_COMPARATORS[node.operator]
+        field = node.field.replace("\\", "\\\\").replace('"', '\\"')
+        return func.jsonb_path_exists(
+            self.table.c.chunk_metadata,
+            cast(f'$."{field}" ? (@ {comparator} $value)', JSONPATH),
+            literal({"value": node.value}, JSONB),
+        )
+
+    def _metadata_contains(self, field: str, value: Any) -> ColumnElement[bool]:
+        """JSONB containment match of 'field == value', also matching 'value' as an element of a list field."""
+        condition = self.table.c.chunk_metadata.contains({field: value})
+        if isinstance(value, (list, dict)):
+            return condition
+        return or_(condition, self.table.c.chunk_metadata.contains({field: [value]}))
+
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
         """
-        if isinstance(chunk_ids, int):
-            chunk_ids = [chunk_ids]
+        Fetch document chunks by ID with a single 'IN' query, in the order requested.
 
-        if not chunk_ids:
+        :param chunk_ids: A single ID or a list of IDs of the chunks to search for
+        :param include_embeddings: Whether to select and return the stored embedding of each record
+        :return: List of chunk records matching the given IDs
+        """
+        ids = [chunk_ids] if isinstance(chunk_ids, str) else chunk_ids
+        if not ids:
             return []
 
+        columns = [column for column in self.table.columns if include_embeddings or column.name != "embedding"]
         async with self.SessionLocal() as session:
-            results = await session.execute(select(self.table).where(self.table.columns.id.in_(chunk_ids)))
-
-            chunks = [
-                Chunk(
+            results = await session.execute(select(*columns).where(self.table.columns.id.in_(set(ids))))
+            records = {
+                result.id: ChunkRecord(
+                    id=result.id,
                     title=result.title,
                     content=result.content,
-                    mime_type="text/plain",
-                    metadata=result.chunk_metadata,
+                    mime_type=result.mime_type,
+                    metadata=result.chunk_metadata or {},
+                    embedding=result.embedding.tolist() if include_embeddings else [],
                 )
                 for result in results
-            ]
-        return chunks
+            }
+        return [records[chunk_id] for chunk_id in ids if chunk_id in records]
+
+    async def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """
+        Stream the table through a server-side cursor, 'batch_size' rows at a time.
+
+        :param batch_size: Maximum number of records per yielded batch
+        :param filters: Metadata filter (optional), see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to select and return the stored embedding of each record
+        """
+        columns = [column for column in self.table.columns if include_embeddings or column.name != "embedding"]
+        query = select(*columns)
+        if filters:
+            query = query.where(self._filter_to_sql(parse_filters(filters)))
+
+        async with self.engine.connect() as connection:
+            result = await connection.stream(query.execution_options(yield_per=batch_size))
+            async for rows in result.partitions(batch_size):
+                yield [
+                    ChunkRecord(
+                        id=row.id,
+                        title=row.title,
+                        content=row.content,
+                        mime_type=row.mime_type,
+                        metadata=row.chunk_metadata or {},
+                        embedding=row.embedding.tolist() if include_embeddings else [],
+                    )
+                    for row in rows
+                ]
@@ -0,0 +1,132 @@
+"""
+Binary (sign-bit) quantization of embeddings for a cheap first search stage.
+
+Each embedding dimension is reduced to one bit, set when the value is
+positive, and the bits are packed into little-endian 'uint64' words: a
+384-dimensional float32 vector (1536 bytes) becomes 6 words (48 bytes).
+Similarity between codes is the Hamming distance, computed with XOR and a
+popcount over the packed words.
+
+Hamming distance only approximates cosine similarity, so it is used to pick a
+candidate pool 'oversampling' times larger than 'top_k', which is then
+rescored with the full-precision vectors. 'benchmark_binary_recall' measures
+how much of the exact top-k that two-stage search recovers on a given corpus,
+which is what 'oversampling' should be tuned against.
+"""
+
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+_WORD_BITS = 64
+_CODE_DTYPE = np.dtype("<u8")
+# Fallback popcount for NumPy < 2.0, which has no 'bitwise_count'
+_BYTE_POPCOUNT = np.array([value.bit_count() for value in range(256)], dtype=np.uint8)
+
+
+def code_words(dimensions: int) -> int:
+    """Number of 'uint64' words in the binary code of a 'dimensions'-sized embedding."""
+    return -(-dimensions // _WORD_BITS)
+
+
+def binary_quantize(vectors: NDArray[np.floating]) -> NDArray[np.uint64]:
+    """
+    Pack the sign bits of 'vectors' into 'uint64' words.
+
+    Accepts a single vector or a matrix with one vector per row and returns
+    codes of shape '(code_words(d),)' or '(n, code_words(d))' accordingly.
+    """
+    vectors = np.asarray(vectors)
+    matrix = np.atleast_2d(vectors)
+    n_bytes = code_words(matrix.shape[1]) * (_WORD_BITS // 8)
+    packed = np.packbits(matrix > 0, axis=1, bitorder="little")
+    padded = np.zeros((matrix.shape[0], n_bytes), dtype=np.uint8)
+    padded[:, : packed.shape[1]] = packed
+    codes = padded.view(_CODE_DTYPE)
+    return codes[0] if vectors.ndim == 1 else codes
+
+
+def popcount(words: NDArray[np.uint64]) -> NDArray[np.uint8]:
+    """Number of set bits in each word."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+    counts = _BYTE_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)]
+    return counts.reshape(*words.shape, 8).sum(axis=-1, dtype=np.uint8)
+
+
+def hamming_distances(query_code: NDArray[np.uint64], codes: NDArray[np.uint64]) -> NDArray[np.int64]:
+    """Hamming distance between one query code and every row of 'codes'."""
+    return popcount(codes ^ query_code).sum(axis=1, dtype=np.int64)
+
+
+def hamming_candidates(query_code: NDArray[np.uint64], codes: NDArray[np.uint64], pool_size: int) -> NDArray[np.int64]:
+    """Row indices of the 'pool_size' codes closest to 'query_code', in no particular order."""
+    distances = hamming_distances(query_code, codes)
+    if pool_size >= distances.size:
+        return np.arange(distances.size)
+    return np.argpartition(distances, pool_size - 1)[:pool_size]
+
+
+@dataclass(frozen=True)
+class RecallResult:
+    """Recall and latency of binary search with rescoring at one oversampling factor."""
+
+    oversampling: int
+    recall: float
+    mean_latency_ms: float
+    exact_latency_ms: float
+
+
+def benchmark_binary_recall(
+    embeddings: NDArray[np.floating],
+    queries: NDArray[np.floating],
+    top_k: int = 10,
+    oversampling: Iterable[int] = (1, 2, 4, 8, 16),
+) -> list[RecallResult]:
+    """
+    Compare binary search with rescoring against exact cosine search.
+
+    For each oversampling factor, recall is the fraction of the exact top-k
+    (by cosine similarity) found by taking the 'top_k * oversampling' nearest
+    codes and rescoring them with the full vectors. Latencies are averaged
+    per query; run it on a sample of the real corpus and real queries.
+
+    :param embeddings: Corpus embeddings, one per row
+    :param queries: Query embeddings, one per row
+    :param top_k: Number of results per query
+    :param oversampling: Candidate pool sizes to evaluate, as multiples of 'top_k'
+    :return: One 'RecallResult' per oversampling factor
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+    query_matrix = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    codes = binary_quantize(matrix)
+    query_codes = binary_quantize(query_matrix)
+    k = min(top_k, len(matrix))
+
+    start = time.perf_counter()
+    exact = [set(np.argpartition(-(matrix @ query), k - 1)[:k].tolist()) for query in query_matrix]
+    exact_latency_ms = (time.perf_counter() - start) * 1000 / len(query_matrix)
+
+    results = []
+    for factor in oversampling:
+        found = 0
+        start = time.perf_counter()
+        for query, query_code, expected in zip(query_matrix, query_codes, exact):
+            pool = hamming_candidates(query_code, codes, k * factor)
+            scores = matrix[pool] @ query
+            best = pool[np.argpartition(-scores, k - 1)[:k]] if pool.size > k else pool
+            found += len(expected.intersection(best.tolist()))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        results.append(
+            RecallResult(
+                oversampling=factor,
+                recall=found / (k * len(query_matrix)),
+                mean_latency_ms=elapsed_ms / len(query_matrix),
+                exact_latency_ms=exact_latency_ms,
+            )
+        )
+    return results
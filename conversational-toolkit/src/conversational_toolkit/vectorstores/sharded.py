@@ -0,0 +1,227 @@
+"""
+Horizontal partitioning of a collection across several vector stores.
+
+'ShardedVectorStore' spreads chunks over N underlying 'VectorStore' instances
+(e.g. several ChromaDB collections or PostgreSQL tables, possibly on different
+hosts) and presents them as one store. Inserts are split per shard and written
+concurrently; a search queries every shard concurrently for its own top-k and
+merges the per-shard results with a heap, so both ingest and query work is
+divided across the shards.
+
+Chunks are placed by a stable hash of their ID, or of a metadata field such as
+'source_file' when 'shard_key' is set. Keying by source keeps all chunks of a
+document together and lets filters on that field skip the other shards.
+"""
+
+import asyncio
+import hashlib
+import heapq
+from collections.abc import AsyncIterator, Sequence
+from typing import Any
+
+import numpy as np
+from numpy.typing import NDArray
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.database import generate_uid
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord, VectorStore
+
+
+def _stable_hash(value: Any) -> int:
+    """
+    Process-independent hash ('hash()' of a str is salted per interpreter).
+
+    Numbers are canonicalised first, so values that compare equal in a filter
+    (2020 and 2020.0, True and 1) land on the same shard.
+    """
+    if isinstance(value, bool) or (isinstance(value, float) and value.is_integer()):
+        value = int(value)
+    return int.from_bytes(hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class ShardedVectorStore(VectorStore):
+    """
+    Vector store that partitions chunks across several underlying stores.
+
+    All shards must use the same embedding model, since per-shard results are
+    merged by their cosine similarity scores.
+
+    Attributes:
+        shards: The underlying stores, in shard order.
+        shard_key: Scalar metadata field used for placement, or None to place by chunk ID.
+    """
+
+    def __init__(self, shards: Sequence[VectorStore], shard_key: str | None = None) -> None:
+        """
+        :param shards: Underlying stores; their order defines the shard numbering and must stay fixed
+        :param shard_key: Optional metadata field (e.g. 'source_file') whose value decides the shard
+        """
+        if not shards:
+            raise ValueError("ShardedVectorStore needs at least one shard.")
+        self.shards = list(shards)
+        self.shard_key = shard_key
+
+    @property
+    def version(self) -> int:
+        """Sum of the shard versions, so a write to any shard changes it."""
+        return sum(shard.version for shard in self.shards)
+
+    def shard_for(self, chunk_id: str, metadata: dict[str, Any] | None = None) -> int:
+        """Return the index of the shard that holds the chunk with 'chunk_id' and 'metadata'."""
+        if self.shard_key is not None and metadata and self.shard_key in metadata:
+            return _stable_hash(metadata[self.shard_key]) % len(self.shards)
+        return _stable_hash(chunk_id) % len(self.shards)
+
+    async def insert_chunks(
+        self, chunks: list[Chunk], embedding: NDArray[np.float64], ids: list[str] | None = None
+    ) -> None:
+        """
+        Split the chunks by shard and insert every part concurrently.
+
+        IDs are assigned before partitioning, so the placement of a chunk can be
+        recomputed from its ID alone when no 'shard_key' is used.
+
+        :param chunks: List of document chunks
+        :param embedding: Corresponding embedding vectors
+        :param ids: Optional IDs for the chunks; new UUIDs are generated when omitted
+        """
+        if ids is None:
+            ids = [generate_uid() for _ in chunks]
+        if not len(chunks) == len(embedding) == len(ids):
+            raise ValueError("chunks, embedding and ids must have the same length.")
+
+        rows_by_shard: dict[int, list[int]] = {}
+        for row, (chunk_id, chunk) in enumerate(zip(ids, chunks)):
+            rows_by_shard.setdefault(self.shard_for(chunk_id, chunk.metadata), []).append(row)
+
+        await asyncio.gather(
+            *(
+                self.shards[shard].insert_chunks(
+                    [chunks[row] for row in rows], embedding[rows], ids=[ids[row] for row in rows]
+                )
+                for shard, rows in rows_by_shard.items()
+            )
+        )
+
+    async def get_chunks_by_embedding(
+        self,
+        embedding: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[ChunkMatch]:
+        """
+        Query the relevant shards concurrently and merge their top-k lists by score.
+
+        :param embedding: Query embedding
+        :param top_k: Number of results to return
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose cosine similarity is below this value
+        """
+        if top_k <= 0:
+            return []
+        results = await asyncio.gather(
+            *(
+                self.shards[shard].get_chunks_by_embedding(embedding, top_k, filters, include_embeddings, min_score)
+                for shard in self._shards_for_filters(filters)
+            )
+        )
+        return heapq.nlargest(top_k, (match for matches in results for match in matches), key=lambda m: m.score)
+
+    async def get_chunks_by_embeddings(
+        self,
+        embeddings: NDArray[np.float64],
+        top_k: int,
+        filters: dict[str, Any] | None = None,
+        include_embeddings: bool = False,
+        min_score: float | None = None,
+    ) -> list[list[ChunkMatch]]:
+        """
+        Send the whole batch to each relevant shard concurrently and merge the lists per query.
+
+        :param embeddings: Query embeddings, one per row
+        :param top_k: Number of results per query
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each match
+        :param min_score: Drop matches whose cosine similarity is below this value
+        """
+        queries = np.atleast_2d(embeddings)
+        if top_k <= 0:
+            return [[] for _ in queries]
+        results = await asyncio.gather(
+            *(
+                self.shards[shard].get_chunks_by_embeddings(queries, top_k, filters, include_embeddings, min_score)
+                for shard in self._shards_for_filters(filters)
+            )
+        )
+        return [
+            heapq.nlargest(top_k, (match for shard in results for match in shard[query]), key=lambda m: m.score)
+            for query in range(len(queries))
+        ]
+
+    async def get_chunks_by_ids(
+        self, chunk_ids: str | list[str], include_embeddings: bool = False
+    ) -> list[ChunkRecord]:
+        """
+        Fetch chunks by ID, in the order requested. Without a 'shard_key' each
+        ID is routed to its shard; otherwise every shard is asked for all IDs.
+
+        :param chunk_ids: A single ID or a list of IDs
+        :param include_embeddings: Whether to return the stored embedding with each record
+        :return: List of retrieved chunk records
+        """
+        ids = [chunk_ids] if isinstance(chunk_ids, str) else chunk_ids
+        if self.shard_key is None:
+            ids_by_shard: dict[int, list[str]] = {}
+            for chunk_id in ids:
+                ids_by_shard.setdefault(self.shard_for(chunk_id), []).append(chunk_id)
+        else:
+            ids_by_shard = dict.fromkeys(range(len(self.shards)), ids)
+
+        results = await asyncio.gather(
+            *(
+                self.shards[shard].get_chunks_by_ids(shard_ids, include_embeddings)
+                for shard, shard_ids in ids_by_shard.items()
+            )
+        )
+        records = {record.id: record for shard_records in results for record in shard_records}
+        return [records[chunk_id] for chunk_id in ids if chunk_id in records]
+
+    async def iter_records(
+        self, batch_size: int = 1000, filters: dict[str, Any] | None = None, include_embeddings: bool = False
+    ) -> AsyncIterator[list[ChunkRecord]]:
+        """
+        Stream the records of each relevant shard in turn.
+
+        :param batch_size: Maximum number of records per yielded batch
+        :param filters: Optional metadata filter, see 'conversational_toolkit.vectorstores.filters'
+        :param include_embeddings: Whether to return the stored embedding with each record
+        """
+        for shard in self._shards_for_filters(filters):
+            async for batch in self.shards[shard].iter_records(batch_size, filters, include_embeddings):
+                yield batch
+
+    def _shards_for_filters(self, filters: dict[str, Any] | None) -> list[int]:
+        """
+        Shards that can hold matches for 'filters'. A top-level equality or '$in'
+        on 'shard_key' pins the candidates to the shards those values hash to;
+        chunks without the field never match such a filter.
+        """
+        all_shards = list(range(len(self.shards)))
+        if self.shard_key is None or not filters or self.shard_key not in filters:
+            return all_shards
+
+        condition = filters[self.shard_key]
+        if not isinstance(condition, dict):
+            values = [condition]
+        elif set(condition) == {"$eq"}:
+            values = [condition["$eq"]]
+        elif set(condition) == {"$in"}:
+            values = condition["$in"]
+        else:
+            return all_shards
+        if any(isinstance(value, (list, dict)) for value in values):
+            return all_shards
+        return sorted({_stable_hash(value) % len(self.shards) for value in values})
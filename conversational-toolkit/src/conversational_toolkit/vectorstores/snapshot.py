@@ -0,0 +1,202 @@
+"""
+Portable vector store snapshots.
+
+A snapshot is a directory that any 'VectorStore' can be exported to and
+imported from, so an index can be built once on an ingest machine and loaded
+on serving nodes without re-chunking or re-embedding the source documents:
+
+    manifest.json       format version, embedding model name, dimension, row count
+    records.parquet     id, title, content, mime_type, metadata (JSON), one row per chunk
+    embeddings.f32      raw little-endian float32 matrix of shape (count, dimension)
+
+Row 'i' of the embedding block belongs to row 'i' of the Parquet file. The
+embedding block has no header, so it can be memory-mapped directly with
+'load_snapshot_embeddings'. The manifest is written last: a directory without
+one is an incomplete export.
+
+File reads and writes run in worker threads ('asyncio.to_thread'), so an
+export or import does not stall the event loop of a serving process.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Any, BinaryIO
+
+import numpy as np
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+from loguru import logger
+from numpy.typing import NDArray
+from pydantic import BaseModel
+
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.utils.time import get_current_timestamp
+from conversational_toolkit.vectorstores.base import VectorStore
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+RECORDS_FILE = "records.parquet"
+EMBEDDINGS_FILE = "embeddings.f32"
+EMBEDDINGS_DTYPE = "<f4"
+# The exported embeddings of a batch form a (records, dimension) matrix
+_EMBEDDING_MATRIX_NDIM = 2
+
+_RECORDS_SCHEMA = pa.schema(
+    [
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("content", pa.string()),
+        ("mime_type", pa.string()),
+        ("metadata", pa.string()),
+    ]
+)
+
+
+class SnapshotManifest(BaseModel):
+    """Description of a snapshot directory, stored as 'manifest.json'."""
+
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+    model_name: str
+    embedding_size: int
+    count: int
+    embeddings_dtype: str = EMBEDDINGS_DTYPE
+    created_at: int
+
+
+async def export_snapshot(
+    vector_store: VectorStore,
+    path: str | Path,
+    model_name: str,
+    batch_size: int = 1000,
+    filters: dict[str, Any] | None = None,
+) -> SnapshotManifest:
+    """Stream every record of 'vector_store' (optionally filtered) into a snapshot directory at 'path'.
+
+    'model_name' identifies the embedding model the vectors were produced
+    with; 'import_snapshot' can check it against the model used for queries.
+    """
+    directory = Path(path)
+    writer, embeddings_file = await asyncio.to_thread(_open_export, directory)
+
+    count = 0
+    embedding_size = 0
+    try:
+        async for batch in vector_store.iter_records(batch_size, filters, include_embeddings=True):
+            if not batch:
+                continue
+            vectors = np.asarray([record.embedding for record in batch], dtype=EMBEDDINGS_DTYPE)
+            if (
+                vectors.ndim != _EMBEDDING_MATRIX_NDIM
+                or vectors.shape[1] == 0
+                or (embedding_size and vectors.shape[1] != embedding_size)
+            ):
+                raise ValueError("All exported records must have embeddings of the same size.")
+            embedding_size = vectors.shape[1]
+
+            table = pa.Table.from_pylist(
+                [
+                    {
+                        "id": record.id,
+                        "title": record.title,
+                        "content": record.content,
+                        "mime_type": record.mime_type,
+                        "metadata": json.dumps(record.metadata),
+                    }
+                    for record in batch
+                ],
+                schema=_RECORDS_SCHEMA,
+            )
+            await asyncio.to_thread(_write_batch, writer, embeddings_file, table, vectors)
+            count += len(batch)
+    finally:
+        await asyncio.to_thread(_close_export, writer, embeddings_file)
+
+    manifest = SnapshotManifest(
+        model_name=model_name,
+        embedding_size=embedding_size,
+        count=count,
+        created_at=get_current_timestamp(),
+    )
+    await asyncio.to_thread((directory / MANIFEST_FILE).write_text, manifest.model_dump_json(indent=2))
+    logger.info(f"Exported {count} chunks to snapshot {directory}")
+    return manifest
+
+
+def _open_export(directory: Path) -> tuple[pq.ParquetWriter, BinaryIO]:
+    """Prepare 'directory' for an export and open its records and embeddings files."""
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / MANIFEST_FILE).unlink(missing_ok=True)
+    writer = pq.ParquetWriter(directory / RECORDS_FILE, _RECORDS_SCHEMA)
+    return writer, open(directory / EMBEDDINGS_FILE, "wb")
+
+
+def _write_batch(writer: pq.ParquetWriter, embeddings_file: BinaryIO, table: pa.Table, vectors: NDArray[Any]) -> None:
+    writer.write_table(table)
+    vectors.tofile(embeddings_file)
+
+
+def _close_export(writer: pq.ParquetWriter, embeddings_file: BinaryIO) -> None:
+    writer.close()
+    embeddings_file.close()
+
+
+def read_snapshot_manifest(path: str | Path) -> SnapshotManifest:
+    """Read and validate the manifest of the snapshot at 'path'."""
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"No snapshot manifest at {manifest_path}; the export may be incomplete.")
+    manifest = SnapshotManifest.model_validate_json(manifest_path.read_text())
+    if manifest.format_version != SNAPSHOT_FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format version {manifest.format_version}.")
+    return manifest
+
+
+def load_snapshot_embeddings(path: str | Path, mmap: bool = True) -> NDArray[np.float32]:
+    """Return the snapshot's embedding matrix, memory-mapped read-only by default."""
+    manifest = read_snapshot_manifest(path)
+    embeddings_path = Path(path) / EMBEDDINGS_FILE
+    shape = (manifest.count, manifest.embedding_size)
+    if mmap and manifest.count:
+        return np.memmap(embeddings_path, dtype=manifest.embeddings_dtype, mode="r", shape=shape)
+    return np.fromfile(embeddings_path, dtype=manifest.embeddings_dtype).reshape(shape)
+
+
+async def import_snapshot(
+    path: str | Path,
+    vector_store: VectorStore,
+    batch_size: int = 5000,
+    expected_model_name: str | None = None,
+) -> SnapshotManifest:
+    """Insert every record of the snapshot at 'path' into 'vector_store', keeping the original IDs.
+
+    Pass 'expected_model_name' to refuse a snapshot embedded with a different
+    model than the one that will embed the queries.
+    """
+    manifest = await asyncio.to_thread(read_snapshot_manifest, path)
+    if expected_model_name is not None and manifest.model_name != expected_model_name:
+        raise ValueError(f"Snapshot was embedded with '{manifest.model_name}', expected '{expected_model_name}'.")
+
+    embeddings = await asyncio.to_thread(load_snapshot_embeddings, path)
+    batches = pq.ParquetFile(Path(path) / RECORDS_FILE).iter_batches(batch_size=batch_size)
+    start = 0
+    while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+        rows = batch.to_pylist()
+        chunks = [
+            Chunk(
+                title=row["title"],
+                content=row["content"],
+                mime_type=row["mime_type"],
+                metadata=json.loads(row["metadata"]),
+            )
+            for row in rows
+        ]
+        end = start + len(rows)
+        vectors = await asyncio.to_thread(np.asarray, embeddings[start:end], dtype=np.float64)
+        await vector_store.insert_chunks(chunks, vectors, ids=[row["id"] for row in rows])
+        start = end
+
+    if start != manifest.count:
+        raise ValueError(f"Snapshot manifest lists {manifest.count} records but {start} were found.")
+    logger.info(f"Imported {start} chunks from snapshot {path}")
+    return manifest
@@ -0,0 +1,88 @@
+import asyncio
+import os
+from collections.abc import AsyncGenerator
+
+import numpy as np
+import pytest
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.llms.base import LLM, LLMMessage
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.vectorstores.base import ChunkMatch
+
+
+@pytest.fixture
+def pg_url() -> str:
+    """Connection URL of a PostgreSQL database with pgvector; tests using it are skipped when unset."""
+    url = os.environ.get("PGVECTOR_TEST_URL")
+    if not url:
+        pytest.skip("PGVECTOR_TEST_URL is not set")
+    return url
+
+
+def make_chunks(n: int, **metadata: object) -> list[Chunk]:
+    return [
+        Chunk(
+            title=f"Title {i}",
+            content=f"Content {i}",
+            mime_type="text/plain",
+            metadata={"n": i, **metadata},
+        )
+        for i in range(n)
+    ]
+
+
+def make_embeddings(n: int, dim: int = 8, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(n, dim))
+
+
+def make_match(chunk_id: str, score: float = 0.0, **metadata: object) -> ChunkMatch:
+    return ChunkMatch(
+        id=chunk_id,
+        title=chunk_id,
+        content=f"Content of {chunk_id}",
+        mime_type="text/plain",
+        metadata=metadata,
+        embedding=[],
+        score=score,
+    )
+
+
+class StaticRetriever(Retriever[ChunkMatch]):
+    """Returns the same ranked (id, score) list for every query, truncated to 'top_k'."""
+
+    def __init__(
+        self, ranking: list[tuple[str, float]], top_k: int = 10, delay: float = 0.0
+    ) -> None:
+        super().__init__(top_k)
+        self.ranking = ranking
+        self.delay = delay
+        self.queries: list[str] = []
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        self.queries.append(query)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return [make_match(cid, score) for cid, score in self.ranking[: self.top_k]]
+
+
+class ScriptedLLM(LLM):
+    """Answers with the given responses in turn and records every conversation."""
+
+    def __init__(self, *responses: str, model: str = "scripted") -> None:
+        super().__init__()
+        self.responses = list(responses)
+        self.model = model
+        self.conversations: list[list[LLMMessage]] = []
+
+    @property
+    def calls(self) -> int:
+        return len(self.conversations)
+
+    async def generate(self, conversation: list[LLMMessage]) -> LLMMessage:
+        self.conversations.append(conversation)
+        return LLMMessage(content=self.responses.pop(0))
+
+    async def generate_stream(
+        self, conversation: list[LLMMessage]
+    ) -> AsyncGenerator[LLMMessage, None]:
+        yield await self.generate(conversation)
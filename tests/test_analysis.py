@@ -0,0 +1,104 @@
+import re
+
+import pytest
+from conversational_toolkit.retriever.analysis import (
+    Analyzer,
+    Language,
+    benchmark_analyzer,
+    fold_diacritics,
+    stem_english,
+    stem_german,
+)
+
+
+def test_default_matches_lowercase_word_tokenizer():
+    text = "Die HOLZpalette (snake_case, Maß 3.5) für café-Kunden"
+    assert Analyzer().analyze(text) == re.findall(r"\b\w+\b", text.lower())
+
+
+def test_unicode_normalization_is_opt_in():
+    analyzer = Analyzer(unicode_normalization=True)
+    assert analyzer.analyze("ﬁle STRASSE Straße") == ["file", "strasse", "strasse"]
+    assert Analyzer().analyze("Straße") == ["straße"]
+
+
+def test_fold_diacritics():
+    assert fold_diacritics("für") == "fur"
+    assert fold_diacritics("maß") == "mass"
+    assert fold_diacritics("café") == "cafe"
+
+
+@pytest.mark.parametrize(
+    ("token", "stem"),
+    [
+        ("paletten", "palett"),
+        ("kindern", "kind"),
+        ("kleinste", "klein"),
+        ("hauses", "haus"),
+        ("tage", "tag"),
+        ("see", "see"),
+        ("rot", "rot"),
+    ],
+)
+def test_stem_german(token, stem):
+    assert stem_german(token) == stem
+
+
+@pytest.mark.parametrize(
+    ("token", "stem"),
+    [
+        ("pallets", "pallet"),
+        ("classes", "class"),
+        ("ponies", "pony"),
+        ("dies", "die"),
+        ("stopped", "stop"),
+        ("filled", "fill"),
+        ("running", "run"),
+        ("bus", "bus"),
+        ("sing", "sing"),
+    ],
+)
+def test_stem_english(token, stem):
+    assert stem_english(token) == stem
+
+
+def test_full_pipeline():
+    analyzer = Analyzer(
+        stopwords=[Language.GERMAN],
+        stemmer=Language.GERMAN,
+        fold_diacritics=True,
+        compound_parts=["Holz", "Palette", "Verpackung", "Material"],
+    )
+    assert analyzer.analyze("Die Holzpaletten für Verpackungsmaterial") == [
+        "holzpalett",
+        "holz",
+        "palett",
+        "verpackungsmaterial",
+        "verpackung",
+        "material",
+    ]
+
+
+def test_min_length_and_char_ngrams():
+    analyzer = Analyzer(min_length=3, char_ngrams=3)
+    assert analyzer.analyze("an Holz") == ["holz", "hol", "olz"]
+
+
+def test_configuration_round_trips():
+    analyzer = Analyzer(
+        stopwords=[Language.ENGLISH],
+        stemmer=Language.ENGLISH,
+        compound_parts=["wood"],
+        unicode_normalization=True,
+    )
+    restored = Analyzer.from_dict(analyzer.to_dict())
+    assert restored.to_dict() == analyzer.to_dict()
+    assert restored.analyze("The ﬁles were stored") == analyzer.analyze(
+        "The ﬁles were stored"
+    )
+
+
+def test_benchmark_reports_vocabulary():
+    result = benchmark_analyzer(Analyzer(), ["a b", "b c"], repeat=2)
+    assert (result.texts, result.tokens, result.vocabulary_size) == (2, 4, 3)
+    assert result.tokens_per_second > 0
@@ -0,0 +1,104 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.embeddings.batching import BatchingEmbeddings
+
+
+class RecordingEmbeddings(EmbeddingsModel):
+    """Embeds a text as [len(text), index in its call] and records every call."""
+
+    def __init__(self, error: BaseException | None = None, delay: float = 0.0) -> None:
+        self.calls: list[list[str]] = []
+        self.error = error
+        self.delay = delay
+
+    async def get_embeddings(self, texts: str | list[str]) -> np.ndarray:
+        texts = [texts] if isinstance(texts, str) else texts
+        self.calls.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return np.array([[len(text), 0.0] for text in texts]).reshape(-1, 2)
+
+
+def test_concurrent_calls_share_one_batch():
+    model = RecordingEmbeddings()
+    batching = BatchingEmbeddings(model, max_wait=0.01)
+
+    async def run() -> list[np.ndarray]:
+        return await asyncio.gather(
+            batching.get_embeddings("a"),
+            batching.get_embeddings(["bb", "a"]),
+            batching.get_embeddings("ccc"),
+        )
+
+    first, second, third = asyncio.run(run())
+    assert model.calls == [["a", "bb", "ccc"]]
+    assert first[:, 0].tolist() == [1]
+    assert second[:, 0].tolist() == [2, 1]
+    assert third[:, 0].tolist() == [3]
+
+
+def test_large_calls_are_split_into_max_batch_size_chunks():
+    model = RecordingEmbeddings()
+    batching = BatchingEmbeddings(model, max_batch_size=4)
+    texts = ["x" * i for i in range(1, 11)]
+
+    embeddings = asyncio.run(batching.get_embeddings(texts))
+
+    assert [len(call) for call in model.calls] == [4, 4, 2]
+    assert embeddings[:, 0].tolist() == list(range(1, 11))
+
+
+def test_errors_reach_every_caller():
+    batching = BatchingEmbeddings(RecordingEmbeddings(RuntimeError("quota")))
+
+    async def run() -> list[object]:
+        return await asyncio.gather(
+            batching.get_embeddings("a"),
+            batching.get_embeddings("b"),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(run())
+    assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+
+def test_cancelled_batch_cancels_its_callers():
+    batching = BatchingEmbeddings(RecordingEmbeddings(delay=5), max_wait=0)
+
+    async def run() -> list[object]:
+        callers = asyncio.gather(
+            batching.get_embeddings("a"),
+            batching.get_embeddings("b"),
+            return_exceptions=True,
+        )
+        await asyncio.sleep(0.01)
+        (batch_task,) = batching._tasks
+        batch_task.cancel()
+        results = await callers
+        await asyncio.sleep(0)
+        assert batch_task.cancelled()
+        return results
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+
+
+def test_empty_input_bypasses_batching():
+    model = RecordingEmbeddings()
+    embeddings = asyncio.run(BatchingEmbeddings(model).get_embeddings([]))
+    assert embeddings.shape == (0, 2)
+    assert model.calls == [[]]
+
+
+@pytest.mark.parametrize("max_batch_size", [1, 3])
+def test_duplicates_are_embedded_once(max_batch_size):
+    model = RecordingEmbeddings()
+    batching = BatchingEmbeddings(model, max_batch_size=max_batch_size)
+    embeddings = asyncio.run(batching.get_embeddings(["a", "bb", "a"]))
+    assert sorted(text for call in model.calls for text in call) == ["a", "bb"]
+    assert embeddings[:, 0].tolist() == [1, 2, 1]
@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+from conversational_toolkit.vectorstores.quantization import (
+    benchmark_binary_recall,
+    binary_quantize,
+    code_words,
+    hamming_candidates,
+    hamming_distances,
+)
+
+
+def test_codes_pack_sign_bits_little_endian():
+    vector = np.array([1.0, -1.0, 0.5] + [-1.0] * 62 + [2.0])
+    code = binary_quantize(vector)
+    assert code.shape == (code_words(66),) == (2,)
+    assert int(code[0]) == 0b101
+    assert int(code[1]) == 0b10
+    assert binary_quantize(np.stack([vector, -vector])).shape == (2, 2)
+
+
+def test_hamming_distance_and_candidates():
+    codes = binary_quantize(np.array([[1, 1, 1, 1], [1, 1, -1, -1], [-1, -1, -1, -1]]))
+    query = binary_quantize(np.array([1, 1, 1, -1]))
+    assert hamming_distances(query, codes).tolist() == [1, 1, 3]
+    assert sorted(hamming_candidates(query, codes, 2).tolist()) == [0, 1]
+    assert hamming_candidates(query, codes, 5).tolist() == [0, 1, 2]
+
+
+def test_binary_search_rescoring_with_large_pool_is_exact():
+    embeddings = make_embeddings(200, dim=32)
+    queries = make_embeddings(5, dim=32, seed=1)
+    exact = InMemoryVectorStore()
+    binary = InMemoryVectorStore(binary_quantization=True, oversampling=200)
+
+    async def run():
+        for store in (exact, binary):
+            await store.insert_chunks(
+                make_chunks(200), embeddings, [str(i) for i in range(200)]
+            )
+        return (
+            [await exact.get_chunks_by_embedding(q, 5) for q in queries],
+            [await binary.get_chunks_by_embedding(q, 5) for q in queries],
+        )
+
+    expected, actual = asyncio.run(run())
+    assert [[m.id for m in ms] for ms in actual] == [
+        [m.id for m in ms] for ms in expected
+    ]
+    np.testing.assert_allclose(
+        [m.score for ms in actual for m in ms], [m.score for ms in expected for m in ms]
+    )
+
+
+def test_binary_search_applies_filters():
+    embeddings = make_embeddings(50, dim=16)
+    store = InMemoryVectorStore(binary_quantization=True)
+    chunks = make_chunks(50)
+    asyncio.run(store.insert_chunks(chunks, embeddings))
+    matches = asyncio.run(
+        store.get_chunks_by_embedding(embeddings[3], 5, {"n": {"$lt": 10}})
+    )
+    assert matches[0].metadata["n"] == 3
+    assert all(m.metadata["n"] < 10 for m in matches)
+
+
+def test_recall_benchmark_improves_with_oversampling():
+    embeddings = make_embeddings(500, dim=64)
+    queries = make_embeddings(10, dim=64, seed=2)
+    results = benchmark_binary_recall(
+        embeddings, queries, top_k=10, oversampling=(1, 50)
+    )
+    assert [r.oversampling for r in results] == [1, 50]
+    assert results[0].recall <= results[1].recall
+    assert results[1].recall == 1.0
@@ -0,0 +1,122 @@
+import asyncio
+import math
+
+import numpy as np
+import pytest
+from conversational_toolkit.retriever.bm25_index import BM25Index
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.base import ChunkRecord
+
+WORDS = [f"w{i}" for i in range(40)]
+
+
+def random_documents(n: int, seed: int = 0) -> list[list[str]]:
+    rng = np.random.default_rng(seed)
+    # Zipf-like term distribution so postings lengths differ a lot
+    weights = 1 / np.arange(1, len(WORDS) + 1)
+    return [
+        list(rng.choice(WORDS, size=rng.integers(1, 30), p=weights / weights.sum()))
+        for _ in range(n)
+    ]
+
+
+def reference_scores(
+    documents: list[list[str]], query: list[str], k1: float = 1.5, b: float = 0.75
+) -> list[float]:
+    average_length = sum(map(len, documents)) / len(documents)
+    scores = []
+    for document in documents:
+        score = 0.0
+        for term in query:
+            n = sum(term in other for other in documents)
+            tf = document.count(term)
+            idf = math.log(1 + (len(documents) - n + 0.5) / (n + 0.5))
+            norm = k1 * (1 - b + b * len(document) / average_length)
+            score += idf * tf * (k1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def test_scores_match_bm25_formula():
+    documents = random_documents(50)
+    index = BM25Index.build(documents)
+    query = ["w0", "w3", "w3", "w17", "unknown"]
+
+    np.testing.assert_allclose(
+        index.get_scores(query), reference_scores(documents, query), rtol=1e-5
+    )
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_pruned_search_equals_exhaustive_search(seed):
+    documents = random_documents(300, seed)
+    index = BM25Index.build(documents)
+    rng = np.random.default_rng(seed + 100)
+    for _ in range(20):
+        query = list(rng.choice(WORDS, size=4))
+        exhaustive = index.get_scores(query)
+        docs, scores = index.search(query, 10, prune=True)
+        expected = np.sort(exhaustive[exhaustive > 0])[::-1][:10]
+        np.testing.assert_allclose(scores, expected, rtol=1e-5)
+        np.testing.assert_allclose(exhaustive[docs], scores, rtol=1e-5)
+
+
+def test_search_orders_best_first_and_respects_mask():
+    index = BM25Index.build([["a", "b"], ["a"], ["b", "b", "c"], ["c"]])
+    mask = np.array([True, True, False, True])
+
+    docs, scores = index.search(["a", "b"], 10)
+    masked_docs, _ = index.search(["a", "b"], 10, mask=mask)
+
+    assert docs.tolist() == [0, 1, 2]
+    assert list(scores) == sorted(scores, reverse=True)
+    assert masked_docs.tolist() == [0, 1]
+    assert index.search(["zzz"], 10)[0].size == 0
+    assert index.search(["a"], 0)[0].size == 0
+
+
+def test_search_many_matches_search():
+    documents = random_documents(200)
+    index = BM25Index.build(documents)
+    queries = [["w1", "w5"], ["w30"], [], ["w2", "w2", "w9", "w20"]]
+
+    for query, (docs, scores) in zip(queries, index.search_many(queries, 5)):
+        expected_docs, expected_scores = index.search(query, 5)
+        np.testing.assert_allclose(scores, expected_scores, rtol=1e-5)
+        assert len(docs) == len(expected_docs)
+
+
+def test_retriever_returns_matches_with_filters():
+    corpus = [
+        ChunkRecord(
+            id=f"id-{i}",
+            title="",
+            content=content,
+            mime_type="text/plain",
+            metadata={"lang": lang},
+            embedding=[0.0],
+        )
+        for i, (content, lang) in enumerate(
+            [
+                ("The cat sat on the mat", "en"),
+                ("A cat and a dog", "en"),
+                ("Die Katze und der Hund", "de"),
+                ("Cat cat cat", "de"),
+            ]
+        )
+    ]
+    retriever = BM25Retriever(corpus, top_k=2)
+
+    matches = asyncio.run(retriever.retrieve("cat"))
+    filtered = asyncio.run(retriever.retrieve("cat", {"lang": "en"}))
+
+    assert matches[0].id == "id-3"
+    assert len(matches) == 2
+    assert {match.id for match in filtered} == {"id-0", "id-1"}
+    assert matches[0].embedding == []
+
+
+def test_unknown_terms_score_zero():
+    index = BM25Index.build([["a"], ["b"]])
+    assert index.get_scores(["zzz"]).tolist() == [0.0, 0.0]
+    assert index.get_scores([]).tolist() == [0.0, 0.0]
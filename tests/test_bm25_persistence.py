@@ -0,0 +1,146 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conversational_toolkit.retriever.bm25_index import BM25Index
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.base import ChunkRecord
+
+DOCUMENTS = [
+    ["red", "apple"],
+    ["green", "apple", "pie"],
+    ["red", "car"],
+    ["blue", "car", "car"],
+]
+
+
+def make_records(contents: list[str], prefix: str = "id") -> list[ChunkRecord]:
+    return [
+        ChunkRecord(
+            id=f"{prefix}-{i}",
+            title="",
+            content=content,
+            mime_type="text/plain",
+            metadata={"i": i},
+            embedding=[float(i)],
+        )
+        for i, content in enumerate(contents)
+    ]
+
+
+def test_incremental_updates_equal_a_rebuild():
+    index = BM25Index.build(DOCUMENTS[:2])
+    assert index.add(DOCUMENTS[2:]) == range(2, 4)
+    index.delete([1])
+
+    rebuilt = BM25Index.build([DOCUMENTS[0], [], DOCUMENTS[2], DOCUMENTS[3]])
+    rebuilt.delete([1])
+
+    assert index.n_live == 3
+    for query in (["apple"], ["red", "car"], ["pie"]):
+        np.testing.assert_allclose(index.get_scores(query), rebuilt.get_scores(query))
+    assert index.search(["pie"], 10)[0].size == 0
+
+
+def test_delete_rejects_unknown_documents():
+    index = BM25Index.build(DOCUMENTS)
+    with pytest.raises(IndexError):
+        index.delete([4])
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_saved_index_loads_with_the_same_scores(tmp_path, mmap):
+    index = BM25Index.build(DOCUMENTS, k1=1.2, b=0.5)
+    index.delete([0])
+    index.save(tmp_path)
+
+    loaded = BM25Index.load(tmp_path, mmap=mmap)
+    assert (loaded.k1, loaded.b, loaded.vocabulary) == (1.2, 0.5, index.vocabulary)
+    np.testing.assert_array_equal(
+        loaded.get_scores(["red", "car"]), index.get_scores(["red", "car"])
+    )
+
+    # Updating a memory-mapped index copies the arrays instead of writing to disk
+    loaded.add([["red", "red"]])
+    assert loaded.search(["red"], 1)[0].tolist() == [4]
+    assert BM25Index.load(tmp_path).search(["red"], 10)[0].tolist() == [2]
+
+
+def test_load_rejects_other_format_versions(tmp_path):
+    BM25Index.build(DOCUMENTS).save(tmp_path)
+    header = tmp_path / "vocabulary.json"
+    header.write_text(
+        header.read_text().replace('"format_version": 1', '"format_version": 99')
+    )
+    with pytest.raises(ValueError, match="format version"):
+        BM25Index.load(tmp_path)
+
+
+def test_retriever_add_delete_and_reload(tmp_path):
+    retriever = BM25Retriever(make_records(["red apple", "green apple"]), top_k=5)
+    version = retriever.version
+
+    retriever.add_records(make_records(["red apple pie"]))  # replaces id-0
+    retriever.add_records(make_records(["blue car"], prefix="new"))
+    retriever.delete_records(["id-1", "missing"])
+    assert retriever.version == version + 3
+
+    async def ids(model: BM25Retriever, query: str, filters=None) -> list[str]:
+        return [match.id for match in await model.retrieve(query, filters)]
+
+    assert asyncio.run(ids(retriever, "apple")) == ["id-0"]
+    assert asyncio.run(ids(retriever, "pie")) == ["id-0"]
+    assert asyncio.run(ids(retriever, "car", {"i": 0})) == ["new-0"]
+
+    retriever.save(tmp_path)
+    loaded = BM25Retriever.load(tmp_path, top_k=5)
+    for query in ("apple", "car", "red"):
+        assert asyncio.run(ids(loaded, query)) == asyncio.run(ids(retriever, query))
+    assert asyncio.run(ids(loaded, "green")) == []
+
+
+def test_compact_renumbers_live_documents_with_the_same_scores():
+    index = BM25Index.build(DOCUMENTS)
+    index.delete([0, 2])
+    expected = index.get_scores(["red", "car", "apple"])
+
+    assert index.compact().tolist() == [1, 3]
+    assert len(index) == index.n_live == 2
+    np.testing.assert_allclose(
+        index.get_scores(["red", "car", "apple"]), expected[[1, 3]]
+    )
+
+
+def test_retriever_copies_its_corpus_and_compacts_after_many_deletions():
+    corpus = make_records(["red apple", "green apple", "red car", "blue car"])
+    retriever = BM25Retriever(corpus, top_k=5)
+    retriever.add_records(make_records(["red apple pie"]))  # replaces id-0
+    assert len(corpus) == 4
+
+    retriever.delete_records(["id-2", "id-3"])
+    assert len(retriever.corpus) == len(retriever.index) == 2
+
+    async def ids(query: str, filters=None) -> list[str]:
+        return [match.id for match in await retriever.retrieve(query, filters)]
+
+    assert asyncio.run(ids("apple")) == ["id-1", "id-0"]
+    assert asyncio.run(ids("pie", {"i": 0})) == ["id-0"]
+    retriever.delete_records(["id-0"])
+    assert asyncio.run(ids("apple")) == ["id-1"]
+
+
+def test_reloaded_retriever_can_delete_a_replaced_record(tmp_path):
+    retriever = BM25Retriever(
+        make_records(["red apple", "green apple"]), top_k=5, compact_threshold=1.0
+    )
+    retriever.add_records(make_records(["red apple pie"]))
+    retriever.save(tmp_path)
+
+    loaded = BM25Retriever.load(tmp_path, top_k=5)
+    loaded.delete_records(["id-0"])
+    assert [match.id for match in asyncio.run(loaded.retrieve("apple"))] == ["id-1"]
+
+
+def test_retriever_rejects_mismatched_index():
+    with pytest.raises(ValueError, match="documents"):
+        BM25Retriever(make_records(["a"]), top_k=1, index=BM25Index.build(DOCUMENTS))
@@ -0,0 +1,92 @@
+import asyncio
+from typing import Any
+
+from conftest import StaticRetriever, make_match
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.retriever.cached_retriever import CachedRetriever
+from conversational_toolkit.vectorstores.base import ChunkMatch, ChunkRecord
+
+
+class FilteringRetriever(StaticRetriever):
+    """Records every batch; results carry the query and filters they were made for."""
+
+    def __init__(self, top_k: int = 3) -> None:
+        super().__init__([], top_k)
+        self.batches: list[tuple[list[str], dict[str, Any] | None]] = []
+
+    async def retrieve_many(
+        self, queries: list[str], filters: dict[str, Any] | None = None
+    ) -> list[list[ChunkMatch]]:
+        self.batches.append((queries, filters))
+        return [
+            [make_match(f"{query}/{filters}/{rank}") for rank in range(self.top_k)]
+            for query in queries
+        ]
+
+
+def test_repeated_queries_are_served_from_the_cache():
+    base = FilteringRetriever()
+    cached = CachedRetriever(base)
+
+    first = asyncio.run(cached.retrieve("Pallet prices"))
+    second = asyncio.run(cached.retrieve("  pallet PRICES "))
+
+    assert [m.id for m in second] == [m.id for m in first]
+    assert len(base.batches) == 1
+    assert cached.cache.hits == 1
+
+
+def test_only_misses_are_retrieved_as_one_batch():
+    base = FilteringRetriever()
+    cached = CachedRetriever(base)
+    asyncio.run(cached.retrieve("a"))
+
+    results = asyncio.run(cached.retrieve_many(["a", "b", "c"]))
+
+    assert base.batches[-1] == (["b", "c"], None)
+    assert [r[0].id for r in results] == ["a/None/0", "b/None/0", "c/None/0"]
+
+
+def test_filters_are_part_of_the_key_and_passed_through():
+    base = FilteringRetriever()
+    cached = CachedRetriever(base)
+
+    asyncio.run(cached.retrieve("a", {"lang": "de"}))
+    asyncio.run(cached.retrieve("a", {"lang": "en"}))
+    asyncio.run(cached.retrieve("a", {"lang": "de"}))
+
+    assert base.batches == [(["a"], {"lang": "de"}), (["a"], {"lang": "en"})]
+
+
+def test_top_k_override_leaves_the_wrapped_retriever_untouched():
+    base = FilteringRetriever(top_k=3)
+    cached = CachedRetriever(base, top_k=1)
+
+    assert len(asyncio.run(cached.retrieve("a"))) == 1
+    assert base.top_k == 3
+
+
+def test_index_updates_invalidate_cached_results():
+    record = ChunkRecord(
+        id="old",
+        title="",
+        content="wooden pallet",
+        mime_type="text/plain",
+        metadata={},
+        embedding=[],
+    )
+    bm25 = BM25Retriever([record], top_k=5)
+    cached = CachedRetriever(bm25)
+    assert [m.id for m in asyncio.run(cached.retrieve("pallet"))] == ["old"]
+
+    bm25.add_records([record.model_copy(update={"id": "new"})])
+
+    assert {m.id for m in asyncio.run(cached.retrieve("pallet"))} == {"old", "new"}
+    assert cached.version == bm25.version
+    assert len(cached.cache) == 1
+
+
+def test_returned_lists_are_copies():
+    cached = CachedRetriever(FilteringRetriever())
+    asyncio.run(cached.retrieve("a")).clear()
+    assert len(asyncio.run(cached.retrieve("a"))) == 3
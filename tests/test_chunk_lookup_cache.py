@@ -0,0 +1,99 @@
+import asyncio
+import types
+
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.utils import cache as cache_module
+from conversational_toolkit.utils.cache import LRUCache
+from conversational_toolkit.vectorstores.cached import CachedVectorStore
+from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+
+class CountingStore(InMemoryVectorStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.lookups: list[list[str]] = []
+
+    async def get_chunks_by_ids(self, chunk_ids, include_embeddings=False):
+        self.lookups.append(list(chunk_ids))
+        return await super().get_chunks_by_ids(chunk_ids, include_embeddings)
+
+
+@pytest.fixture(params=["in_memory", "chroma"])
+def store(request, tmp_path):
+    if request.param == "chroma":
+        return ChromaDBVectorStore(str(tmp_path / "chroma"), "lookup_test")
+    return InMemoryVectorStore()
+
+
+def test_lookup_keeps_request_order_and_skips_unknown_ids(store):
+    async def run():
+        await store.insert_chunks(make_chunks(5), make_embeddings(5), list("abcde"))
+        return (
+            await store.get_chunks_by_ids(["d", "missing", "a", "d"]),
+            await store.get_chunks_by_ids("c"),
+            await store.get_chunks_by_ids([]),
+        )
+
+    many, single, empty = asyncio.run(run())
+    assert [record.id for record in many] == ["d", "a", "d"]
+    assert [record.content for record in single] == ["Content 2"]
+    assert empty == []
+
+
+def test_cached_store_fetches_only_missing_ids_in_one_call():
+    inner = CountingStore()
+    store = CachedVectorStore(inner)
+    asyncio.run(store.insert_chunks(make_chunks(5), make_embeddings(5), list("abcde")))
+
+    first = asyncio.run(store.get_chunks_by_ids(["a", "b"]))
+    second = asyncio.run(store.get_chunks_by_ids(["b", "c", "a", "zz"]))
+
+    assert [r.id for r in first] == ["a", "b"]
+    assert [r.id for r in second] == ["b", "c", "a"]
+    assert inner.lookups == [["a", "b"], ["c", "zz"]]
+
+
+def test_cached_store_evicts_reinserted_ids_and_refetches_embeddings():
+    inner = CountingStore()
+    store = CachedVectorStore(inner)
+    chunks = make_chunks(2)
+    asyncio.run(store.insert_chunks(chunks, make_embeddings(2), ["a", "b"]))
+    asyncio.run(store.get_chunks_by_ids(["a"]))
+
+    with_embedding = asyncio.run(
+        store.get_chunks_by_ids(["a"], include_embeddings=True)
+    )
+    assert len(with_embedding[0].embedding) == 8
+    assert asyncio.run(store.get_chunks_by_ids(["a"]))[0].embedding == []
+    assert inner.lookups == [["a"], ["a"]]
+
+    stale = with_embedding[0].model_copy(update={"id": "c", "content": "stale"})
+    store.cache.set("c", stale)
+    asyncio.run(store.insert_chunks(make_chunks(1), make_embeddings(1), ["c"]))
+    assert "c" not in store.cache
+    assert asyncio.run(store.get_chunks_by_ids(["c"]))[0].content == "Content 0"
+    assert store.version == inner.version
+
+
+def test_lru_cache_evicts_least_recently_used_and_expires(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(
+        cache_module, "time", types.SimpleNamespace(monotonic=lambda: now[0])
+    )
+    cache: LRUCache[str, int] = LRUCache(maxsize=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert "b" not in cache
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert len(cache) == 1
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    with pytest.raises(ValueError, match="maxsize"):
+        LRUCache(maxsize=0)
@@ -0,0 +1,84 @@
+import asyncio
+
+from conftest import make_chunks
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.retriever.context_expansion import (
+    NEXT_CHUNK_ID,
+    PREV_CHUNK_ID,
+    ContextExpansionRetriever,
+    link_neighbours,
+)
+from conversational_toolkit.vectorstores.base import ChunkRecord, VectorStore
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+
+class StoredHitsRetriever(Retriever[ChunkRecord]):
+    """Returns the stored chunks at the given positions, in that order."""
+
+    def __init__(self, store: VectorStore, ids: list[str]) -> None:
+        super().__init__(len(ids))
+        self.store = store
+        self.ids = ids
+
+    async def retrieve(self, query: str) -> list[ChunkRecord]:
+        records = {r.id: r for r in await self.store.get_chunks_by_ids(self.ids)}
+        return [records[chunk_id] for chunk_id in self.ids]
+
+
+def build_store(chunks: list[Chunk]) -> tuple[InMemoryVectorStore, list[str]]:
+    ids = link_neighbours(chunks)
+    store = InMemoryVectorStore()
+    asyncio.run(
+        store.insert_chunks(chunks, [[1.0, float(i)] for i in range(len(chunks))], ids)
+    )
+    return store, ids
+
+
+def test_link_neighbours_stays_within_a_document():
+    chunks = make_chunks(2, source_file="a.pdf") + make_chunks(1, source_file="b.pdf")
+    ids = link_neighbours(chunks)
+
+    assert len(set(ids)) == 3
+    assert chunks[0].metadata[NEXT_CHUNK_ID] == ids[1]
+    assert chunks[1].metadata[PREV_CHUNK_ID] == ids[0]
+    assert NEXT_CHUNK_ID not in chunks[1].metadata
+    assert PREV_CHUNK_ID not in chunks[0].metadata
+    assert PREV_CHUNK_ID not in chunks[2].metadata
+
+
+def test_hits_grow_into_passages_within_the_window():
+    store, ids = build_store(make_chunks(7, source_file="a.pdf"))
+    retriever = ContextExpansionRetriever(
+        StoredHitsRetriever(store, [ids[3]]), store, window=2
+    )
+
+    (passage,) = asyncio.run(retriever.retrieve("q"))
+
+    assert passage.id == ids[3]
+    assert passage.metadata["expanded_chunk_ids"] == ids[1:6]
+    assert passage.content == "\n\n".join(f"Content {i}" for i in range(1, 6))
+
+
+def test_touching_hits_are_merged_into_one_passage():
+    store, ids = build_store(make_chunks(6, source_file="a.pdf"))
+    retriever = ContextExpansionRetriever(
+        StoredHitsRetriever(store, [ids[4], ids[1]]), store, window=1
+    )
+
+    (passage,) = asyncio.run(retriever.retrieve("q"))
+
+    assert passage.id == ids[4]
+    assert passage.metadata["expanded_chunk_ids"] == ids[0:6]
+
+
+def test_token_budget_limits_expansion():
+    store, ids = build_store(make_chunks(5, source_file="a.pdf"))
+    # Every chunk costs 2 tokens: the hit plus one neighbour fit
+    retriever = ContextExpansionRetriever(
+        StoredHitsRetriever(store, [ids[2]]), store, window=2, max_tokens=5
+    )
+
+    (passage,) = asyncio.run(retriever.retrieve("q"))
+
+    assert passage.metadata["expanded_chunk_ids"] == ids[2:4]
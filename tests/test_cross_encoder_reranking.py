@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from conftest import StaticRetriever, make_match
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.vectorstores.base import ChunkMatch
+
+pytest.importorskip("sentence_transformers")
+
+from conversational_toolkit.retriever import (
+    cross_encoder_reranking_retriever as module,
+)
+
+
+class FakeCrossEncoder:
+    """Scores a pair by how often the query occurs in the document."""
+
+    def __init__(self, model_name: str, max_length: int, **kwargs: object) -> None:
+        self.batches: list[int] = []
+
+    def eval(self) -> None:
+        pass
+
+    def predict(self, pairs, batch_size: int, show_progress_bar: bool) -> list[float]:
+        self.batches.append(batch_size)
+        return [document.count(query) / 10 for query, document in pairs]
+
+
+@pytest.fixture(autouse=True)
+def fake_model(monkeypatch):
+    monkeypatch.setattr(module, "CrossEncoder", FakeCrossEncoder)
+
+
+class ContentRetriever(Retriever[ChunkMatch]):
+    """Candidates 'c0'..'c5' whose contents contain the query term 0-4 times."""
+
+    CONTENTS = ("x", "q", "q q q", "", "q q", "q q q q")
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        return [
+            make_match(f"c{i}").model_copy(update={"title": "", "content": content})
+            for i, content in enumerate(self.CONTENTS[: self.top_k])
+        ]
+
+
+def test_reranks_the_candidate_pool_by_cross_encoder_score():
+    base = ContentRetriever(3)
+    reranker = module.CrossEncoderRerankingRetriever(
+        base, top_k=2, candidate_pool=6, batch_size=4
+    )
+
+    matches = asyncio.run(reranker.retrieve("q"))
+
+    assert [(m.id, m.score) for m in matches] == [("c5", 0.4), ("c2", 0.3)]
+    assert base.top_k == 3
+    assert reranker.model.batches == [4]
+
+
+def test_min_score_drops_weak_candidates():
+    reranker = module.CrossEncoderRerankingRetriever(
+        ContentRetriever(3), top_k=10, candidate_pool=6, min_score=0.2
+    )
+    assert [m.id for m in asyncio.run(reranker.retrieve("q"))] == ["c5", "c2", "c4"]
+
+
+def test_empty_candidate_pool():
+    reranker = module.CrossEncoderRerankingRetriever(StaticRetriever([]), top_k=3)
+    assert asyncio.run(reranker.retrieve("q")) == []
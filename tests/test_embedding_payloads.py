@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.retriever.vectorstore_retriever import VectorStoreRetriever
+from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+
+class FixedEmbeddings(EmbeddingsModel):
+    def __init__(self, vector: np.ndarray) -> None:
+        self.vector = vector
+
+    async def get_embeddings(self, texts: str | list[str]) -> np.ndarray:
+        count = 1 if isinstance(texts, str) else len(texts)
+        return np.tile(self.vector, (count, 1))
+
+
+@pytest.fixture(params=["in_memory", "chroma"])
+def store(request, tmp_path):
+    if request.param == "chroma":
+        return ChromaDBVectorStore(str(tmp_path / "chroma"), "payload_test")
+    return InMemoryVectorStore()
+
+
+def test_search_and_lookup_skip_embeddings_unless_requested(store):
+    embeddings = make_embeddings(5)
+    ids = [str(i) for i in range(5)]
+
+    async def run():
+        await store.insert_chunks(make_chunks(5), embeddings, ids)
+        return (
+            await store.get_chunks_by_embedding(embeddings[0], 3),
+            await store.get_chunks_by_embedding(
+                embeddings[0], 3, include_embeddings=True
+            ),
+            await store.get_chunks_by_ids(ids),
+            await store.get_chunks_by_ids(ids, include_embeddings=True),
+        )
+
+    bare, full, bare_records, full_records = asyncio.run(run())
+    assert all(match.embedding == [] for match in bare + bare_records)
+    assert full[0].id == "0"
+    np.testing.assert_allclose(full[0].embedding, embeddings[0], rtol=1e-5)
+    for record in full_records:
+        np.testing.assert_allclose(
+            record.embedding, embeddings[int(record.id)], rtol=1e-5
+        )
+
+
+def test_retriever_passes_include_embeddings_through():
+    embeddings = make_embeddings(4)
+    store = InMemoryVectorStore()
+    asyncio.run(store.insert_chunks(make_chunks(4), embeddings))
+
+    def retrieve(include: bool):
+        retriever = VectorStoreRetriever(
+            FixedEmbeddings(embeddings[2]), store, top_k=2, include_embeddings=include
+        )
+        return asyncio.run(retriever.retrieve("query"))
+
+    assert retrieve(False)[0].embedding == []
+    assert len(retrieve(True)[0].embedding) == embeddings.shape[1]
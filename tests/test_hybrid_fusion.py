@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from conftest import StaticRetriever
+from conversational_toolkit.retriever.hybrid_retriever import (
+    FusionMethod,
+    HybridRetriever,
+)
+
+LEXICAL = [("a", 12.0), ("b", 6.0), ("c", 3.0)]
+SEMANTIC = [("c", 0.9), ("d", 0.8), ("a", 0.1)]
+
+
+def fused(retriever: HybridRetriever) -> list[tuple[str, float]]:
+    return [(m.id, m.score) for m in asyncio.run(retriever.retrieve("q"))]
+
+
+def test_rrf_sums_reciprocal_ranks():
+    retriever = HybridRetriever(
+        [StaticRetriever(LEXICAL), StaticRetriever(SEMANTIC)], top_k=10, rrf_k=60
+    )
+    scores = dict(fused(retriever))
+    assert scores["a"] == pytest.approx(1 / 61 + 1 / 63)
+    assert scores["c"] == pytest.approx(1 / 63 + 1 / 61)
+    assert scores["d"] == pytest.approx(1 / 62)
+    assert scores["b"] == pytest.approx(1 / 62)
+    assert {cid for cid, _ in fused(retriever)[:2]} == {"a", "c"}
+
+
+def test_weighted_rrf_favours_the_heavier_retriever():
+    retriever = HybridRetriever(
+        [StaticRetriever(LEXICAL), StaticRetriever(SEMANTIC)],
+        top_k=2,
+        weights=[0.0, 1.0],
+    )
+    assert [cid for cid, _ in fused(retriever)] == ["c", "d"]
+
+
+@pytest.mark.parametrize(
+    ("fusion", "expected"),
+    [
+        (FusionMethod.MIN_MAX, {"a": 1.0, "b": 1 / 3, "c": 1.0, "d": 7 / 8}),
+        (FusionMethod.Z_SCORE, None),
+        (FusionMethod.DBSF, None),
+    ],
+)
+def test_score_fusion_normalises_each_list(fusion, expected):
+    retriever = HybridRetriever(
+        [StaticRetriever(LEXICAL), StaticRetriever(SEMANTIC)], top_k=10, fusion=fusion
+    )
+    scores = dict(fused(retriever))
+    assert set(scores) == {"a", "b", "c", "d"}
+    if expected is not None:
+        assert scores == pytest.approx(expected)
+    # Rescaling one list by a constant must not change any fused score
+    scaled = HybridRetriever(
+        [
+            StaticRetriever([(cid, 100 * s) for cid, s in LEXICAL]),
+            StaticRetriever(SEMANTIC),
+        ],
+        top_k=10,
+        fusion=fusion,
+    )
+    assert dict(fused(scaled)) == pytest.approx(scores)
+
+
+def test_candidate_depths_limit_each_retriever_without_mutating_it():
+    lexical, semantic = StaticRetriever(LEXICAL), StaticRetriever(SEMANTIC)
+    retriever = HybridRetriever([lexical, semantic], top_k=10, candidate_depths=[1, 2])
+    assert {cid for cid, _ in fused(retriever)} == {"a", "c", "d"}
+    assert (lexical.top_k, semantic.top_k) == (10, 10)
+
+
+def test_argument_lengths_are_validated():
+    with pytest.raises(ValueError, match="weights"):
+        HybridRetriever([StaticRetriever(LEXICAL)], top_k=1, weights=[1.0, 2.0])
+    with pytest.raises(ValueError, match="candidate_depths"):
+        HybridRetriever([StaticRetriever(LEXICAL)], top_k=1, candidate_depths=[])
+
+
+def test_evaluate_fusion_ranks_configurations_with_one_retrieval_pass():
+    lexical, semantic = StaticRetriever(LEXICAL), StaticRetriever(SEMANTIC)
+    retriever = HybridRetriever([lexical, semantic], top_k=1)
+
+    evaluations = asyncio.run(
+        retriever.evaluate_fusion(
+            ["q1", "q2"],
+            [{"c"}, {"c"}],
+            fusions=[FusionMethod.RRF],
+            weight_grid=[[1.0, 0.0], [0.0, 1.0]],
+            depth_grid=[[3, 3], [3, 1]],
+        )
+    )
+
+    assert len(evaluations) == 4
+    assert lexical.queries == semantic.queries == ["q1", "q2"]
+    assert [(e.weights, e.recall, e.mrr) for e in evaluations] == [
+        ((0.0, 1.0), 1.0, 1.0),
+        ((0.0, 1.0), 1.0, 1.0),
+        ((1.0, 0.0), 0.0, 0.0),
+        ((1.0, 0.0), 0.0, 0.0),
+    ]
+    with pytest.raises(ValueError, match="same length"):
+        asyncio.run(retriever.evaluate_fusion(["q"], []))
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+from conftest import StaticRetriever
+from conversational_toolkit.retriever.base import Retriever
+from conversational_toolkit.retriever.hybrid_retriever import HybridRetriever
+from conversational_toolkit.utils.metadata_provider import MetadataProvider
+from conversational_toolkit.vectorstores.base import ChunkMatch
+
+
+class FailingRetriever(Retriever[ChunkMatch]):
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        raise RuntimeError("backend down")
+
+
+class BlockingRetriever(Retriever[ChunkMatch]):
+    def __init__(self) -> None:
+        super().__init__(top_k=5)
+        self.cancelled = False
+
+    async def retrieve(self, query: str) -> list[ChunkMatch]:
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return []
+
+
+def run_with_metadata(retriever: HybridRetriever) -> tuple[list[str], list[dict]]:
+    async def run() -> tuple[list[str], list[dict]]:
+        with MetadataProvider.get_manager():
+            matches = await retriever.retrieve("q")
+            return [match.id for match in matches], MetadataProvider.get_metadata()
+
+    return asyncio.run(run())
+
+
+def test_slow_retriever_is_dropped_after_its_timeout():
+    fast = StaticRetriever([("a", 1.0)])
+    slow = StaticRetriever([("b", 1.0)], delay=5)
+    retriever = HybridRetriever([fast, slow], top_k=5, timeouts=[None, 0.05])
+
+    ids, metadata = run_with_metadata(retriever)
+
+    assert ids == ["a"]
+    assert metadata == [{"retrieval_timeouts": ["1:StaticRetriever"]}]
+
+
+def test_deadline_cancels_every_unfinished_retriever():
+    retrievers = [
+        StaticRetriever([("a", 1.0)], delay=5),
+        StaticRetriever([("b", 1.0)]),
+        StaticRetriever([("c", 1.0)], delay=5),
+    ]
+    retriever = HybridRetriever(retrievers, top_k=5, deadline=0.05)
+
+    ids, metadata = run_with_metadata(retriever)
+
+    assert ids == ["b"]
+    assert metadata == [
+        {"retrieval_timeouts": ["0:StaticRetriever", "2:StaticRetriever"]}
+    ]
+
+
+def test_cancelling_the_caller_cancels_every_retriever():
+    retrievers = [BlockingRetriever(), BlockingRetriever()]
+    retriever = HybridRetriever(retrievers, top_k=5, deadline=10)
+
+    async def run() -> set[asyncio.Task]:
+        task = asyncio.create_task(retriever.retrieve("q"))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return asyncio.all_tasks() - {asyncio.current_task()}
+
+    assert asyncio.run(run()) == set()
+    assert all(r.cancelled for r in retrievers)
+
+
+def test_no_metadata_when_everything_finishes():
+    retriever = HybridRetriever(
+        [StaticRetriever([("a", 1.0)]), StaticRetriever([("b", 1.0)])],
+        top_k=5,
+        timeouts=[1.0, 1.0],
+        deadline=1.0,
+    )
+    ids, metadata = run_with_metadata(retriever)
+    assert set(ids) == {"a", "b"}
+    assert metadata == []
+
+
+def test_other_errors_propagate():
+    retriever = HybridRetriever(
+        [StaticRetriever([("a", 1.0)]), FailingRetriever(5)], top_k=5, deadline=1.0
+    )
+    with pytest.raises(RuntimeError, match="backend down"):
+        asyncio.run(retriever.retrieve("q"))
+
+
+def test_timeouts_need_one_entry_per_retriever():
+    with pytest.raises(ValueError, match="timeouts"):
+        HybridRetriever([StaticRetriever([])], top_k=1, timeouts=[1.0, 2.0])
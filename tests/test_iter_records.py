@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+
+@pytest.fixture(params=["in_memory", "chroma"])
+def store(request, tmp_path):
+    if request.param == "chroma":
+        return ChromaDBVectorStore(str(tmp_path / "chroma"), "scan_test")
+    return InMemoryVectorStore()
+
+
+async def collect(store, **kwargs) -> list[list]:
+    return [batch async for batch in store.iter_records(**kwargs)]
+
+
+def test_scan_yields_every_record_in_bounded_batches(store):
+    async def run():
+        await store.insert_chunks(
+            make_chunks(23), make_embeddings(23), [f"{i:02d}" for i in range(23)]
+        )
+        return await collect(store, batch_size=10)
+
+    batches = asyncio.run(run())
+    assert [len(batch) for batch in batches] == [10, 10, 3]
+    records = [record for batch in batches for record in batch]
+    assert sorted(record.id for record in records) == [f"{i:02d}" for i in range(23)]
+    assert all(record.embedding == [] for record in records)
+    assert {record.content for record in records} == {f"Content {i}" for i in range(23)}
+
+
+def test_scan_applies_filters_and_returns_embeddings(store):
+    async def run():
+        chunks = make_chunks(12)
+        for chunk in chunks:
+            chunk.metadata["group"] = "a" if chunk.metadata["n"] < 4 else "b"
+        await store.insert_chunks(chunks, make_embeddings(12))
+        return await collect(store, filters={"group": "a"}, include_embeddings=True)
+
+    records = [record for batch in asyncio.run(run()) for record in batch]
+    assert sorted(record.metadata["n"] for record in records) == [0, 1, 2, 3]
+    assert all(len(record.embedding) == 8 for record in records)
+
+
+def test_scan_of_empty_store_yields_nothing(store):
+    assert asyncio.run(collect(store)) == []
+
+
+def test_bm25_corpus_streams_out_of_a_store():
+    async def run():
+        store = InMemoryVectorStore()
+        chunks = make_chunks(5)
+        chunks[3].content = "wooden pallet dimensions"
+        await store.insert_chunks(chunks, make_embeddings(5), list("abcde"))
+        retriever = await BM25Retriever.from_vector_store(store, top_k=2, batch_size=2)
+        return len(retriever.corpus), await retriever.retrieve("pallet")
+
+    size, results = asyncio.run(run())
+    assert size == 5
+    assert [match.id for match in results] == ["d"]
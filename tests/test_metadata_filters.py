@@ -0,0 +1,132 @@
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+
+import numpy as np
+import pytest
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.base import VectorStore
+from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from conversational_toolkit.vectorstores.filters import parse_filters
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+from conversational_toolkit.vectorstores.postgres import PGVectorStore
+from sqlalchemy.ext.asyncio import create_async_engine
+
+METADATA = {
+    "a": {"source_file": "a.pdf", "chapters": ["Intro", "Scope"], "rows": 5},
+    "b": {"source_file": "b.pdf", "chapters": ["Scope"], "rows": 50},
+    "c": {"source_file": "c.pdf", "chapters": "Intro", "rows": 500},
+    "d": {"source_file": "a.pdf", "rows": 7, "draft": True},
+}
+
+FILTERS = [
+    ({"source_file": "a.pdf"}, {"a", "d"}),
+    ({"chapters": "Intro"}, {"a", "c"}),
+    ({"chapters": {"$in": ["Scope", "Appendix"]}}, {"a", "b"}),
+    ({"chapters": ["Intro", "Scope"]}, {"a"}),
+    ({"chapters": {"$ne": "Intro"}}, {"b", "d"}),
+    ({"chapters": {"$nin": ["Intro", "Scope"]}}, {"d"}),
+    ({"chapters": {"$in": []}}, set()),
+    ({"chapters": {"$nin": []}}, {"a", "b", "c", "d"}),
+    ({"$or": [{"chapters": {"$in": []}}, {"draft": True}]}, {"d"}),
+    ({"rows": {"$gte": 7, "$lt": 500}}, {"b", "d"}),
+    ({"$or": [{"draft": True}, {"chapters": "Scope"}]}, {"a", "b", "d"}),
+    ({"source_file": "a.pdf", "chapters": {"$ne": "Scope"}}, {"d"}),
+]
+
+
+def in_memory(tmp_path, pg_url) -> AbstractAsyncContextManager[VectorStore]:
+    @asynccontextmanager
+    async def store() -> AsyncIterator[VectorStore]:
+        yield InMemoryVectorStore()
+
+    return store()
+
+
+def chroma(tmp_path, pg_url) -> AbstractAsyncContextManager[VectorStore]:
+    @asynccontextmanager
+    async def store() -> AsyncIterator[VectorStore]:
+        yield ChromaDBVectorStore(str(tmp_path / "chroma"), "filter_test")
+
+    return store()
+
+
+def postgres(tmp_path, pg_url) -> AbstractAsyncContextManager[VectorStore]:
+    @asynccontextmanager
+    async def store() -> AsyncIterator[VectorStore]:
+        engine = create_async_engine(pg_url)
+        pg_store = PGVectorStore(engine, "test_filter_chunks", 4)
+        await pg_store.enable_vector_extension()
+        await pg_store.create_table()
+        try:
+            yield pg_store
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(pg_store.metadata.drop_all)
+            await engine.dispose()
+
+    return store()
+
+
+@pytest.fixture(params=[in_memory, chroma, postgres])
+def store_factory(request, tmp_path) -> Callable[[], AbstractAsyncContextManager]:
+    pg_url = request.getfixturevalue("pg_url") if request.param is postgres else ""
+    return lambda: request.param(tmp_path, pg_url)
+
+
+def test_same_filter_same_results_on_every_backend(store_factory):
+    async def run() -> tuple[list[set[str]], list[set[str]]]:
+        async with store_factory() as store:
+            chunks = [
+                Chunk(title=i, content=i, mime_type="text/plain", metadata=m)
+                for i, m in METADATA.items()
+            ]
+            embeddings = np.random.default_rng(0).normal(size=(len(chunks), 4))
+            await store.insert_chunks(chunks, embeddings, list(METADATA))
+            searched, scanned = [], []
+            for filters, _ in FILTERS:
+                matches = await store.get_chunks_by_embedding(
+                    embeddings[0], 10, filters
+                )
+                searched.append({match.id for match in matches})
+                scanned.append(
+                    {
+                        record.id
+                        async for batch in store.iter_records(filters=filters)
+                        for record in batch
+                    }
+                )
+            return searched, scanned
+
+    searched, scanned = asyncio.run(run())
+    expected = [ids for _, ids in FILTERS]
+    assert searched == expected
+    assert scanned == expected
+
+
+def test_chroma_keeps_list_flags_out_of_returned_metadata(tmp_path):
+    async def run() -> dict:
+        store = ChromaDBVectorStore(str(tmp_path / "chroma"), "flags_test")
+        chunk = Chunk(
+            title="t", content="c", mime_type="text/plain", metadata=METADATA["a"]
+        )
+        await store.insert_chunks([chunk], np.ones((1, 4)), ["a"])
+        return (await store.get_chunks_by_ids("a"))[0].metadata
+
+    metadata = asyncio.run(run())
+    assert not any(key.endswith("]") or key == "_json_fields" for key in metadata)
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"$not": [{"a": 1}]},
+        {"a": {"$like": "x"}},
+        {"a": {"$in": "x"}},
+        {"$and": []},
+    ],
+)
+def test_malformed_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        parse_filters(filters)
@@ -0,0 +1,89 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+from conversational_toolkit.vectorstores.metadata_index import MetadataIndex
+
+ROWS = [
+    {"sheet": "Pallets", "chapters": ["Intro", "Scope"], "rows": 10, "final": True},
+    {"sheet": "Tapes", "chapters": ["Scope"], "rows": 1, "final": False},
+    {"sheet": "Pallets", "rows": "10", "final": 1},
+]
+
+
+@pytest.fixture
+def index() -> MetadataIndex:
+    metadata_index = MetadataIndex()
+    metadata_index.add(ROWS)
+    return metadata_index
+
+
+@pytest.mark.parametrize(
+    ("filters", "rows"),
+    [
+        ({"sheet": "Pallets"}, [0, 2]),
+        ({"chapters": "Scope"}, [0, 1]),
+        ({"chapters": ["Intro", "Scope"]}, [0]),
+        ({"sheet": {"$in": ["Tapes", "Labels"]}}, [1]),
+        ({"sheet": {"$ne": "Pallets"}}, [1]),
+        ({"chapters": {"$nin": ["Intro"]}}, [1, 2]),
+        ({"rows": {"$gt": 1}}, [0]),
+        ({"rows": {"$gte": "1"}}, [2]),
+        ({"final": True}, [0]),
+        ({"final": 1}, [2]),
+        ({"$or": [{"sheet": "Tapes"}, {"rows": {"$gte": 10}}]}, [0, 1]),
+        ({"sheet": "Pallets", "chapters": {"$ne": "Intro"}}, [2]),
+        ({"sheet": "Missing"}, []),
+    ],
+)
+def test_filters_select_expected_rows(index, filters, rows):
+    assert index.row_ids(filters).tolist() == rows
+
+
+def test_removed_rows_no_longer_match(index):
+    index.remove([0])
+    assert index.row_ids({"sheet": "Pallets"}).tolist() == [2]
+    assert index.row_ids({"sheet": {"$ne": "Tapes"}}).tolist() == [2]
+
+
+def test_bitsets_grow_with_appended_rows():
+    index = MetadataIndex()
+    index.add([{"group": i % 3} for i in range(200)])
+    index.add([{"group": 0}])
+    rows = index.row_ids({"group": 0})
+    assert rows.tolist() == [*range(0, 200, 3), 200]
+    assert index.mask({"group": 0}).sum() == rows.size
+
+
+def test_unindexed_field_is_rejected():
+    index = MetadataIndex(fields=["sheet"])
+    index.add(ROWS)
+    with pytest.raises(ValueError, match="not indexed"):
+        index.row_ids({"rows": 1})
+
+
+def test_in_memory_search_only_scores_filtered_rows():
+    async def run() -> tuple[list[str], list[str]]:
+        store = InMemoryVectorStore()
+        chunks = make_chunks(40)
+        for chunk in chunks:
+            chunk.metadata["even"] = chunk.metadata["n"] % 2 == 0
+        embeddings = make_embeddings(40)
+        await store.insert_chunks(chunks, embeddings, [str(i) for i in range(40)])
+        filtered = await store.get_chunks_by_embedding(embeddings[1], 5, {"even": True})
+        everything = await store.get_chunks_by_embedding(embeddings[1], 40)
+        return [m.id for m in filtered], [m.id for m in everything]
+
+    filtered, everything = asyncio.run(run())
+    assert all(int(chunk_id) % 2 == 0 for chunk_id in filtered)
+    assert filtered == [c for c in everything if int(c) % 2 == 0][:5]
+
+
+def test_cosine_scores_are_float32():
+    store = InMemoryVectorStore()
+    asyncio.run(store.insert_chunks(make_chunks(3), make_embeddings(3)))
+    scores = store._cosine(np.ones(8, dtype=np.float32), None)
+    assert scores.dtype == np.float32
+    assert scores.shape == (3,)
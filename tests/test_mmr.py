@@ -0,0 +1,58 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conftest import StaticRetriever, make_chunks
+from conversational_toolkit.retriever.mmr_retriever import MMRRetriever, mmr_select
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+# 'a' and 'b' are near-duplicates, 'c' is different but less relevant
+SCORES = np.array([0.9, 0.85, 0.5])
+EMBEDDINGS = np.array([[1.0, 0.0], [0.99, 0.05], [0.0, 1.0]])
+
+
+def test_lambda_one_keeps_the_relevance_order():
+    assert mmr_select(SCORES, EMBEDDINGS, 3, 1.0) == [0, 1, 2]
+
+
+def test_near_duplicates_are_pushed_down():
+    assert mmr_select(SCORES, EMBEDDINGS, 2, 0.5) == [0, 2]
+
+
+def test_candidates_without_embeddings_are_never_redundant():
+    embeddings = np.array([[1.0, 0.0], [0.0, 0.0], [1.0, 0.0]])
+    assert mmr_select(SCORES, embeddings, 2, 0.5) == [0, 1]
+
+
+def test_equal_scores_count_as_equally_relevant():
+    selected = mmr_select(np.ones(3), EMBEDDINGS, 3, 0.5)
+    assert sorted(selected) == [0, 1, 2]
+    assert selected.index(2) < 2
+
+
+def test_retriever_fetches_missing_embeddings_from_the_store():
+    store = InMemoryVectorStore()
+    asyncio.run(store.insert_chunks(make_chunks(3), EMBEDDINGS, ["a", "b", "c"]))
+    base = StaticRetriever([("a", 0.9), ("b", 0.85), ("c", 0.5)], top_k=2)
+    retriever = MMRRetriever(
+        base, top_k=2, candidate_pool=3, vector_store=store, include_embeddings=True
+    )
+
+    matches = asyncio.run(retriever.retrieve("q"))
+
+    assert [(m.id, m.score) for m in matches] == [("a", 0.9), ("c", 0.5)]
+    assert matches[1].embedding == [0.0, 1.0]
+    assert base.top_k == 2
+    assert retriever.version == store.version
+
+
+def test_without_embeddings_the_base_ranking_is_kept():
+    base = StaticRetriever([("a", 0.9), ("b", 0.85), ("c", 0.5)])
+    matches = asyncio.run(MMRRetriever(base, top_k=2).retrieve("q"))
+    assert [m.id for m in matches] == ["a", "b"]
+    assert asyncio.run(MMRRetriever(StaticRetriever([]), top_k=2).retrieve("q")) == []
+
+
+def test_lambda_must_be_a_fraction():
+    with pytest.raises(ValueError, match="lambda_mult"):
+        MMRRetriever(StaticRetriever([]), top_k=1, lambda_mult=1.5)
@@ -0,0 +1,80 @@
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.postgres import PGVectorStore
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def test_copy_csv_round_trips_awkward_fields():
+    chunks = [
+        Chunk(
+            title="",
+            content='Comma, "quote"\nnewline',
+            mime_type="text/plain",
+            metadata={"tags": ["a", "ü"]},
+        ),
+        Chunk(title="Maß", content="", mime_type="text/markdown", metadata={}),
+    ]
+    embeddings = make_embeddings(2, dim=3)
+
+    payload = PGVectorStore._to_copy_csv(chunks, embeddings, ["id-1", "id-2"])
+    rows = list(csv.reader(io.StringIO(payload.getvalue().decode("utf-8"))))
+
+    assert [row[0] for row in rows] == ["id-1", "id-2"]
+    assert rows[0][1:4] == ["", 'Comma, "quote"\nnewline', "text/plain"]
+    assert rows[1][1:4] == ["Maß", "", "text/markdown"]
+    assert json.loads(rows[0][4]) == pytest.approx(embeddings[0].tolist())
+    assert json.loads(rows[0][5]) == {"tags": ["a", "ü"]}
+
+
+def test_bulk_insert_validates_arguments():
+    store = PGVectorStore(
+        create_async_engine("postgresql+asyncpg://user@localhost/db"), "chunks", 8
+    )
+    chunks = make_chunks(3)
+
+    with pytest.raises(ValueError, match="same length"):
+        asyncio.run(store.bulk_insert_chunks(chunks, make_embeddings(2)))
+    with pytest.raises(ValueError, match="batch_size"):
+        asyncio.run(store.bulk_insert_chunks(chunks, make_embeddings(3), batch_size=0))
+
+
+def test_bulk_insert_is_idempotent(pg_url):
+    async def run() -> tuple[int, list[tuple[int, int]], str]:
+        engine = create_async_engine(pg_url)
+        store = PGVectorStore(engine, "test_bulk_chunks", 8)
+        await store.enable_vector_extension()
+        await store.create_table()
+        try:
+            progress: list[tuple[int, int]] = []
+            ids = [f"chunk-{i}" for i in range(25)]
+            await store.bulk_insert_chunks(
+                make_chunks(25), make_embeddings(25), ids, batch_size=10
+            )
+            updated = [
+                chunk.model_copy(update={"content": "updated"})
+                for chunk in make_chunks(25)
+            ]
+            await store.bulk_insert_chunks(
+                updated,
+                make_embeddings(25),
+                ids,
+                batch_size=10,
+                progress_callback=lambda *p: progress.append(p),
+            )
+            record = (await store.get_chunks_by_ids("chunk-3"))[0]
+            return await store.count(), progress, record.content
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(store.metadata.drop_all)
+            await engine.dispose()
+
+    count, progress, content = asyncio.run(run())
+    assert count == 25
+    assert progress == [(10, 25), (20, 25), (25, 25)]
+    assert content == "updated"
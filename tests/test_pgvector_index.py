@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.vectorstores.postgres import (
+    PGVectorStore,
+    VectorIndexMethod,
+)
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+@pytest.mark.parametrize(
+    ("rows", "lists"),
+    [(0, 1), (999, 1), (50_000, 50), (1_000_000, 1000), (4_000_000, 2000)],
+)
+def test_default_ivfflat_lists_follows_pgvector_guidance(rows, lists):
+    assert PGVectorStore._default_ivfflat_lists(rows) == lists
+
+
+def test_unknown_index_method_is_rejected():
+    store = PGVectorStore(
+        create_async_engine("postgresql+asyncpg://user@localhost/db"), "chunks", 8
+    )
+    with pytest.raises(NotImplementedError):
+        asyncio.run(store.create_vector_index(method="diskann"))  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize("method", list(VectorIndexMethod))
+def test_vector_index_lifecycle(pg_url, method):
+    async def run() -> tuple[int, int, int]:
+        engine = create_async_engine(pg_url)
+        store = PGVectorStore(engine, "test_index_chunks", 8)
+        await store.enable_vector_extension()
+        await store.create_table()
+        try:
+            await store.insert_chunks(make_chunks(50), make_embeddings(50))
+            await store.create_vector_index(method)
+            built = await store.get_vector_index_size()
+            hits = len(await store.get_chunks_by_embedding(make_embeddings(1)[0], 5))
+            await store.drop_vector_index()
+            return built, hits, await store.get_vector_index_size()
+        finally:
+            async with engine.begin() as connection:
+                await connection.run_sync(store.metadata.drop_all)
+            await engine.dispose()
+
+    built, hits, dropped = asyncio.run(run())
+    assert built > 0
+    assert hits == 5
+    assert dropped == 0
@@ -0,0 +1,88 @@
+import asyncio
+
+from conftest import ScriptedLLM, StaticRetriever
+from conversational_toolkit.agents.base import QueryWithContext
+from conversational_toolkit.agents.rag import RAG
+from conversational_toolkit.retriever.bm25_retriever import BM25Retriever
+from conversational_toolkit.vectorstores.base import ChunkRecord
+
+
+class ConcurrencyProbe:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+
+class ProbedRetriever(StaticRetriever):
+    """Single-query retriever that reports how many calls run at once."""
+
+    def __init__(self, chunk_id: str, probe: ConcurrencyProbe) -> None:
+        super().__init__([(chunk_id, 1.0)])
+        self.probe = probe
+
+    async def retrieve(self, query: str):
+        self.probe.running += 1
+        self.probe.peak = max(self.probe.peak, self.probe.running)
+        await asyncio.sleep(0.01)
+        self.probe.running -= 1
+        return await super().retrieve(query)
+
+
+class BatchCountingRetriever(BM25Retriever):
+    def __init__(self) -> None:
+        record = ChunkRecord(
+            id="bm25",
+            title="",
+            content="pallet",
+            mime_type="text/plain",
+            metadata={},
+            embedding=[],
+        )
+        super().__init__([record], top_k=5)
+        self.batches: list[list[str]] = []
+
+    async def retrieve_many(self, queries, filters=None):
+        self.batches.append(queries)
+        return await super().retrieve_many(queries, filters)
+
+
+def run_rag(rag: RAG) -> list[str]:
+    async def run():
+        context = QueryWithContext(query="pallet", history=[])
+        return [answer async for answer in rag.answer_stream(context)]
+
+    return [source.id for source in asyncio.run(run())[-1].sources]
+
+
+def test_max_concurrency_bounds_every_retriever_query_pair():
+    probe = ConcurrencyProbe()
+    retrievers = [ProbedRetriever(f"c{i}", probe) for i in range(3)]
+    rag = RAG(
+        llm=ScriptedLLM("answer"),
+        utility_llm=ScriptedLLM("pallet\nwooden pallet\npallet price"),
+        retrievers=retrievers,
+        system_prompt="",
+        number_query_expansion=3,
+        max_concurrency=2,
+    )
+
+    sources = run_rag(rag)
+
+    assert probe.peak == 2
+    assert [len(r.queries) for r in retrievers] == [3, 3, 3]
+    assert sources == ["c0", "c1", "c2"]
+
+
+def test_batched_retrievers_get_all_queries_in_one_call():
+    batched = BatchCountingRetriever()
+    rag = RAG(
+        llm=ScriptedLLM("answer"),
+        utility_llm=ScriptedLLM("pallet\nwooden pallet"),
+        retrievers=[batched],
+        system_prompt="",
+        number_query_expansion=2,
+        max_concurrency=1,
+    )
+
+    assert run_rag(rag) == ["bm25"]
+    assert batched.batches == [["pallet", "wooden pallet"]]
@@ -0,0 +1,82 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+from conftest import StaticRetriever
+from conversational_toolkit.llms.base import LLM, LLMMessage
+from conversational_toolkit.retriever.reranking_retriever import RerankingRetriever
+
+
+class RankingLLM(LLM):
+    """Returns the given responses in turn and counts the calls."""
+
+    def __init__(self, *responses: str, model: str = "ranker") -> None:
+        super().__init__()
+        self.responses = list(responses)
+        self.model = model
+        self.calls = 0
+
+    async def generate(self, conversation: list[LLMMessage]) -> LLMMessage:
+        self.calls += 1
+        return LLMMessage(content=self.responses.pop(0))
+
+    async def generate_stream(
+        self, conversation: list[LLMMessage]
+    ) -> AsyncGenerator[LLMMessage, None]:
+        yield await self.generate(conversation)
+
+
+class VersionedRetriever(StaticRetriever):
+    def __init__(self, ranking: list[tuple[str, float]]) -> None:
+        super().__init__(ranking)
+        self.content_version = 0
+
+    @property
+    def version(self) -> int:
+        return self.content_version
+
+
+CANDIDATES = [("a", 0.9), ("b", 0.8), ("c", 0.7)]
+
+
+def ids(retriever: RerankingRetriever, query: str) -> list[str]:
+    return [match.id for match in asyncio.run(retriever.retrieve(query))]
+
+
+def test_ranking_is_applied_and_cached_per_normalised_query():
+    llm = RankingLLM('{"ranking": [2, 0]}')
+    reranker = RerankingRetriever(StaticRetriever(CANDIDATES), llm, top_k=3)
+
+    assert ids(reranker, "Which pallet?") == ["c", "a", "b"]
+    assert ids(reranker, "  which PALLET? ") == ["c", "a", "b"]
+    assert llm.calls == 1
+
+
+def test_version_change_invalidates_cached_rankings():
+    llm = RankingLLM('{"ranking": [2, 1, 0]}', '{"ranking": [1, 0, 2]}')
+    base = VersionedRetriever(CANDIDATES)
+    reranker = RerankingRetriever(base, llm, top_k=3)
+
+    assert ids(reranker, "q") == ["c", "b", "a"]
+    base.content_version += 1  # same IDs, edited contents
+    assert ids(reranker, "q") == ["b", "a", "c"]
+    assert llm.calls == 2
+
+
+def test_failed_rankings_fall_back_and_are_not_cached():
+    llm = RankingLLM("not json", '{"ranking": [1]}')
+    reranker = RerankingRetriever(StaticRetriever(CANDIDATES), llm, top_k=2)
+
+    assert ids(reranker, "q") == ["a", "b"]
+    assert ids(reranker, "q") == ["b", "a"]
+    assert llm.calls == 2
+
+
+def test_cache_can_be_disabled():
+    llm = RankingLLM('{"ranking": [1]}', '{"ranking": [2]}')
+    reranker = RerankingRetriever(
+        StaticRetriever(CANDIDATES), llm, top_k=1, cache_size=None
+    )
+
+    assert ids(reranker, "q") == ["b"]
+    assert ids(reranker, "q") == ["c"]
+    assert reranker.cache is None
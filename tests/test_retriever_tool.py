@@ -0,0 +1,82 @@
+import asyncio
+
+from conftest import ScriptedLLM, StaticRetriever
+from conversational_toolkit.llms.base import LLMMessage, Roles
+from conversational_toolkit.tools.retriever import RetrieverTool
+
+
+class BatchRecordingRetriever(StaticRetriever):
+    def __init__(self, ranking: list[tuple[str, float]], top_k: int = 10) -> None:
+        super().__init__(ranking, top_k)
+        self.batches: list[list[str]] = []
+
+    async def retrieve_many(self, queries: list[str]):
+        self.batches.append(queries)
+        return await super().retrieve_many(queries)
+
+
+HISTORY = [
+    LLMMessage(role=Roles.USER, content="Tell me about pallets"),
+    LLMMessage(role=Roles.ASSISTANT, content="Pallets are ..."),
+]
+
+
+def make_tool(llm: ScriptedLLM, retriever: StaticRetriever, expansions: int = 0):
+    return RetrieverTool(
+        name="retrieve",
+        description="Search the documents",
+        parameters={},
+        llm=llm,
+        retriever=retriever,
+        number_query_expansion=expansions,
+    )
+
+
+def test_query_without_history_is_retrieved_as_is():
+    llm = ScriptedLLM()
+    retriever = BatchRecordingRetriever([("a", 1.0), ("b", 0.5)], top_k=1)
+
+    result = asyncio.run(make_tool(llm, retriever).call({"_query": "pallets"}))
+
+    assert retriever.batches == [["pallets"]]
+    assert llm.calls == 0
+    assert result == {
+        "_sources": [
+            {
+                "id": "a",
+                "title": "a",
+                "content": "Content of a",
+                "mime_type": "text/plain",
+                "metadata": {"id": "a"},
+            }
+        ]
+    }
+
+
+def test_standalone_rewrite_is_memoised_per_history_and_query():
+    llm = ScriptedLLM("What do pallets cost?", "How heavy are pallets?")
+    retriever = BatchRecordingRetriever([("a", 1.0)])
+    tool = make_tool(llm, retriever)
+
+    async def run() -> None:
+        await tool.call({"_query": "And the price?", "_history": HISTORY})
+        await tool.call({"_query": "And the price?", "_history": HISTORY})
+        await tool.call({"_query": "And the weight?", "_history": HISTORY})
+
+    asyncio.run(run())
+    assert llm.calls == 2
+    assert retriever.batches == [
+        ["What do pallets cost?"],
+        ["What do pallets cost?"],
+        ["How heavy are pallets?"],
+    ]
+
+
+def test_expanded_queries_are_retrieved_as_one_batch_and_fused():
+    llm = ScriptedLLM("pallet price\npallet cost")
+    retriever = BatchRecordingRetriever([("a", 1.0), ("b", 0.5), ("c", 0.1)], top_k=2)
+
+    result = asyncio.run(make_tool(llm, retriever, expansions=2).call({"_query": "q"}))
+
+    assert retriever.batches == [["pallet price", "pallet cost"]]
+    assert [source["id"] for source in result["_sources"]] == ["a", "b"]
@@ -0,0 +1,148 @@
+import asyncio
+from collections.abc import AsyncGenerator
+
+import numpy as np
+import pytest
+from conftest import ScriptedLLM, make_chunks
+from conversational_toolkit.agents import semantic_cache
+from conversational_toolkit.agents.base import Agent, AgentAnswer, QueryWithContext
+from conversational_toolkit.agents.semantic_cache import SemanticCacheAgent
+from conversational_toolkit.embeddings.base import EmbeddingsModel
+from conversational_toolkit.llms.base import LLMMessage, Roles
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+VECTORS = {
+    "opening hours": [1.0, 0.0, 0.0],
+    "when are you open": [0.98, 0.2, 0.0],
+    "delivery cost": [0.0, 1.0, 0.0],
+    "returns": [0.0, 0.0, 1.0],
+}
+
+
+class LookupEmbeddings(EmbeddingsModel):
+    async def get_embeddings(self, texts: str | list[str]) -> np.ndarray:
+        texts = [texts] if isinstance(texts, str) else texts
+        return np.array([VECTORS[text] for text in texts])
+
+
+class CountingAgent(Agent):
+    """Streams 'Answer to <query>' in two parts, optionally writing to a store meanwhile."""
+
+    def __init__(self, store: InMemoryVectorStore | None = None) -> None:
+        super().__init__("system", ScriptedLLM())
+        self.queries: list[str] = []
+        self.store = store
+
+    async def answer_stream(
+        self, query_with_context: QueryWithContext
+    ) -> AsyncGenerator[AgentAnswer, None]:
+        self.queries.append(query_with_context.query)
+        yield AgentAnswer(content="Answer")
+        if self.store is not None:
+            await self.store.insert_chunks(make_chunks(1), [[1.0]])
+        yield AgentAnswer(content=f"Answer to {query_with_context.query}")
+
+
+def ask(agent: Agent, query: str, history: list[LLMMessage] | None = None) -> str:
+    async def run() -> list[AgentAnswer]:
+        context = QueryWithContext(query=query, history=history or [])
+        return [answer async for answer in agent.answer_stream(context)]
+
+    return asyncio.run(run())[-1].content
+
+
+def test_similar_questions_are_answered_from_the_cache():
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), similarity_threshold=0.95)
+
+    assert ask(agent, "opening hours") == "Answer to opening hours"
+    assert ask(agent, "when are you open") == "Answer to opening hours"
+    assert ask(agent, "delivery cost") == "Answer to delivery cost"
+    assert inner.queries == ["opening hours", "delivery cost"]
+    assert (agent.hits, agent.misses) == (1, 2)
+
+
+def test_follow_up_questions_bypass_the_cache():
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings())
+    history = [LLMMessage(role=Roles.USER, content="hi")]
+
+    ask(agent, "opening hours", history)
+    ask(agent, "opening hours", history)
+
+    assert inner.queries == ["opening hours", "opening hours"]
+    assert (agent.hits, agent.misses) == (0, 0)
+
+
+def test_store_writes_clear_the_cache():
+    store = InMemoryVectorStore()
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), vector_stores=[store])
+
+    ask(agent, "opening hours")
+    asyncio.run(store.insert_chunks(make_chunks(1), [[1.0]]))
+    ask(agent, "opening hours")
+    ask(agent, "opening hours")
+
+    assert inner.queries == ["opening hours", "opening hours"]
+
+
+def test_answers_generated_during_a_store_write_are_not_cached():
+    store = InMemoryVectorStore()
+    inner = CountingAgent(store)
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), vector_stores=[store])
+
+    ask(agent, "opening hours")
+    ask(agent, "opening hours")
+
+    assert len(inner.queries) == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), ttl=60)
+
+    ask(agent, "opening hours")
+    now[0] += 59
+    ask(agent, "opening hours")
+    now[0] += 2
+    ask(agent, "opening hours")
+
+    assert len(inner.queries) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), maxsize=2)
+
+    for query in ("opening hours", "delivery cost", "opening hours", "returns"):
+        ask(agent, query)
+    inner.queries.clear()
+    for query in ("opening hours", "returns", "delivery cost"):
+        ask(agent, query)
+
+    assert inner.queries == ["delivery cost"]
+
+
+def test_replay_streams_growing_prefixes():
+    inner = CountingAgent()
+    agent = SemanticCacheAgent(inner, LookupEmbeddings(), replay_chunk_size=5)
+    ask(agent, "returns")
+
+    async def run() -> list[str]:
+        context = QueryWithContext(query="returns", history=[])
+        return [answer.content async for answer in agent.answer_stream(context)]
+
+    assert asyncio.run(run()) == [
+        "Answe",
+        "Answer to ",
+        "Answer to retur",
+        "Answer to returns",
+    ]
+
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError, match="maxsize"):
+        SemanticCacheAgent(CountingAgent(), LookupEmbeddings(), maxsize=0)
@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+from conversational_toolkit.vectorstores.sharded import ShardedVectorStore
+
+
+class CountingStore(InMemoryVectorStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.searches = 0
+
+    async def get_chunks_by_embedding(self, *args, **kwargs):
+        self.searches += 1
+        return await super().get_chunks_by_embedding(*args, **kwargs)
+
+
+def build(n: int = 60, shard_key: str | None = None):
+    chunks = make_chunks(n)
+    for chunk in chunks:
+        chunk.metadata["source_file"] = f"doc{chunk.metadata['n'] % 6}.pdf"
+    embeddings = make_embeddings(n)
+    ids = [f"id{i}" for i in range(n)]
+    single = InMemoryVectorStore()
+    sharded = ShardedVectorStore([CountingStore() for _ in range(3)], shard_key)
+
+    async def insert():
+        await single.insert_chunks(chunks, embeddings, ids)
+        await sharded.insert_chunks(chunks, embeddings, ids)
+
+    asyncio.run(insert())
+    return single, sharded, embeddings, ids
+
+
+def test_sharded_search_matches_a_single_store():
+    single, sharded, _, _ = build()
+    queries = make_embeddings(4, seed=1)
+
+    async def run():
+        return (
+            [await single.get_chunks_by_embedding(q, 7) for q in queries],
+            [await sharded.get_chunks_by_embedding(q, 7) for q in queries],
+            await sharded.get_chunks_by_embeddings(queries, 7),
+        )
+
+    expected, actual, batched = asyncio.run(run())
+    ids = [[match.id for match in matches] for matches in expected]
+    assert [[match.id for match in matches] for matches in actual] == ids
+    assert [[match.id for match in matches] for matches in batched] == ids
+    assert all(len(shard) > 0 for shard in sharded.shards)
+    assert sum(len(shard) for shard in sharded.shards) == len(single)
+
+
+def test_shard_key_keeps_documents_together_and_prunes_shards():
+    _, sharded, embeddings, _ = build(shard_key="source_file")
+    holders = {
+        index
+        for index, shard in enumerate(sharded.shards)
+        if shard.metadata_index.row_ids({"source_file": "doc1.pdf"}).size
+    }
+    assert len(holders) == 1
+
+    matches = asyncio.run(
+        sharded.get_chunks_by_embedding(embeddings[0], 20, {"source_file": "doc1.pdf"})
+    )
+    assert len(matches) == 10
+    assert {m.metadata["source_file"] for m in matches} == {"doc1.pdf"}
+    assert sum(shard.searches for shard in sharded.shards) == 1
+
+
+def test_lookup_scan_and_version_cover_every_shard():
+    _, sharded, _, ids = build()
+
+    async def run():
+        records = await sharded.get_chunks_by_ids(ids[::-1])
+        scanned = [r.id async for batch in sharded.iter_records(7) for r in batch]
+        return records, scanned
+
+    records, scanned = asyncio.run(run())
+    assert [record.id for record in records] == ids[::-1]
+    assert sorted(scanned) == sorted(ids)
+    assert sharded.version == sum(shard.version for shard in sharded.shards) > 0
+
+    before = sharded.version
+    asyncio.run(sharded.insert_chunks(make_chunks(1), np.zeros((1, 8))))
+    assert sharded.version > before
+
+
+def test_numeric_shard_keys_prune_to_the_shard_of_the_equal_value():
+    chunks = make_chunks(40)
+    for chunk in chunks:
+        chunk.metadata["year"] = 2000 + chunk.metadata["n"] % 8
+    embeddings = make_embeddings(40)
+    by_year = ShardedVectorStore([InMemoryVectorStore() for _ in range(5)], "year")
+
+    async def run():
+        await by_year.insert_chunks(chunks, embeddings)
+        return (
+            await by_year.get_chunks_by_embedding(embeddings[0], 40, {"year": 2003.0}),
+            await by_year.get_chunks_by_embedding(
+                embeddings[0], 40, {"year": {"$in": [2001.0, 2006]}}
+            ),
+        )
+
+    year, years = asyncio.run(run())
+    assert {m.metadata["n"] % 8 for m in year} == {3} and len(year) == 5
+    assert {m.metadata["n"] % 8 for m in years} == {1, 6} and len(years) == 10
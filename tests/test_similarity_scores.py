@@ -0,0 +1,64 @@
+import asyncio
+
+import numpy as np
+import pytest
+from conftest import make_chunks, make_embeddings
+from conversational_toolkit.vectorstores.chromadb import (
+    ChromaDBVectorStore,
+    DistanceSpace,
+)
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+@pytest.fixture(params=["in_memory", "chroma_cosine", "chroma_l2", "chroma_ip"])
+def store(request, tmp_path):
+    if request.param == "in_memory":
+        return InMemoryVectorStore()
+    space = DistanceSpace(request.param.removeprefix("chroma_"))
+    return ChromaDBVectorStore(str(tmp_path / "chroma"), "scores", distance_space=space)
+
+
+def test_every_store_reports_cosine_similarity(store):
+    embeddings = unit(make_embeddings(20))
+    query = unit(make_embeddings(1, seed=3))[0]
+
+    async def run():
+        await store.insert_chunks(
+            make_chunks(20), embeddings, [str(i) for i in range(20)]
+        )
+        return await store.get_chunks_by_embedding(query, 5)
+
+    matches = asyncio.run(run())
+    expected = embeddings @ query
+    assert [int(m.id) for m in matches] == np.argsort(-expected)[:5].tolist()
+    np.testing.assert_allclose(
+        [m.score for m in matches], np.sort(expected)[::-1][:5], atol=1e-4
+    )
+
+
+def test_min_score_drops_weak_matches(store):
+    embeddings = unit(make_embeddings(20))
+    query = embeddings[0]
+
+    async def run():
+        await store.insert_chunks(
+            make_chunks(20), embeddings, [str(i) for i in range(20)]
+        )
+        return await store.get_chunks_by_embedding(query, 20, min_score=0.3)
+
+    matches = asyncio.run(run())
+    assert matches[0].id == "0"
+    assert all(m.score >= 0.3 - 1e-6 for m in matches)
+    assert len(matches) == int(np.sum(embeddings @ query >= 0.3))
+
+
+def test_in_memory_scores_are_scale_invariant():
+    embeddings = make_embeddings(10)
+    store = InMemoryVectorStore()
+    asyncio.run(store.insert_chunks(make_chunks(10), embeddings * 7.0))
+    matches = asyncio.run(store.get_chunks_by_embedding(embeddings[4] * 0.01, 1))
+    assert matches[0].score == pytest.approx(1.0, abs=1e-5)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from conftest import make_embeddings
+from conversational_toolkit.chunking.base import Chunk
+from conversational_toolkit.vectorstores.chromadb import ChromaDBVectorStore
+from conversational_toolkit.vectorstores.in_memory import InMemoryVectorStore
+from conversational_toolkit.vectorstores.snapshot import (
+    MANIFEST_FILE,
+    export_snapshot,
+    import_snapshot,
+    load_snapshot_embeddings,
+    read_snapshot_manifest,
+)
+
+METADATA = [
+    {"source_file": "a.pdf", "chapters": ["Intro", "Scope"], "page": 1},
+    {"source_file": "a.pdf", "chapters": [], "table": {"rows": 3}, "draft": True},
+    {"source_file": "b.pdf", "weight": 12.5},
+]
+
+
+def make_store(kind: str, tmp_path, name: str):
+    if kind == "chroma":
+        return ChromaDBVectorStore(str(tmp_path / name), "snapshot_test")
+    return InMemoryVectorStore()
+
+
+@pytest.mark.parametrize(
+    ("source_kind", "target_kind"),
+    [("chroma", "in_memory"), ("in_memory", "chroma"), ("chroma", "chroma")],
+)
+def test_round_trip_between_backends(tmp_path, source_kind, target_kind):
+    chunks = [
+        Chunk(title=f"T{i}", content=f"C{i}", mime_type="text/plain", metadata=m)
+        for i, m in enumerate(METADATA)
+    ]
+    embeddings = make_embeddings(3, dim=4)
+    ids = ["x", "y", "z"]
+
+    async def run():
+        source = make_store(source_kind, tmp_path, "source")
+        await source.insert_chunks(chunks, embeddings, ids)
+        await export_snapshot(source, tmp_path / "snap", "test-model", batch_size=2)
+        target = make_store(target_kind, tmp_path, "target")
+        await import_snapshot(
+            tmp_path / "snap", target, expected_model_name="test-model"
+        )
+        return await target.get_chunks_by_ids(ids, include_embeddings=True)
+
+    records = asyncio.run(run())
+    assert [record.id for record in records] == ids
+    assert [record.metadata for record in records] == METADATA
+    assert [(record.title, record.content) for record in records] == [
+        (f"T{i}", f"C{i}") for i in range(3)
+    ]
+    np.testing.assert_allclose(
+        [record.embedding for record in records], embeddings, rtol=1e-6
+    )
+
+
+def test_export_writes_manifest_and_raw_embeddings(tmp_path):
+    embeddings = make_embeddings(5, dim=3)
+    chunks = [Chunk(title="", content=str(i), mime_type="text/plain") for i in range(5)]
+
+    async def run():
+        store = InMemoryVectorStore()
+        await store.insert_chunks(chunks, embeddings)
+        return await export_snapshot(store, tmp_path, "m", batch_size=2)
+
+    manifest = asyncio.run(run())
+    assert (manifest.count, manifest.embedding_size) == (5, 3)
+    assert read_snapshot_manifest(tmp_path) == manifest
+    loaded = load_snapshot_embeddings(tmp_path)
+    assert loaded.dtype == np.float32
+    np.testing.assert_allclose(loaded, embeddings, rtol=1e-6)
+
+
+def test_import_checks_model_and_completeness(tmp_path):
+    async def export():
+        store = InMemoryVectorStore()
+        chunk = Chunk(title="", content="c", mime_type="text/plain")
+        await store.insert_chunks([chunk], make_embeddings(1, dim=3))
+        await export_snapshot(store, tmp_path, "model-a")
+
+    asyncio.run(export())
+    with pytest.raises(ValueError, match="model-a"):
+        asyncio.run(
+            import_snapshot(
+                tmp_path, InMemoryVectorStore(), expected_model_name="model-b"
+            )
+        )
+
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    (tmp_path / MANIFEST_FILE).write_text(json.dumps({**manifest, "count": 2}))
+    with pytest.raises(ValueError):
+        asyncio.run(import_snapshot(tmp_path, InMemoryVectorStore()))
+
+    (tmp_path / MANIFEST_FILE).unlink()
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(import_snapshot(tmp_path, InMemoryVectorStore()))